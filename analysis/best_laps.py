@@ -14,14 +14,24 @@ class BestLapTracker:
     def __init__(self):
         self.personal_bests: Dict[int, int] = {}  # struct_idx -> ms
         self.global_best_ms: Optional[int] = None
+        self._last_tick: Optional[int] = None  # None -> next update scans every car
 
     def reset(self):
         self.personal_bests.clear()
         self.global_best_ms = None
+        self._last_tick = None
 
     def update_from_snapshot(self, state):
-        for idx, car_state in state.car_states.items():
-            if not car_state.last_lap_valid:
+        # only cars whose lap clocks changed can have a new lap time; a full pass
+        # is made after reset() or if snapshots were skipped
+        if self._last_tick is None:
+            indices = state.car_states.keys()
+        else:
+            indices = state.changed_indices("lap_clock", since_tick=self._last_tick)
+        self._last_tick = state.tick
+        for idx in indices:
+            car_state = state.car_states.get(idx)
+            if car_state is None or not car_state.last_lap_valid:
                 continue
             ms = car_state.last_lap_ms
             if ms <= 0:
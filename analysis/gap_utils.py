@@ -3,11 +3,17 @@ gap_utils.py
 
 Helpers for computing gap/interval/retirement display strings.
 Now returns plain strings and optional color hints instead of HTML.
+
+For a column-oriented RaceSnapshot the gaps are computed for all cars at once
+(compute_gap_ms); compute_gaps_display accepts either snapshot type.
 """
 
-from typing import Dict, Optional, Tuple
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
 
 from core.model import RaceState, CarState
+from core.race_snapshot import RaceSnapshot
 from core.config import Config
 
 
@@ -55,13 +61,62 @@ def get_retirement_reason(car_status: int) -> Optional[str]:
     return RETIREMENT_REASONS.get(car_status)
 
 
-def compute_gaps_display(state: RaceState) -> Dict[int, Tuple[str, Optional[str]]]:
+def compute_gap_ms(snap: RaceSnapshot) -> Tuple[Optional[int], np.ndarray, np.ndarray]:
+    """
+    Vectorized gap to the leader (first running car in the order) for every struct index.
+    Returns (leader_idx, gap_ms, has_gap). Cars on the leader's lap are compared at
+    the end of their last lap, cars one lap behind against the leader's lap start;
+    has_gap is False where no time gap applies (other laps, missing clocks).
+    """
+    n = snap.raw_count
+    running = snap.running()
+    leader = next((i for i in snap.order if i is not None and 0 <= i < n and running[i]), None)
+    if leader is None:
+        return None, np.zeros(n, dtype=np.int64), np.zeros(n, dtype=bool)
+
+    laps = snap.laps_completed
+    end_ok = snap.lap_end_valid
+    same_lap = (laps == laps[leader]) & end_ok & end_ok[leader]
+    lap_behind = (laps == laps[leader] - 1) & end_ok & snap.lap_start_valid[leader]
+    ref = np.where(same_lap, snap.lap_end_clock[leader], snap.lap_start_clock[leader])
+    # signed 32-bit difference of the wrapping clocks
+    gap = (snap.lap_end_clock - ref + 0x80000000) % 0x100000000 - 0x80000000
+    has_gap = same_lap | lap_behind
+    return leader, np.where(has_gap, gap, 0), has_gap
+
+
+def _compute_gaps_display_columns(snap: RaceSnapshot) -> Dict[int, Tuple[str, Optional[str]]]:
+    leader_idx, gap_ms, has_gap = compute_gap_ms(snap)
+    if leader_idx is None:
+        return {idx: ("", None) for idx in range(snap.raw_count)}
+
+    gaps: Dict[int, Tuple[str, Optional[str]]] = {}
+    columns = zip(snap.column_list("car_status"), snap.column_list("current_lp"),
+                  snap.column_list("laps_down"), gap_ms.tolist(), has_gap.tolist())
+    for struct_idx, (status, lp, down, gap, ok) in enumerate(columns):
+        if lp == 3 and status == 0:
+            gaps[struct_idx] = ("Pitting", COLOR_PITTING)
+        elif get_retirement_reason(status):
+            gaps[struct_idx] = (get_retirement_reason(status), COLOR_RETIRED)
+        elif struct_idx == leader_idx:
+            gaps[struct_idx] = ("", None)
+        elif down > 0:
+            gaps[struct_idx] = (f"-{down}L", None)
+        else:
+            gaps[struct_idx] = (format_time_diff(gap) if ok else "", None)
+    return gaps
+
+
+def compute_gaps_display(state: Union[RaceState, RaceSnapshot]) -> Dict[int, Tuple[str, Optional[str]]]:
     """
     Return mapping struct_idx -> (text, color_hex).
     """
     gaps: Dict[int, Tuple[str, Optional[str]]] = {}
 
     try:
+        if isinstance(state, RaceSnapshot):
+            return _compute_gaps_display_columns(state)
+
         leader_idx = None
         leader_state: Optional[CarState] = None
         for idx in state.order:
@@ -0,0 +1,86 @@
+"""
+bench_adaptive_poll.py
+
+Simulates one minute each of several race phases through AdaptivePollScheduler
+(updater/poll_scheduler.py) and reports reads per second against the fixed timer.
+
+Phases (synthetic image, 34 cars on a 2.5 mile track):
+  spread     cars evenly spaced, nothing in the player's radar window
+  close      another car alongside the player
+  paused     memory stops changing (game paused / in a menu)
+  failing    every read raises (game closed)
+
+Usage:
+    python -m benchmarks.bench_adaptive_poll [base_ms] [min_ms] [max_ms]
+"""
+
+import struct
+import sys
+from typing import List
+
+from benchmarks.synthetic import FakeMemory, build_race_image
+from core.config import Config
+from core.reader import MemoryReader, ReadError
+from updater.poll_scheduler import AdaptivePollScheduler
+
+N_CARS = 34
+PHASE_MS = 60_000
+
+
+def place_cars(image: bytearray, cfg: Config, t_ms: int, close: bool) -> None:
+    """Cars lap at ~200 mph, evenly spaced; optionally car 2 runs alongside the player."""
+    track_len, = struct.unpack_from("<i", image, cfg.track_length_addr)
+    speed = track_len / 45_000  # units per ms, ~45 s laps
+    for i in range(N_CARS):
+        base = cfg.car_state_base + i * cfg.car_state_size
+        dlong = int(t_ms * speed + i * track_len / N_CARS) % track_len
+        if close and i == 2:
+            dlong = int(t_ms * speed + cfg.player_index * track_len / N_CARS) % track_len
+        struct.pack_into("<i", image, base + cfg.dlong, dlong)
+        struct.pack_into("<i", image, base + cfg.dlat, 0 if i != 2 else 60 * 500)
+        struct.pack_into("<I", image, base + cfg.car_status, 0)
+
+
+class FailingMemory(FakeMemory):
+    def read_bytes(self, exe_offset: int, length: int) -> bytes:
+        raise OSError("process is gone")
+
+    def read_into(self, exe_offset: int, buffer) -> int:
+        raise OSError("process is gone")
+
+
+def simulate(phase: str, scheduler: AdaptivePollScheduler, cfg: Config) -> int:
+    """Number of reads the scheduler issues over PHASE_MS of simulated time."""
+    image = build_race_image(cfg, N_CARS)
+    place_cars(image, cfg, 0, phase == "close")
+    mem = FailingMemory(image) if phase == "failing" else FakeMemory(image)
+    reader = MemoryReader(mem, cfg)
+    t, reads = 0, 0
+    while t < PHASE_MS:
+        if phase in ("spread", "close"):
+            place_cars(image, cfg, t, phase == "close")
+        reads += 1
+        try:
+            interval = scheduler.after_state(reader.read_race_state())
+        except ReadError:
+            interval = scheduler.after_error()
+        t += interval
+    return reads
+
+
+def main(argv: List[str]) -> None:
+    base_ms = int(argv[0]) if argv else 20
+    min_ms = int(argv[1]) if len(argv) > 1 else 10
+    max_ms = int(argv[2]) if len(argv) > 2 else 500
+
+    cfg = Config()
+    print(f"base={base_ms} ms  min={min_ms} ms  max={max_ms} ms  "
+          f"fixed timer: {1000 / base_ms:.0f} reads/s")
+    for phase in ("spread", "close", "paused", "failing"):
+        scheduler = AdaptivePollScheduler(base_ms, min_ms, max_ms, cfg=cfg)
+        reads = simulate(phase, scheduler, cfg)
+        print(f"{phase:8} adaptive: {reads * 1000 / PHASE_MS:6.1f} reads/s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,86 @@
+"""
+bench_alloc.py
+
+Measures allocations per MemoryReader.read_race_state() call with tracemalloc.
+
+Reports the bytes allocated by one call (with the lazy CarState.values views) and
+what materializing every car's raw block as a Python list would add on top, which
+is what each poll used to cost. The transient peak is the high-water mark above the
+retained result inside one call (read buffers, decode temporaries).
+
+Usage:
+    python -m benchmarks.bench_alloc [n_cars] [iterations]
+"""
+
+import sys
+import tracemalloc
+from typing import List
+
+from benchmarks.synthetic import FakeMemory, advance, build_race_image
+from core.config import Config
+from core.reader import MemoryReader
+
+
+def allocated_per_call(fn, iterations: int) -> float:
+    """Average bytes allocated (and kept alive by the result) per call of fn()."""
+    fn()  # warm caches
+    tracemalloc.start()
+    try:
+        results = []
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(iterations):
+            results.append(fn())
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (after - before) / iterations
+
+
+def peak_per_call(fn, iterations: int) -> float:
+    """Average transient high-water mark above the starting allocation per call of fn()."""
+    fn()
+    tracemalloc.start()
+    try:
+        peaks = 0
+        for _ in range(iterations):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks += peak - before
+    finally:
+        tracemalloc.stop()
+    return peaks / iterations
+
+
+def main(argv: List[str]) -> None:
+    n_cars = int(argv[0]) if argv else 34
+    iterations = int(argv[1]) if len(argv) > 1 else 50
+
+    cfg = Config()
+    image = build_race_image(cfg, n_cars)
+    reader = MemoryReader(FakeMemory(image), cfg)
+    tick = [0]
+
+    def lazy():
+        tick[0] += 1
+        advance(image, cfg, n_cars, tick[0])
+        return reader.read_race_state()
+
+    def eager():
+        state = lazy()
+        return state, [list(cs.values) for cs in state.car_states.values()]
+
+    lazy_bytes = allocated_per_call(lazy, iterations)
+    eager_bytes = allocated_per_call(eager, iterations)
+    peak_bytes = peak_per_call(lazy, iterations)
+
+    print(f"cars={n_cars} iterations={iterations}")
+    print(f"eager values lists: {eager_bytes / 1024:8.1f} KiB per read_race_state()")
+    print(f"lazy values views:  {lazy_bytes / 1024:8.1f} KiB per read_race_state()"
+          f"  ({1 - lazy_bytes / eager_bytes:.0%} less)")
+    print(f"transient peak:     {peak_bytes / 1024:8.1f} KiB per read_race_state()")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
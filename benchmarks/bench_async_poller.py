@@ -0,0 +1,155 @@
+"""
+bench_async_poller.py
+
+CPU cost of a headless consumer: AsyncRacePoller (asyncio, no Qt) vs. RaceUpdater
+on a QCoreApplication, both polling a synthetic backend at the same rate with one
+subscriber that only counts snapshots. A second asyncio run adds a 1 Hz
+subscriber to show independent rates share the single poll.
+
+check_pacing: with only a 1 Hz subscriber the poller reads about once a second,
+not every poll_ms, and with no subscriber it does not read at all.
+
+check_blocked_close: a policy="block" subscriber that stops consuming stalls the
+poll; closing it (or cancelling its consumer) must release the poll so the other
+subscribers keep receiving snapshots.
+
+Usage:
+    python -m benchmarks.bench_async_poller [poll_ms] [seconds]
+"""
+
+import asyncio
+import sys
+import time
+from typing import List
+
+from benchmarks.synthetic import FakeMemory, build_race_image
+from core.config import Config
+from core.reader import MemoryReader
+from updater.async_poller import AsyncRacePoller
+
+
+def make_reader() -> MemoryReader:
+    cfg = Config()
+    cfg.adaptive_poll = False
+    cfg.coalesce_frames = False
+    return MemoryReader(FakeMemory(build_race_image(cfg, 34)), cfg)
+
+
+def run_async(poll_ms: int, seconds: float, extra_slow: bool):
+    counts = {"main": 0, "slow": 0}
+
+    async def consume(sub, key):
+        async with sub:
+            async for _ in sub:
+                counts[key] += 1
+
+    async def main():
+        async with AsyncRacePoller(make_reader(), poll_ms=poll_ms) as poller:
+            tasks = [asyncio.create_task(consume(poller.subscribe(), "main"))]
+            if extra_slow:
+                tasks.append(asyncio.create_task(consume(poller.subscribe(interval_ms=1000), "slow")))
+            await asyncio.sleep(seconds)
+        await asyncio.gather(*tasks)
+        return poller.ticks
+
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    ticks = asyncio.run(main())
+    return ticks, counts, (time.process_time() - cpu0) / (time.perf_counter() - wall0)
+
+
+def check_blocked_close(poll_ms: int, how: str) -> dict:
+    """Ticks and fast-subscriber deliveries after a stalled "block" subscriber goes away."""
+    counts = {"fast": 0}
+
+    async def consume_fast(sub):
+        async with sub:
+            async for _ in sub:
+                counts["fast"] += 1
+
+    async def consume_stalled(sub):
+        async with sub:
+            async for _ in sub:
+                await asyncio.sleep(3600)   # never comes back for the next item
+
+    async def main():
+        async with AsyncRacePoller(make_reader(), poll_ms=poll_ms) as poller:
+            stalled = poller.subscribe(policy="block")
+            stalled_task = asyncio.create_task(consume_stalled(stalled))
+            fast_task = asyncio.create_task(consume_fast(poller.subscribe()))
+            await asyncio.sleep(0.3)   # the poll is now waiting on the stalled queue
+            if how == "close":
+                stalled.close()
+            else:
+                stalled_task.cancel()
+            ticks, fast = poller.ticks, counts["fast"]
+            await asyncio.sleep(0.5)
+            after = {"ticks": poller.ticks - ticks, "fast": counts["fast"] - fast}
+        stalled_task.cancel()
+        await asyncio.gather(stalled_task, fast_task, return_exceptions=True)
+        return after
+
+    return asyncio.run(main())
+
+
+def check_pacing(poll_ms: int, seconds: float) -> dict:
+    """Polls while only a 1 Hz subscriber is attached, then while none is."""
+    async def consume(sub):
+        async with sub:
+            async for _ in sub:
+                pass
+
+    async def main():
+        async with AsyncRacePoller(make_reader(), poll_ms=poll_ms) as poller:
+            sub = poller.subscribe(interval_ms=1000)
+            task = asyncio.create_task(consume(sub))
+            await asyncio.sleep(seconds)
+            slow = poller.ticks
+            sub.close()
+            await task
+            await asyncio.sleep(seconds)
+            return {"slow": slow, "idle": poller.ticks - slow}
+
+    return asyncio.run(main())
+
+
+def run_qt(poll_ms: int, seconds: float):
+    from PyQt5 import QtCore
+    from updater.updater import RaceUpdater
+
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication(sys.argv[:1])
+    updater = RaceUpdater(make_reader(), poll_ms=poll_ms)
+    counts = {"main": 0}
+    updater.state_updated.connect(lambda s: counts.__setitem__("main", counts["main"] + 1))
+    QtCore.QTimer.singleShot(0, updater.start)
+    QtCore.QTimer.singleShot(int(seconds * 1000), app.quit)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    app.exec_()
+    cpu = (time.process_time() - cpu0) / (time.perf_counter() - wall0)
+    updater.stop()
+    return counts["main"], counts, cpu
+
+
+def main(argv: List[str]) -> None:
+    poll_ms = int(argv[0]) if argv else 20
+    seconds = float(argv[1]) if len(argv) > 1 else 3.0
+
+    print(f"poll {poll_ms} ms, {seconds:.0f} s")
+    for label, fn in (("asyncio", lambda: run_async(poll_ms, seconds, False)),
+                      ("asyncio +1 Hz", lambda: run_async(poll_ms, seconds, True)),
+                      ("Qt QCoreApplication", lambda: run_qt(poll_ms, seconds))):
+        ticks, counts, cpu = fn()
+        print(f"{label:20} polls={ticks:4d} delivered={counts}  cpu={cpu:6.1%}")
+
+    pacing = check_pacing(poll_ms, seconds)
+    print(f"1 Hz only: {pacing['slow']} polls in {seconds:.0f} s; no subscribers: {pacing['idle']} polls")
+    assert pacing["slow"] <= seconds + 2 and pacing["idle"] == 0, pacing
+
+    expected = int(0.5 * 1000 / poll_ms) // 2
+    for how in ("close", "cancel"):
+        after = check_blocked_close(poll_ms, how)
+        print(f"blocked sub, {how:6} -> {after['ticks']} polls, {after['fast']} delivered in the next 0.5 s")
+        assert after["ticks"] >= expected and after["fast"] >= expected, after
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
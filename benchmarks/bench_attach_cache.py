@@ -0,0 +1,124 @@
+"""
+bench_attach_cache.py
+
+Checks AttachCache (core/attach_cache.py) without a game process: validate() gets
+a fake read over a bytearray "process" and a chosen start time, the way
+ICR2Memory._attach_from_cache passes pm.read_bytes and process_start_time().
+
+  validate   a matching record; a changed version; a reused PID (different start
+             time); a signature mismatch at the cached base; a read that raises
+  load/save  the record round-trips, exe_base stored as 0x%08X; a missing or
+             unreadable INI loads as None
+
+Then times load() + validate(), the whole cost of a cached re-attach.
+
+Usage:
+    python -m benchmarks.bench_attach_cache
+"""
+
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+from core.attach_cache import AttachCache, AttachRecord
+
+SIGNATURE = b"license with Bob"     # the version signature ICR2Memory scans for
+SIGNATURE_OFFSET = 0xB1C0C          # DOS
+EXE_BASE = 0x00A1_0000
+START_TIME = 133_000_000_000_000_000
+REPEAT = 10_000
+
+
+class FakeProcess:
+    """A flat memory image with the signature at EXE_BASE + SIGNATURE_OFFSET."""
+
+    def __init__(self, base: int = 0x0040_0000, size: int = 0x0100_0000):
+        self.base = base
+        self.image = bytearray(size)
+        at = EXE_BASE + SIGNATURE_OFFSET - base
+        self.image[at:at + len(SIGNATURE)] = SIGNATURE
+        self.reads = []
+
+    def read(self, address: int, size: int) -> bytes:
+        self.reads.append((address, size))
+        at = address - self.base
+        if not 0 <= at <= len(self.image) - size:
+            raise OSError(f"could not read {size} bytes at 0x{address:08X}")
+        return bytes(self.image[at:at + size])
+
+
+def failing_read(address: int, size: int) -> bytes:
+    raise OSError("ReadProcessMemory failed")
+
+
+def validate(record: AttachRecord, version: str = "DOS", start_time=START_TIME,
+             read=None) -> bool:
+    return AttachCache.validate(record, version, start_time, read or FakeProcess().read,
+                                SIGNATURE, SIGNATURE_OFFSET)
+
+
+def check_validate() -> None:
+    record = AttachRecord(4242, START_TIME, "DOS", EXE_BASE, "DOSBox 0.74")
+    process = FakeProcess()
+    assert validate(record, read=process.read), "matching record rejected"
+    assert process.reads == [(EXE_BASE + SIGNATURE_OFFSET, len(SIGNATURE))], process.reads
+    assert validate(record, version="dos"), "version compared case-sensitively"
+    assert not validate(record, version="WINDY"), "changed version accepted"
+    assert not validate(record, start_time=START_TIME + 1), "reused PID accepted"
+    assert not validate(record, start_time=None), "unknown start time accepted"
+    moved = AttachRecord(record.pid, START_TIME, "DOS", EXE_BASE + 0x1000, record.window_title)
+    assert not validate(moved), "signature mismatch accepted"
+    assert not validate(record, read=failing_read), "failed read accepted"
+    print("validate   ok  match, version, reused PID, signature mismatch, failed read")
+
+
+def check_load_save(folder: str) -> None:
+    path = os.path.join(folder, "attach_cache.ini")
+    cache = AttachCache(path)
+    assert cache.load() is None, "missing file loaded"
+
+    record = AttachRecord(4242, START_TIME, "DOS", EXE_BASE, "DOSBox 0.74, Cpu speed: max 100%")
+    cache.save(record)
+    with open(path) as f:
+        text = f.read()
+    assert f"exe_base = 0x{EXE_BASE:08X}\n" in text, text
+    assert cache.load() == record, cache.load()
+    low = AttachRecord(1, 2, "WINDY", 0x1000)
+    cache.save(low)
+    with open(path) as f:
+        assert "exe_base = 0x00001000\n" in f.read()
+    assert cache.load() == low, cache.load()
+
+    for junk in ("not an ini file\n",
+                 "[attach]\npid = 12\nstart_time = soon\nversion = DOS\nexe_base = 0x1000\n",
+                 "[attach]\npid = 12\nstart_time = 3\nversion = DOS\n",
+                 "[other]\npid = 12\n"):
+        with open(path, "w") as f:
+            f.write(junk)
+        assert cache.load() is None, junk
+    cache.clear()
+    assert not os.path.exists(path)
+    cache.clear()   # already gone: no error
+    print("load/save  ok  round trip, exe_base as 0x%08X, missing / unreadable INI -> None")
+
+
+def main(argv: List[str]) -> None:
+    check_validate()
+    with tempfile.TemporaryDirectory() as folder:
+        check_load_save(folder)
+
+        cache = AttachCache(os.path.join(folder, "attach_cache.ini"))
+        cache.save(AttachRecord(4242, START_TIME, "DOS", EXE_BASE))
+        process = FakeProcess()
+        t0 = time.perf_counter()
+        for _ in range(REPEAT):
+            record = cache.load()
+            AttachCache.validate(record, "DOS", START_TIME, process.read, SIGNATURE, SIGNATURE_OFFSET)
+        per_us = (time.perf_counter() - t0) / REPEAT * 1e6
+        print(f"re-attach  {per_us:6.1f} us for load() + validate() (one {len(SIGNATURE)}-byte read)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
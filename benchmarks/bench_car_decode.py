@@ -0,0 +1,84 @@
+"""
+bench_car_decode.py
+
+Before/after microbenchmark for MemoryReader._read_laps_full.
+
+"before" is the original per-field int.from_bytes decoder, kept here verbatim as a
+reference; "after" is the vectorized decoder in core/reader.py. The script also
+checks both produce identical CarState maps.
+
+Usage:
+    python -m benchmarks.bench_car_decode [n_cars] [iterations]
+"""
+
+import sys
+import timeit
+from typing import Dict, List
+
+from benchmarks.synthetic import FakeMemory, build_race_image
+from core.config import Config
+from core.model import CarState
+from core.reader import MemoryReader
+
+
+def legacy_read_laps_full(reader: MemoryReader, raw_count: int) -> Dict[int, CarState]:
+    """The pre-vectorization decoder (one int.from_bytes per field and per raw slot)."""
+    cfg = reader._cfg
+    total_bytes = raw_count * cfg.car_state_size
+    blob = bytes(reader._mem.read(cfg.car_state_base, 'bytes', count=total_bytes))
+    blob = blob.ljust(total_bytes, b'\x00')
+
+    def u32(off): return int.from_bytes(blob[off:off + 4], 'little', signed=False)
+    def i32(off): return int.from_bytes(blob[off:off + 4], 'little', signed=True)
+
+    out: Dict[int, CarState] = {}
+    for idx in range(raw_count):
+        base = idx * cfg.car_state_size
+        clock_start = u32(base + cfg.field_lap_clock_start)
+        clock_start = None if clock_start == 0xFF000000 else clock_start
+        clock_end = u32(base + cfg.field_lap_clock_end)
+        clock_end = None if clock_end == 0xFF000000 else clock_end
+        laps_down = u32(base + cfg.field_laps_down)
+        car_status = u32(base + cfg.car_status)
+        valid = clock_start is not None and clock_end is not None
+        values: List[int] = [i32(base + i * 4) for i in range(cfg.car_state_size // 4)]
+        out[idx] = CarState(
+            struct_index=idx,
+            laps_left=u32(base + cfg.field_laps_left),
+            laps_completed=max(u32(base + cfg.current_lap) - 1, 0),
+            last_lap_ms=((clock_end - clock_start) & 0xFFFFFFFF) if valid else 0,
+            last_lap_valid=valid,
+            laps_down=0 if laps_down > 100 else laps_down,
+            lap_end_clock=clock_end,
+            lap_start_clock=clock_start,
+            car_status=0 if car_status > 16 else car_status,
+            current_lp=u32(base + cfg.current_lp),
+            fuel_laps_remaining=u32(base + cfg.fuel_laps_remaining),
+            dlat=i32(base + cfg.dlat),
+            dlong=i32(base + cfg.dlong),
+            values=values,
+        )
+    return out
+
+
+def main(argv: List[str]) -> None:
+    n_cars = int(argv[0]) if argv else 34
+    iterations = int(argv[1]) if len(argv) > 1 else 200
+
+    cfg = Config()
+    reader = MemoryReader(FakeMemory(build_race_image(cfg, n_cars)), cfg)
+
+    before = legacy_read_laps_full(reader, n_cars)
+    after = reader._read_laps_full(n_cars, 200)
+    assert before == after, "vectorized decoder differs from the reference decoder"
+
+    t_before = timeit.timeit(lambda: legacy_read_laps_full(reader, n_cars), number=iterations)
+    t_after = timeit.timeit(lambda: reader._read_laps_full(n_cars, 200), number=iterations)
+
+    print(f"cars={n_cars} iterations={iterations}")
+    print(f"before: {t_before / iterations * 1e6:9.1f} us/tick")
+    print(f"after:  {t_after / iterations * 1e6:9.1f} us/tick  ({t_before / t_after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
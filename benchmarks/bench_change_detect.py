@@ -0,0 +1,81 @@
+"""
+bench_change_detect.py
+
+Checks and times the reader's change detection (core/decode_cache.py).
+
+For each version, a synthetic race is polled while only car telemetry changes:
+names, numbers, total laps, track length and track name must each be decoded
+exactly once. Renaming one driver must cause exactly one more names decode.
+Then the per-tick cost is compared against a reader whose cache is cleared
+every tick (the old decode-everything behaviour).
+
+WINDY is skipped: its track name comes from the TRACKS folder, not memory.
+
+Usage:
+    python -m benchmarks.bench_change_detect [n_cars] [ticks]
+"""
+
+import sys
+import time
+from typing import List
+
+from benchmarks.synthetic import FakeMemory, advance, build_race_image
+from core.config import Config
+from core.reader import MemoryReader
+
+CACHED_REGIONS = ("names", "numbers", "laps", "track_length", "track_name")
+
+
+def check(cfg: Config, n_cars: int, ticks: int) -> None:
+    image = build_race_image(cfg, n_cars)
+    reader = MemoryReader(FakeMemory(image), cfg)
+    for tick in range(ticks):
+        advance(image, cfg, n_cars, tick)
+        reader.read_race_state()
+
+    stats = reader.decode_stats()
+    for region in CACHED_REGIONS:
+        hits, misses = stats[region]
+        assert misses == 1 and hits == ticks - 1, f"{cfg.version} {region}: {hits} hits, {misses} misses"
+
+    # rename driver 1: names are decoded again, nothing else is
+    slot = 1 + cfg.names_index_base + cfg.names_shift
+    start = cfg.driver_names_base + slot * cfg.entry_bytes_name
+    image[start:start + 6] = b"Rahal\x00"
+    state = reader.read_race_state()
+    assert state.drivers[1].name == "Rahal", state.drivers[1].name
+    stats = reader.decode_stats()
+    assert stats["names"][1] == 2, stats["names"]
+    assert all(stats[r][1] == 1 for r in CACHED_REGIONS if r != "names"), stats
+
+
+def time_ticks(cfg: Config, n_cars: int, ticks: int, cache: bool) -> float:
+    """Seconds per read_race_state() with telemetry-only changes."""
+    image = build_race_image(cfg, n_cars)
+    reader = MemoryReader(FakeMemory(image), cfg)
+    reader.read_race_state()
+    t0 = time.perf_counter()
+    for tick in range(ticks):
+        advance(image, cfg, n_cars, tick)
+        if not cache:
+            reader._decode_cache.clear()
+        reader.read_race_state()
+    return (time.perf_counter() - t0) / ticks
+
+
+def main(argv: List[str]) -> None:
+    n_cars = int(argv[0]) if argv else 34
+    ticks = int(argv[1]) if len(argv) > 1 else 500
+
+    print(f"cars={n_cars} ticks={ticks}")
+    for version in ("DOS", "REND32A"):
+        cfg = Config.for_version(version)
+        check(cfg, n_cars, ticks)
+        cold = time_ticks(cfg, n_cars, ticks, cache=False)
+        warm = time_ticks(cfg, n_cars, ticks, cache=True)
+        print(f"{version:8} decode all: {cold * 1e6:7.1f} us/tick   "
+              f"change-detected: {warm * 1e6:7.1f} us/tick  ({cold / warm:.2f}x)  ok")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
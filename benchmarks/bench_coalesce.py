@@ -0,0 +1,91 @@
+"""
+bench_coalesce.py
+
+Overlay staleness with and without frame coalescing (updater/mailbox.py).
+
+A RaceUpdater polls a synthetic backend in a worker QThread while the GUI-side
+slot simulates a slow paint (e.g. a column autosize) on every snapshot. For each
+mode this reports how many snapshots were painted, how many were dropped, how
+stale the painted snapshot was (ticks behind the newest read) at paint time, and
+the wall time until the GUI got round to the quit timer.
+Runs headless (QT_QPA_PLATFORM is not needed: only QtCore is used).
+
+Usage:
+    python -m benchmarks.bench_coalesce [seconds] [paint_ms] [poll_ms]
+"""
+
+import statistics
+import sys
+import time
+from typing import List
+
+from PyQt5 import QtCore
+
+from benchmarks.synthetic import FakeMemory, advance, build_race_image
+from core.config import Config
+from core.reader import MemoryReader
+from updater.updater import RaceUpdater
+
+
+class MovingMemory(FakeMemory):
+    """Synthetic backend whose cars move on every car-count read (once per tick)."""
+
+    def __init__(self, image, cfg: Config, n_cars: int):
+        super().__init__(image)
+        self._cfg, self._n_cars, self._tick = cfg, n_cars, 0
+
+    def read_into(self, exe_offset: int, buffer) -> int:
+        if exe_offset <= self._cfg.cars_addr < exe_offset + len(buffer):
+            self._tick += 1
+            advance(self.image, self._cfg, self._n_cars, self._tick)
+        return super().read_into(exe_offset, buffer)
+
+
+def run(app, coalesce: bool, seconds: float, paint_ms: int, poll_ms: int):
+    cfg = Config()
+    cfg.adaptive_poll = False
+    reader = MemoryReader(MovingMemory(build_race_image(cfg, 34), cfg, 34), cfg)
+    updater = RaceUpdater(reader, poll_ms=poll_ms, coalesce=coalesce)
+    staleness: List[int] = []
+    measuring = [True]
+
+    def paint(state):
+        if measuring[0]:
+            staleness.append(reader._tick - state.tick)
+            time.sleep(paint_ms / 1000)
+
+    updater.state_updated.connect(paint)
+    thread = QtCore.QThread()
+    updater.moveToThread(thread)
+    thread.start()
+    QtCore.QMetaObject.invokeMethod(updater, "start", QtCore.Qt.QueuedConnection)
+    QtCore.QTimer.singleShot(int(seconds * 1000), app.quit)
+    t0 = time.perf_counter()
+    app.exec_()
+    elapsed = time.perf_counter() - t0
+    QtCore.QMetaObject.invokeMethod(updater, "stop", QtCore.Qt.BlockingQueuedConnection)
+    thread.quit()
+    thread.wait()
+    # discard the snapshots still queued for the GUI so they don't leak into the next run
+    measuring[0] = False
+    app.processEvents()
+    dropped = updater.mailbox.dropped if updater.mailbox else 0
+    return elapsed, reader._tick, len(staleness), dropped, staleness
+
+
+def main(argv: List[str]) -> None:
+    seconds = float(argv[0]) if argv else 3.0
+    paint_ms = int(argv[1]) if len(argv) > 1 else 40
+    poll_ms = int(argv[2]) if len(argv) > 2 else 20
+
+    app = QtCore.QCoreApplication(sys.argv[:1])
+    print(f"{seconds:.0f} s, poll {poll_ms} ms, paint {paint_ms} ms per snapshot")
+    for coalesce in (False, True):
+        elapsed, ticks, painted, dropped, stale = run(app, coalesce, seconds, paint_ms, poll_ms)
+        label = "mailbox" if coalesce else "queued "
+        print(f"{label}  wall={elapsed:4.1f} s ticks={ticks:4d} painted={painted:4d} dropped={dropped:4d}  "
+              f"staleness median={statistics.median(stale):5.0f} max={max(stale):5d} ticks")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,153 @@
+"""
+bench_columnar_export.py
+
+ColumnarExporter (Parquet / Arrow IPC) vs. the CSV lap log, on a recorded
+synthetic race:
+
+  write   time in on_state_updated() per state (the GUI thread), time for close()
+          to write the last group and footers, file sizes: TelemetryLapLogger,
+          then the exporter with laps only and with 0.5 s telemetry
+  read    a notebook loading the lap and telemetry tables into typed NumPy
+          columns: csv module + conversion (the same rows written as CSV) vs.
+          pyarrow.parquet.read_table / a memory-mapped Arrow IPC file
+  check   the exported lap rows equal the CSV logger's
+
+Usage:
+    python -m benchmarks.bench_columnar_export [n_cars] [seconds_recorded]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from benchmarks.synthetic import record_race
+from core.columnar_export import ColumnarExporter, available
+from core.config import Config
+from core.telemetry_laps import TelemetryLapLogger
+
+HZ = 100
+LAP_FRAMES = 1000   # 10 s laps, so a short recording holds many lap rows
+
+
+def drive(consumer, states) -> float:
+    """Mean seconds per state spent in on_state_updated()."""
+    t0 = time.perf_counter()
+    for k, state in enumerate(states):
+        if isinstance(consumer, ColumnarExporter):
+            consumer.on_state_updated(state, 1_700_000_000 + k / HZ)
+        else:
+            consumer.on_state_updated(state)
+    return (time.perf_counter() - t0) / len(states)
+
+
+def csv_columns(path: str) -> dict:
+    """What a notebook does with a CSV: parse every row, then build typed columns."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+    columns = {}
+    for i, name in enumerate(header):
+        values = [r[i] for r in rows]
+        try:
+            columns[name] = np.array([int(v) if v else -1 for v in values])
+        except ValueError:
+            try:
+                columns[name] = np.array([float(v) for v in values])
+            except ValueError:
+                columns[name] = np.array(values)
+    return columns
+
+
+def write_csv(table, path: str) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(table.column_names)
+        writer.writerows(zip(*(table.column(n).to_pylist() for n in table.column_names)))
+
+
+def arrow_columns(table) -> dict:
+    return {name: table.column(name).to_numpy() for name in table.column_names
+            if name != "driver"}
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv: List[str]) -> None:
+    if not available():
+        print("pyarrow is not installed; nothing to benchmark")
+        return
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    n_cars = int(argv[0]) if argv else 34
+    seconds = int(argv[1]) if len(argv) > 1 else 120
+
+    cfg = Config()
+    with tempfile.TemporaryDirectory() as folder:
+        states = record_race(os.path.join(folder, "race.icr2rec"), cfg, n_cars, seconds * HZ, HZ,
+                             LAP_FRAMES, keep_states=True)
+        print(f"cars={n_cars} {seconds} s at {HZ} Hz ({len(states)} states)")
+
+        logger = TelemetryLapLogger(os.path.join(folder, "csv"))
+        per_state = drive(logger, states)
+        t0 = time.perf_counter()
+        logger.close()
+        close_ms = (time.perf_counter() - t0) * 1000
+        print(f"write  {'csv laps':<24} {per_state * 1e6:6.1f} us/state  close {close_ms:6.1f} ms  "
+              f"{os.path.getsize(logger.file_path) / 1e3:8.1f} kB")
+
+        exports = {}
+        for fmt in ("parquet", "arrow"):
+            for telemetry_s in (None, 0.5):
+                exporter = ColumnarExporter(os.path.join(folder, f"{fmt}_{telemetry_s}"), fmt,
+                                            telemetry_s=telemetry_s, laps_per_group=10)
+                per_state = drive(exporter, states)
+                t0 = time.perf_counter()
+                exporter.close()
+                close_ms = (time.perf_counter() - t0) * 1000
+                size = os.path.getsize(exporter.laps_path)
+                if exporter.telemetry_path:
+                    size += os.path.getsize(exporter.telemetry_path)
+                label = f"{fmt} laps" + (" + telemetry" if telemetry_s else "")
+                print(f"write  {label:<24} {per_state * 1e6:6.1f} us/state  close {close_ms:6.1f} ms  "
+                      f"{size / 1e3:8.1f} kB  ({exporter.laps_written} laps, "
+                      f"{exporter.samples_written} telemetry rows)")
+                exports[fmt, telemetry_s] = exporter
+        del states
+
+        parquet, arrow = exports["parquet", 0.5], exports["arrow", 0.5]
+        for kind, pq_path, ipc_path in (("laps", parquet.laps_path, arrow.laps_path),
+                                        ("telemetry", parquet.telemetry_path, arrow.telemetry_path)):
+            table = pq.read_table(pq_path)
+            csv_path = os.path.join(folder, f"{kind}.csv")
+            write_csv(table, csv_path)
+            t_csv = timed(lambda: csv_columns(csv_path))
+            t_pq = timed(lambda: arrow_columns(pq.read_table(pq_path)))
+            t_ipc = timed(lambda: arrow_columns(pa.ipc.open_file(pa.memory_map(ipc_path)).read_all()))
+            print(f"read   {kind:<9} {table.num_rows:7d} rows  csv {t_csv * 1000:8.1f} ms  "
+                  f"parquet {t_pq * 1000:6.1f} ms (x{t_csv / t_pq:.0f})  "
+                  f"arrow {t_ipc * 1000:6.1f} ms (x{t_csv / t_ipc:.0f})")
+
+        rows = csv_columns(logger.file_path)
+        laps = pq.read_table(parquet.laps_path)
+        same = (np.array_equal(rows["lap"], laps.column("lap").to_numpy())
+                and np.array_equal(rows["car_number"], laps.column("car_number").fill_null(-1).to_numpy())
+                and np.allclose(rows["last_lap_ms"], laps.column("last_lap_ms").to_numpy() / 1000.0))
+        print(f"check  lap rows vs csv     {'ok' if same else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,105 @@
+"""
+bench_dirty.py
+
+Checks and times per-car dirty tracking (RaceState.changed_cars / changed_fields).
+
+A synthetic race is polled where every car's telemetry moves each tick but only
+one car crosses the line every few ticks. The check asserts that:
+  • changed_fields["lap_clock"] holds exactly the cars that crossed the line
+  • BestLapTracker and TelemetryLapLogger fed the incremental change sets end up
+    with the same bests / CSV rows as a full pass over every car
+Then update_from_snapshot() is timed with and without the change sets.
+
+Usage:
+    python -m benchmarks.bench_dirty [n_cars] [ticks]
+"""
+
+import dataclasses
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+from analysis.best_laps import BestLapTracker
+from benchmarks.synthetic import FakeMemory, advance, build_race_image, complete_lap
+from core.config import Config
+from core.reader import MemoryReader
+from core.telemetry_laps import TelemetryLapLogger
+
+
+def record(cfg: Config, n_cars: int, ticks: int, seed: int = 1):
+    """Poll a synthetic race; returns the RaceStates and the cars that crossed per tick."""
+    rng = random.Random(seed)
+    image = build_race_image(cfg, n_cars)
+    reader = MemoryReader(FakeMemory(image), cfg)
+    states, crossed = [], []
+    for tick in range(ticks):
+        advance(image, cfg, n_cars, tick)
+        car = None
+        if tick and tick % 3 == 0:
+            car = rng.randrange(n_cars)
+            complete_lap(image, cfg, car, rng.randint(38_000, 42_000))
+        states.append(reader.read_race_state())
+        crossed.append(car)
+    return states, crossed
+
+
+def full_pass(state):
+    """The same RaceState with change tracking stripped (consumers scan every car)."""
+    return dataclasses.replace(state, changed_cars=None, changed_fields=None)
+
+
+def check(cfg: Config, n_cars: int, ticks: int) -> None:
+    states, crossed = record(cfg, n_cars, ticks)
+    assert states[0].changed_cars is None
+    for state, car in zip(states[1:], crossed[1:]):
+        expected = frozenset() if car is None else frozenset([car])
+        assert state.changed_fields["lap_clock"] == expected, (state.tick, car)
+        assert len(state.changed_cars) == n_cars  # telemetry moves every tick
+
+    incremental, full = BestLapTracker(), BestLapTracker()
+    for state in states:
+        incremental.update_from_snapshot(state)
+        full.update_from_snapshot(full_pass(state))
+    assert incremental.personal_bests == full.personal_bests
+    assert incremental.global_best_ms == full.global_best_ms
+
+    with tempfile.TemporaryDirectory() as tmp:
+        loggers = [TelemetryLapLogger(os.path.join(tmp, name)) for name in ("inc", "full")]
+        for state in states:
+            loggers[0].on_state_updated(state)
+            loggers[1].on_state_updated(full_pass(state))
+        rows = []
+        for logger in loggers:
+            logger.close()   # rows are written by a background thread
+            with open(logger.file_path) as f:
+                rows.append(f.read())
+        assert rows[0] == rows[1]
+
+
+def main(argv: List[str]) -> None:
+    n_cars = int(argv[0]) if argv else 34
+    ticks = int(argv[1]) if len(argv) > 1 else 2000
+
+    cfg = Config()
+    check(cfg, n_cars, 300)
+
+    states, _ = record(cfg, n_cars, ticks)
+    stripped = [full_pass(s) for s in states]
+    timings = {}
+    for label, feed in (("all cars", stripped), ("changed only", states)):
+        tracker = BestLapTracker()
+        t0 = time.perf_counter()
+        for state in feed:
+            tracker.update_from_snapshot(state)
+        timings[label] = (time.perf_counter() - t0) / ticks
+
+    print(f"cars={n_cars} ticks={ticks}  check ok")
+    for label, t in timings.items():
+        print(f"BestLapTracker.update_from_snapshot, {label:12}: {t * 1e6:6.2f} us/tick")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,92 @@
+"""
+bench_lap_logger.py
+
+Lap-event throughput of TelemetryLapLogger: open/append/close per lap (the old
+behaviour) vs. the buffered background writer.
+
+A synthetic field of n_cars crosses the line together every lap (the burst at the
+start of each lap), with a few quiet ticks in between. Reports the time spent in
+the state-update slot (the GUI thread) per burst and overall, lap events per
+second, and the time until every row is on disk after the last lap.
+
+Usage:
+    python -m benchmarks.bench_lap_logger [laps] [n_cars]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+from benchmarks.synthetic import FakeMemory, build_race_image, complete_lap
+from core.config import Config
+from core.reader import MemoryReader
+from core.telemetry_laps import TelemetryLapLogger
+
+
+class OpenPerRowLapLogger(TelemetryLapLogger):
+    """The previous write path: one open/csv.writer/close per lap crossing."""
+
+    def __init__(self, base_name: str):
+        super().__init__(base_name)
+        self._writer.close()
+
+    def _write_row(self, row) -> None:
+        with open(self.file_path, "a", newline="") as f:
+            csv.writer(f).writerow(row)
+
+    def close(self) -> None:
+        pass
+
+
+def build_states(laps: int, n_cars: int, quiet_ticks: int = 4):
+    cfg = Config()
+    image = build_race_image(cfg, n_cars)
+    reader = MemoryReader(FakeMemory(image), cfg)
+    states = [reader.read_race_state()]
+    for lap in range(laps):
+        for car in range(n_cars):
+            complete_lap(image, cfg, car, 40_000 + car * 10 + lap)
+        states.append(reader.read_race_state())
+        for _ in range(quiet_ticks):
+            states.append(reader.read_race_state())
+    return states
+
+
+def run(cls, states, folder: str) -> dict:
+    logger = cls(os.path.join(folder, cls.__name__))
+    bursts: List[float] = []
+    t_start = time.perf_counter()
+    for state in states:
+        t0 = time.perf_counter()
+        logger.on_state_updated(state)
+        bursts.append(time.perf_counter() - t0)
+    slot_total = time.perf_counter() - t_start
+    t0 = time.perf_counter()
+    logger.close()
+    drain = time.perf_counter() - t0
+    with open(logger.file_path, newline="") as f:
+        rows = sum(1 for _ in f) - 1
+    bursts.sort()
+    return {"rows": rows, "slot_s": slot_total, "worst_ms": bursts[-1] * 1000,
+            "p99_ms": bursts[len(bursts) * 99 // 100] * 1000, "drain_ms": drain * 1000}
+
+
+def main(argv: List[str]) -> None:
+    laps = int(argv[0]) if argv else 200
+    n_cars = int(argv[1]) if len(argv) > 1 else 34
+
+    states = build_states(laps, n_cars)
+    print(f"laps={laps} cars={n_cars} states={len(states)}")
+    with tempfile.TemporaryDirectory() as folder:
+        for label, cls in (("open per row", OpenPerRowLapLogger), ("buffered", TelemetryLapLogger)):
+            r = run(cls, states, folder)
+            print(f"{label:13} rows={r['rows']:6d} slot total={r['slot_s'] * 1000:8.1f} ms  "
+                  f"p99 tick={r['p99_ms']:6.3f} ms  worst={r['worst_ms']:6.2f} ms  "
+                  f"{r['rows'] / r['slot_s']:9.0f} laps/s  close={r['drain_ms']:5.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
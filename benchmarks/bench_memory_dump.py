@@ -0,0 +1,80 @@
+"""
+bench_memory_dump.py
+
+Checks that decoding a memory dump (core/memory_dump.py) is equivalent to a live
+read, for every game version in OFFSETS, and times both.
+
+For each version a synthetic race image (benchmarks.synthetic) is dumped with
+write_dump(); MemoryReader(DumpMemory(dump)).read_race_state() must equal
+MemoryReader(live).read_race_state() field for field, raw car blocks included.
+WINDY resolves its track through game_exe's TRACKS folder, so a temporary TRACKS
+tree is generated for it.
+
+Usage:
+    python -m benchmarks.bench_memory_dump [n_cars]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+from benchmarks.synthetic import build_race_image
+from core.config import OFFSETS, Config
+from core.memory_backend import BytearrayMemory
+from core.memory_dump import DumpMemory, write_dump
+from core.reader import MemoryReader
+from core.track_catalog import get_catalog
+
+READS = 200
+
+
+def make_tracks(root: str) -> None:
+    for folder, tname in (("INDY500", "Indianapolis"), ("CLEVLAND", "Cleveland"), ("MIAMI", "Miami")):
+        os.makedirs(os.path.join(root, folder))
+        with open(os.path.join(root, folder, f"{folder}.TXT"), "w") as f:
+            f.write(f"TNAME {tname}\n")
+
+
+def per_read_us(reader: MemoryReader) -> float:
+    t0 = time.perf_counter()
+    for _ in range(READS):
+        reader.read_race_state()
+    return (time.perf_counter() - t0) / READS * 1e6
+
+
+def main(argv: List[str]) -> None:
+    n_cars = int(argv[0]) if argv else 34
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracks = os.path.join(tmp, "TRACKS")
+        make_tracks(tracks)
+        # register the catalog with a private cache file before the readers ask for it
+        get_catalog(tracks, os.path.join(tmp, "track_catalog.ini")).wait()
+
+        for version in OFFSETS:
+            cfg = Config.for_version(version)
+            cfg.game_exe = os.path.join(tmp, "INDYCAR.EXE")
+            image = build_race_image(cfg, n_cars)
+            path = os.path.join(tmp, f"{version}.icr2dump")
+            regions = write_dump(BytearrayMemory(image), cfg, path)
+
+            live = MemoryReader(BytearrayMemory(image), cfg)
+            dump_memory = DumpMemory(path)
+            dump_cfg = dump_memory.config()
+            dump_cfg.game_exe = cfg.game_exe
+            dumped = MemoryReader(dump_memory, dump_cfg)
+            expected, got = live.read_race_state(), dumped.read_race_state()
+            assert got == expected, version
+            assert got.track_name, f"{version}: no track name"
+
+            t_live, t_dump = per_read_us(live), per_read_us(dumped)
+            print(f"{version:8} check ok  track={got.track_name:9} {len(regions)} regions, "
+                  f"{os.path.getsize(path) / 1e3:6.1f} kB  read: live {t_live:6.1f} us, "
+                  f"dump {t_dump:6.1f} us")
+            dump_memory.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,103 @@
+"""
+bench_model_memory.py
+
+Bytes retained per snapshot when a history of snapshots is kept (e.g. for lap
+analysis over a 500-lap race), measured with tracemalloc on a moving synthetic
+field:
+
+  dict dataclasses   the same models without __slots__, with each tick's driver
+                     names decoded into new str objects (how snapshots used to be built)
+  slotted            core.model as shipped: slotted frozen dataclasses, interned
+                     names, Driver objects shared between ticks
+  RaceSnapshot       the column-oriented snapshot (core/race_snapshot.py)
+
+Also prints per-instance sizes and the extrapolated cost of one snapshot per
+poll over a race.
+
+Usage:
+    python -m benchmarks.bench_model_memory [n_cars] [history] [poll_ms] [race_minutes]
+"""
+
+import sys
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from typing import List
+
+from benchmarks.synthetic import FakeMemory, advance, build_race_image
+from core.config import Config
+from core.model import CarState, Driver, RaceState
+from core.reader import MemoryReader
+
+
+def unslotted(cls):
+    """Frozen dataclass with cls's fields but a per-instance __dict__."""
+    return make_dataclass(f"Dict{cls.__name__}", [(f.name, f.type, f) for f in fields(cls)],
+                          frozen=True)
+
+
+DictDriver, DictCarState, DictRaceState = unslotted(Driver), unslotted(CarState), unslotted(RaceState)
+
+
+def as_dict_dataclasses(state: RaceState):
+    """The state rebuilt with unslotted models and freshly decoded (non-shared) names."""
+    drivers = {i: DictDriver(d.struct_index, d.name.encode().decode(), d.car_number)
+               for i, d in state.drivers.items()}
+    cars = {i: DictCarState(**{f.name: getattr(cs, f.name) for f in fields(CarState)})
+            for i, cs in state.car_states.items()}
+    kw = {f.name: getattr(state, f.name) for f in fields(RaceState)}
+    kw.update(drivers=drivers, car_states=cars)
+    return DictRaceState(**kw)
+
+
+def retained_per_snapshot(make, history: int) -> float:
+    make()
+    tracemalloc.start()
+    try:
+        kept = []
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(history):
+            kept.append(make())
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (after - before) / history
+
+
+def main(argv: List[str]) -> None:
+    n_cars = int(argv[0]) if argv else 34
+    history = int(argv[1]) if len(argv) > 1 else 500
+    poll_ms = int(argv[2]) if len(argv) > 2 else 250
+    race_minutes = float(argv[3]) if len(argv) > 3 else 180.0
+
+    cfg = Config()
+    image = build_race_image(cfg, n_cars)
+    reader = MemoryReader(FakeMemory(image), cfg)
+    tick = [0]
+
+    def moving(read):
+        def fn():
+            tick[0] += 1
+            advance(image, cfg, n_cars, tick[0])
+            return read()
+        return fn
+
+    runs = [
+        ("dict dataclasses", moving(lambda: as_dict_dataclasses(reader.read_race_state()))),
+        ("slotted", moving(reader.read_race_state)),
+        ("RaceSnapshot", moving(reader.read_snapshot)),
+    ]
+    state = reader.read_race_state()
+    legacy = as_dict_dataclasses(state)
+    print(f"cars={n_cars} history={history}")
+    print(f"per instance: CarState {sys.getsizeof(state.car_states[0])} B slotted vs. "
+          f"{sys.getsizeof(legacy.car_states[0]) + sys.getsizeof(legacy.car_states[0].__dict__)} B "
+          f"with __dict__")
+    snapshots = race_minutes * 60_000 / poll_ms
+    for label, make in runs:
+        per = retained_per_snapshot(make, history)
+        print(f"{label:17} {per / 1024:7.1f} KiB per snapshot, "
+              f"{per * snapshots / 2**20:8.1f} MiB for {race_minutes:.0f} min at {poll_ms} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,55 @@
+"""
+bench_pipeline.py
+
+Headless read -> decode -> overlay-analysis throughput on a synthetic backend.
+
+Each tick advances a RecordedMemory to the next frame, decodes a RaceState with
+MemoryReader and runs the analysis the running-order overlay does per update
+(best laps, gaps, compact names). No DOSBox, Windows or Qt needed.
+
+Usage:
+    python -m benchmarks.bench_pipeline [n_cars] [ticks]
+"""
+
+import sys
+import time
+from typing import List
+
+from analysis.best_laps import BestLapTracker
+from analysis.gap_utils import compute_gaps_display
+from analysis.name_utils import compute_compact_names
+from benchmarks.synthetic import advance, build_race_image
+from core.config import Config
+from core.memory_backend import RecordedMemory
+from core.reader import MemoryReader
+
+
+def main(argv: List[str]) -> None:
+    n_cars = int(argv[0]) if argv else 34
+    ticks = int(argv[1]) if len(argv) > 1 else 2000
+
+    cfg = Config()
+    image = build_race_image(cfg, n_cars)
+    frames = []
+    for tick in range(100):
+        advance(image, cfg, n_cars, tick)
+        frames.append(bytes(image))
+    mem = RecordedMemory(frames, loop=True)
+    reader = MemoryReader(mem, cfg)
+    bests = BestLapTracker()
+
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        mem.advance()
+        state = reader.read_race_state()
+        bests.update_from_snapshot(state)
+        compute_gaps_display(state)
+        compute_compact_names(state)
+    elapsed = time.perf_counter() - t0
+
+    print(f"cars={n_cars} ticks={ticks}")
+    print(f"{ticks / elapsed:8.0f} ticks/s  ({elapsed / ticks * 1e6:.0f} us/tick)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
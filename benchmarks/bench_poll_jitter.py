@@ -0,0 +1,86 @@
+"""
+bench_poll_jitter.py
+
+Tick-interval jitter of the polling engines against a synthetic backend:
+  sleep loop      time.sleep(interval) after each read (drifts by the read time)
+  qtimer          RaceUpdater on its worker QThread's PreciseTimer
+  thread          RaceUpdater with poll_engine = thread (deadline loop)
+  thread+spin     same, busy-waiting the last millisecond
+
+Reports p50/p99/max interval and missed deadlines. Headless (QtCore only).
+
+Usage:
+    python -m benchmarks.bench_poll_jitter [interval_ms] [seconds]
+"""
+
+import sys
+import time
+from typing import List
+
+from PyQt5 import QtCore
+
+from benchmarks.synthetic import FakeMemory, build_race_image
+from core.config import Config
+from core.reader import MemoryReader
+from updater.poll_thread import JitterStats
+from updater.updater import RaceUpdater
+
+
+def make_reader() -> MemoryReader:
+    cfg = Config()
+    cfg.adaptive_poll = False
+    return MemoryReader(FakeMemory(build_race_image(cfg, 34)), cfg)
+
+
+def sleep_loop(interval_ms: int, seconds: float) -> dict:
+    reader = make_reader()
+    stats = JitterStats()
+    end = time.perf_counter() + seconds
+    last = None
+    while time.perf_counter() < end:
+        now = time.perf_counter()
+        if last is not None:
+            stats.record((now - last) * 1000)
+        last = now
+        stats.ticks += 1
+        reader.read_race_state()
+        time.sleep(interval_ms / 1000)
+    return stats.snapshot()
+
+
+def updater_run(app, engine: str, busy_wait_ms: float, interval_ms: int, seconds: float) -> dict:
+    reader = make_reader()
+    reader._cfg.poll_busy_wait_ms = busy_wait_ms
+    updater = RaceUpdater(reader, poll_ms=interval_ms, engine=engine)
+    thread = QtCore.QThread()
+    updater.moveToThread(thread)
+    thread.start()
+    QtCore.QMetaObject.invokeMethod(updater, "start", QtCore.Qt.QueuedConnection)
+    QtCore.QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    QtCore.QMetaObject.invokeMethod(updater, "stop", QtCore.Qt.BlockingQueuedConnection)
+    thread.quit()
+    thread.wait()
+    return updater.poll_stats()
+
+
+def main(argv: List[str]) -> None:
+    interval_ms = int(argv[0]) if argv else 20
+    seconds = float(argv[1]) if len(argv) > 1 else 3.0
+
+    app = QtCore.QCoreApplication(sys.argv[:1])
+    runs = [
+        ("sleep loop", lambda: sleep_loop(interval_ms, seconds)),
+        ("qtimer", lambda: updater_run(app, "qtimer", 0.0, interval_ms, seconds)),
+        ("thread", lambda: updater_run(app, "thread", 0.0, interval_ms, seconds)),
+        ("thread+spin", lambda: updater_run(app, "thread", 1.0, interval_ms, seconds)),
+    ]
+    print(f"interval={interval_ms} ms, {seconds:.0f} s per engine")
+    for label, fn in runs:
+        st = fn()
+        print(f"{label:12} ticks={st['ticks']:5d} p50={st['p50_ms']:6.2f} p99={st['p99_ms']:6.2f} "
+              f"max={st['max_ms']:6.2f} ms  missed={st['missed']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
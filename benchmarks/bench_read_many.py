@@ -0,0 +1,68 @@
+"""
+bench_read_many.py
+
+N individual typed reads vs. one read_many() gather on the synthetic FakeMemory for
+each version layout, using the scattered header fields (car count, laps, track
+length, track name) plus the car-number and run-order tables. The gap threshold is
+Config.read_plan_max_gap.
+
+Each process read sleeps `latency_us` to stand in for a ReadProcessMemory syscall.
+
+Usage:
+    python -m benchmarks.bench_read_many [iterations] [latency_us]
+"""
+
+import sys
+import time
+import timeit
+from typing import List
+
+from benchmarks.synthetic import FakeMemory, build_race_image
+from core.config import Config, OFFSETS
+
+
+class SlowMemory(FakeMemory):
+    def __init__(self, image, latency_us: float):
+        super().__init__(image)
+        self.latency = latency_us / 1e6
+
+    def read_bytes(self, exe_offset: int, length: int) -> bytes:
+        time.sleep(self.latency)
+        return super().read_bytes(exe_offset, length)
+
+
+def main(argv: List[str]) -> None:
+    iterations = int(argv[0]) if argv else 200
+    latency_us = float(argv[1]) if len(argv) > 1 else 20.0
+    print(f"read latency {latency_us:.0f} us")
+
+    for version in OFFSETS:
+        cfg = Config.for_version(version)
+        mem = SlowMemory(build_race_image(cfg, 34), latency_us)
+        mem.read_many_max_gap = cfg.read_plan_max_gap
+        requests = [
+            (cfg.cars_addr, 'i32', 1),
+            (cfg.laps_addr, 'i32', 1),
+            (cfg.track_length_addr, 'i32', 1),
+            (cfg.current_track_addr, 'bytes', 4),
+            (cfg.car_numbers_base, 'i32', 34),
+            (cfg.run_order_base, 'i32', 34),
+        ]
+
+        individual = [mem.read(off, t, c) for off, t, c in requests]
+        assert mem.read_many(requests) == individual
+
+        mem.syscalls = 0
+        mem.read_many(requests)
+        gathered_reads = mem.syscalls
+
+        t_single = timeit.timeit(lambda: [mem.read(o, t, c) for o, t, c in requests], number=iterations)
+        t_many = timeit.timeit(lambda: mem.read_many(requests), number=iterations)
+
+        print(f"{version:8s} individual: {len(requests)} reads {t_single / iterations * 1e6:7.1f} us | "
+              f"read_many: {gathered_reads} reads {t_many / iterations * 1e6:7.1f} us "
+              f"({t_single / t_many:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,45 @@
+"""
+bench_read_plan.py
+
+Compares process reads per tick with and without the ReadPlan for every supported
+version layout, using the bytearray-backed FakeMemory.
+
+Usage:
+    python -m benchmarks.bench_read_plan [n_cars]
+"""
+
+import sys
+from typing import List
+
+from benchmarks.synthetic import FakeMemory, build_race_image
+from core.config import Config, OFFSETS
+from core.read_plan import ReadPlan
+from core.reader import MemoryReader
+
+
+def main(argv: List[str]) -> None:
+    n_cars = int(argv[0]) if argv else 34
+
+    for version in OFFSETS:
+        cfg = Config.for_version(version)
+        mem = FakeMemory(build_race_image(cfg, n_cars))
+        reader = MemoryReader(mem, cfg)
+
+        # unplanned: one read per field, like the original read_race_state()
+        mem.syscalls = 0
+        reader.read_raw_car_count()
+        reader.read_total_laps()
+        reader._read_names_full(n_cars)
+        reader._read_numbers_full(n_cars)
+        reader._read_laps_full(n_cars, 0)
+        reader._read_order_struct_indices(n_cars, n_cars - 1)
+        reader.read_track_length_miles()
+        mem.read(cfg.current_track_addr, 'bytes', count=4)  # current track (string or index)
+        unplanned = mem.syscalls
+
+        plan = ReadPlan(cfg, n_cars)
+        print(f"{version:8s} unplanned: {unplanned} reads | planned: {plan.describe()}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,130 @@
+"""
+bench_reader_process.py
+
+GUI-process cost of reading in-process vs. through the out-of-process reader
+(updater/reader_process.py) over a synthetic, moving backend:
+
+  in-process      MemoryReader.read_race_state() on every tick, as RaceUpdater does
+  ring state      ProcessPollCore.poll(): copy the newest ring slot into a RaceState
+  ring zero-copy  latest_slot() and sum one column straight from shared memory
+
+First checks that a snapshot survives the ring unchanged, then reports per-call
+cost in the consuming process, its CPU share while consuming at poll_ms, and the
+age of the snapshot when it was taken. Linux/macOS/Windows; no Qt needed.
+
+Usage:
+    python -m benchmarks.bench_reader_process [poll_ms] [seconds] [n_cars]
+"""
+
+import sys
+import time
+from typing import List
+
+from benchmarks.bench_coalesce import MovingMemory
+from benchmarks.synthetic import FakeMemory, build_race_image
+from core.config import Config
+from core.reader import MemoryReader
+from core.snapshot_ring import CAR_COLUMNS, SnapshotRing
+from updater.reader_process import ProcessPollCore, ReaderProcess
+
+DLONG = CAR_COLUMNS.index("dlong")
+
+
+def make_cfg() -> Config:
+    cfg = Config()
+    cfg.adaptive_poll = False
+    return cfg
+
+
+def moving_backend(n_cars: int) -> MovingMemory:
+    """Backend factory for the child process (module level so it pickles)."""
+    cfg = make_cfg()
+    return MovingMemory(build_race_image(cfg, n_cars), cfg, n_cars)
+
+
+def check_round_trip(n_cars: int) -> bool:
+    cfg = make_cfg()
+    reader = MemoryReader(FakeMemory(build_race_image(cfg, n_cars)), cfg)
+    ring = SnapshotRing(create=True)
+    try:
+        for _ in range(3):
+            state = reader.read_race_state()
+            ring.write(state)
+        back = ring.read_latest()
+        return back == state and back.tick == state.tick and back.changed_fields == state.changed_fields
+    finally:
+        ring.close()
+
+
+def consume(poll, poll_ms: int, seconds: float):
+    """Call poll() every poll_ms; returns (per-call us list, CPU share of the consumer)."""
+    costs: List[float] = []
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    end = wall0 + seconds
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        if poll():
+            costs.append((time.perf_counter() - t0) * 1e6)
+        time.sleep(poll_ms / 1000)
+    share = (time.process_time() - cpu0) / (time.perf_counter() - wall0)
+    return costs, share
+
+
+def report(label: str, costs: List[float], share: float, extra: str = "") -> None:
+    costs = sorted(costs)
+    p50 = costs[len(costs) // 2] if costs else float("nan")
+    print(f"{label:15} snapshots={len(costs):5d} per-call p50={p50:8.1f} us  "
+          f"consumer CPU={share * 100:5.1f}%{extra}")
+
+
+def main(argv: List[str]) -> None:
+    poll_ms = int(argv[0]) if argv else 10
+    seconds = float(argv[1]) if len(argv) > 1 else 3.0
+    n_cars = int(argv[2]) if len(argv) > 2 else 34
+
+    print(f"round trip through the ring: {'ok' if check_round_trip(n_cars) else 'MISMATCH'}")
+    print(f"poll={poll_ms} ms, {seconds:.0f} s per mode, {n_cars} cars")
+
+    reader = MemoryReader(moving_backend(n_cars), make_cfg())
+    costs, share = consume(lambda: reader.read_race_state(), poll_ms, seconds)
+    report("in-process", costs, share)
+
+    with ReaderProcess(moving_backend, {"n_cars": n_cars}, make_cfg(), poll_ms=poll_ms) as proc:
+        core = ProcessPollCore(proc)
+        ages: List[float] = []
+
+        def poll_state():
+            state = core.poll().state
+            if state is not None:
+                found = proc.ring.latest_slot()
+                if found is not None:
+                    ages.append((time.time() - float(found[2]["timestamp"])) * 1000)
+            return state is not None
+
+        time.sleep(0.5)   # let the child open the backend and publish
+        costs, share = consume(poll_state, poll_ms, seconds)
+        ages.sort()
+        age = f"  age p50={ages[len(ages) // 2]:.2f} ms" if ages else ""
+        report("ring state", costs, share, age)
+
+        seen = [(-1, 0)]
+
+        def poll_zero_copy():
+            found = proc.ring.latest_slot()
+            if found is None or found[:2] == seen[0]:
+                return False
+            index, seq, slot = found
+            n = int(slot["raw_count"])
+            int(slot["columns"][DLONG, :n].sum())
+            if not proc.ring.still_valid(index, seq):
+                return False
+            seen[0] = (index, seq)
+            return True
+
+        costs, share = consume(poll_zero_copy, poll_ms, seconds)
+        report("ring zero-copy", costs, share)
+        print(f"child published {proc.ring.published} snapshots")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
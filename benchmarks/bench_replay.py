@@ -0,0 +1,130 @@
+"""
+bench_replay.py
+
+The whole pipeline on a session recording, headless (no DOSBox, Windows or Qt).
+
+A synthetic race is recorded through SessionRecorder (benchmarks.synthetic.record_race),
+then replayed through ReplayPollCore:
+
+  check        as-fast-as-possible replay yields the recorded RaceStates, tick for tick
+  frames       ReplayMemory.advance() alone (delta decode per frame)
+  read         + MemoryReader.read_race_state() via ReplayPollCore.poll()
+  pipeline     + the running-order analysis (bench_pipeline) and TelemetryLapLogger
+  seek         ReplayPollCore.seek_lap() to a few laps (lap index lookup + decode)
+  pacing       replay position after one wall-clock second at 1x and 10x
+
+Usage:
+    python -m benchmarks.bench_replay [n_cars] [seconds_recorded]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+from analysis.best_laps import BestLapTracker
+from analysis.gap_utils import compute_gaps_display
+from analysis.name_utils import compute_compact_names
+from benchmarks.synthetic import record_race
+from core.config import Config
+from core.session_recorder import ReplayMemory, SessionRecording
+from core.telemetry_laps import TelemetryLapLogger
+from updater.replay import ReplayPollCore
+
+HZ = 100
+LAP_FRAMES = 3000   # 30 s laps
+
+
+def drain(core: ReplayPollCore, per_state=None) -> int:
+    n = 0
+    while True:
+        state = core.poll().state
+        if state is None:
+            return n
+        n += 1
+        if per_state is not None:
+            per_state(state)
+
+
+def main(argv: List[str]) -> None:
+    n_cars = int(argv[0]) if argv else 34
+    seconds = int(argv[1]) if len(argv) > 1 else 120
+
+    cfg = Config()
+    frames = seconds * HZ
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "race.icr2rec")
+        t0 = time.perf_counter()
+        states = record_race(path, cfg, n_cars, frames, HZ, LAP_FRAMES, keep_states=True)
+        print(f"cars={n_cars} recorded {seconds} s at {HZ} Hz ({frames} frames, "
+              f"{os.path.getsize(path) / 1e6:.2f} MB) in {time.perf_counter() - t0:.1f} s")
+
+        recording = SessionRecording(path)
+        t0 = time.perf_counter()
+        SessionRecording(path).close()
+        print(f"open + index   {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+        core = ReplayPollCore(recording, cfg, speed=None, adaptive=False)
+        replayed = []
+        drain(core, replayed.append)
+        same = len(replayed) == len(states) and all(
+            a == b and a.changed_fields == b.changed_fields for a, b in zip(replayed, states))
+        print(f"check          {'ok' if same else 'MISMATCH'} ({len(replayed)} states)")
+        del replayed, states
+
+        memory = ReplayMemory(recording)
+        t0 = time.perf_counter()
+        n = 1
+        while memory.advance():
+            n += 1
+        elapsed = time.perf_counter() - t0
+        print(f"frames         {n / elapsed:8.0f} frames/s  ({elapsed / n * 1e6:.0f} us/frame)")
+
+        core.seek(0)
+        t0 = time.perf_counter()
+        n = drain(core)
+        elapsed = time.perf_counter() - t0
+        print(f"read           {n / elapsed:8.0f} ticks/s   ({elapsed / n * 1e6:.0f} us/tick, "
+              f"x{n / elapsed / HZ:.0f} real time)")
+
+        bests = BestLapTracker()
+        logger = TelemetryLapLogger(os.path.join(folder, "laps"))
+
+        def analysis(state):
+            bests.update_from_snapshot(state)
+            compute_gaps_display(state)
+            compute_compact_names(state)
+            logger.on_state_updated(state)
+
+        core.seek(0)
+        t0 = time.perf_counter()
+        n = drain(core, analysis)
+        elapsed = time.perf_counter() - t0
+        logger.close()
+        print(f"pipeline       {n / elapsed:8.0f} ticks/s   ({elapsed / n * 1e6:.0f} us/tick, "
+              f"x{n / elapsed / HZ:.0f} real time), {logger._writer.rows_written} laps logged")
+
+        core.seek(0)
+        first = core.poll().state
+        base = max(first.car_states[i].laps_completed for i in range(1, first.raw_count))
+        for lap in (base + 1, base + seconds * HZ // LAP_FRAMES // 2, base + seconds * HZ // LAP_FRAMES):
+            t0 = time.perf_counter()
+            found = core.seek_lap(lap)
+            elapsed = time.perf_counter() - t0
+            where = f"frame {core.memory.index}" if found else "not recorded"
+            print(f"seek lap {lap:4d}  {elapsed * 1000:8.1f} ms  -> {where}")
+
+        for speed in (1.0, 10.0):
+            core.seek(0)
+            core.set_speed(speed)
+            t0 = time.perf_counter()
+            while time.perf_counter() - t0 < 1.0:
+                core.poll()
+                time.sleep(0.01)
+            print(f"pacing x{speed:<4.0f}   {core.position_s:6.2f} s of recording after 1 s")
+        recording.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
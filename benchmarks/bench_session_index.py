@@ -0,0 +1,149 @@
+"""
+bench_session_index.py
+
+The seek index at the end of a session recording (core/session_index.py).
+
+A synthetic race is recorded through SessionRecorder with a Config, so close()
+appends keyframes and lap crossings, then:
+
+  open       SessionRecording on the indexed file vs a copy with the index cut
+             off (record headers scanned instead)
+  rebuild    rebuild_index() on the cut copy and on a copy truncated mid-record:
+             time, and whether the rebuilt index equals the one the recorder wrote
+  laps       index.lap_frame() for the leader and for every car by number,
+             against the frame-by-frame truth and against the keyframe binary
+             search of an unindexed recording
+  seek       frame(i) at random frames, against decoding the file front to back,
+             and the data it returns against the same frames from iter_frames()
+
+Any mismatch fails the run (AssertionError).
+
+Usage:
+    python -m benchmarks.bench_session_index [n_cars] [seconds_recorded]
+"""
+
+import mmap
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from benchmarks.synthetic import record_race
+from core.config import Config
+from core.session_recorder import (SessionRecording, find_lap_frame, iter_frames, read_index,
+                                   rebuild_index)
+
+HZ = 100
+LAP_FRAMES = 3000   # 30 s laps
+
+
+def same_index(a, b) -> bool:
+    return (a.frames == b.frames and a.layouts == b.layouts
+            and np.array_equal(a.keyframes, b.keyframes) and np.array_equal(a.laps, b.laps))
+
+
+def timed_open(path: str):
+    t0 = time.perf_counter()
+    recording = SessionRecording(path)
+    return recording, (time.perf_counter() - t0) * 1000
+
+
+def main(argv: List[str]) -> None:
+    n_cars = int(argv[0]) if argv else 34
+    seconds = int(argv[1]) if len(argv) > 1 else 300
+
+    cfg = Config()
+    frames = seconds * HZ
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "race.icr2rec")
+        states = record_race(path, cfg, n_cars, frames, HZ, LAP_FRAMES, keep_states=True)
+        recording, open_ms = timed_open(path)
+        index = recording.index
+        print(f"cars={n_cars} {seconds} s at {HZ} Hz: {len(recording)} frames, "
+              f"{len(index.keyframes)} keyframes, {len(index.laps)} lap rows, "
+              f"{os.path.getsize(path) / 1e6:.2f} MB")
+
+        cut = os.path.join(folder, "cut.icr2rec")
+        shutil.copyfile(path, cut)
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            index_offset = read_index(mm)[1]
+        with open(cut, "r+b") as f:
+            f.truncate(index_offset)
+        plain, scan_ms = timed_open(cut)
+        print(f"open           {open_ms:8.1f} ms indexed, {scan_ms:.1f} ms scanning "
+              f"(indexed={recording.indexed}/{plain.indexed})")
+
+        t0 = time.perf_counter()
+        rebuilt = rebuild_index(cut)
+        rebuild_s = time.perf_counter() - t0
+        same = same_index(rebuilt, index)
+        print(f"rebuild        {rebuild_s:8.2f} s   same as written: {'ok' if same else 'MISMATCH'}")
+        assert same, "rebuilt index differs from the written one"
+
+        torn = os.path.join(folder, "torn.icr2rec")
+        shutil.copyfile(cut, torn)
+        with open(torn, "r+b") as f:
+            f.truncate(os.path.getsize(torn) * 2 // 3)
+        rebuilt = rebuild_index(torn)
+        with SessionRecording(torn) as r:
+            tail_ok = r.indexed and r.frame(len(r) - 1).data == recording.frame(len(r) - 1).data
+        print(f"truncated      {rebuilt.frames} of {len(recording)} frames indexed, "
+              f"last frame {'ok' if tail_ok else 'MISMATCH'}")
+        assert tail_ok, "truncated recording: last frame not reached through the index"
+
+        leader = np.array([max(s.car_states[i].laps_completed for i in range(1, s.raw_count))
+                           for s in states])
+        numbers = {i: d.car_number for i, d in states[0].drivers.items() if d.car_number is not None}
+        laps = np.array([[s.car_states[i].laps_completed for i in range(s.raw_count)] for s in states])
+        del states
+        wrong = 0
+        lookups = 0
+        t0 = time.perf_counter()
+        for lap in range(int(leader[0]), int(leader[-1]) + 2):
+            hits = np.flatnonzero(leader >= lap)
+            truth = int(hits[0]) if len(hits) else None
+            wrong += recording.index.lap_frame(lap) != truth
+            lookups += 1
+            for i, number in numbers.items():
+                hits = np.flatnonzero(laps[:, i] >= lap)
+                truth = int(hits[0]) if len(hits) else None
+                wrong += recording.index.lap_frame(lap, car_number=number) != truth
+                lookups += 1
+        lookup_us = (time.perf_counter() - t0) / lookups * 1e6
+        last = int(leader[-1])
+        t0 = time.perf_counter()
+        found = find_lap_frame(plain, cfg, last)
+        search_ms = (time.perf_counter() - t0) * 1000
+        search_ok = found == recording.index.lap_frame(last)
+        print(f"laps           {lookup_us:8.1f} us/lookup ({lookups} lookups, {wrong} wrong); "
+              f"unindexed search {search_ms:.1f} ms ({'ok' if search_ok else 'MISMATCH'})")
+        assert wrong == 0, f"{wrong} of {lookups} lap lookups wrong"
+        assert search_ok, f"unindexed search found frame {found} for lap {last}"
+
+        rng = random.Random(1)
+        picks = [rng.randrange(len(recording)) for _ in range(50)]
+        t0 = time.perf_counter()
+        seeked = {i: recording.frame(i).data for i in picks}
+        seek_ms = (time.perf_counter() - t0) / len(picks) * 1000
+        t0 = time.perf_counter()
+        for n, f in enumerate(iter_frames(path)):
+            if n == picks[0]:
+                break
+        scan_ms = (time.perf_counter() - t0) * 1000
+        wanted = set(picks)
+        bad = [n for n, f in enumerate(iter_frames(path)) if n in wanted and f.data != seeked[n]]
+        print(f"seek           {seek_ms:8.2f} ms/frame at random frames; "
+              f"{scan_ms:.0f} ms decoding up to frame {picks[0]} from the start; "
+              f"{len(picks) - len(bad)}/{len(picks)} match the sequential decode")
+        assert not bad, f"frame() differs from iter_frames() at frames {bad}"
+        plain.close()
+        recording.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,144 @@
+"""
+bench_session_recorder.py
+
+SessionRecorder at the full poll rate: 100 Hz x 40 cars (532-byte car blocks plus
+the other read-plan regions) recorded through MemoryReader, as with
+[recording] enabled = true.
+
+  paced       real-time 100 Hz ticks for a few seconds: per-tick cost of record()
+              on the polling thread (next to the cost of the read itself),
+              dropped frames, bytes per minute
+  throughput  frames/s the writer thread sustains when fed as fast as possible
+              (headroom over 100 Hz), decoded back with iter_frames() and compared
+
+Two fields: the synthetic field (DLONG and speed change every tick) and a noisy
+one where `noisy_fields` further int32 fields per car take random values every
+tick, a pessimistic stand-in for live telemetry.
+
+Usage:
+    python -m benchmarks.bench_session_recorder [seconds] [n_cars] [noisy_fields]
+"""
+
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from typing import List
+
+from benchmarks.synthetic import FakeMemory, advance, build_race_image, complete_lap
+from core.config import Config
+from core.reader import MemoryReader
+from core.session_recorder import SessionRecorder, available_codecs, iter_frames
+
+HZ = 100
+
+
+class Field:
+    """A synthetic race image plus a reader over it; step() moves it one tick."""
+
+    def __init__(self, cfg: Config, n_cars: int, noisy_fields: int, seed: int = 1):
+        self.cfg = cfg
+        self.n_cars = n_cars
+        self.image = build_race_image(cfg, n_cars)
+        self.reader = MemoryReader(FakeMemory(self.image), cfg)
+        self.rng = random.Random(seed)
+        n_fields = cfg.car_state_size // 4
+        self.noisy = self.rng.sample(range(40, n_fields), noisy_fields) if noisy_fields else []
+        self.tick = 0
+
+    def step(self):
+        self.tick += 1
+        advance(self.image, self.cfg, self.n_cars, self.tick)
+        for car in range(self.n_cars):
+            base = self.cfg.car_state_base + car * self.cfg.car_state_size
+            for f in self.noisy:
+                struct.pack_into("<i", self.image, base + f * 4, self.rng.randrange(-2**31, 2**31))
+        if self.tick % 4000 == 0:   # ~40 s laps at 100 Hz
+            for car in range(self.n_cars):
+                complete_lap(self.image, self.cfg, car, 40_000 + car)
+        return self.reader.read_race_state()
+
+
+def paced(cfg: Config, n_cars: int, noisy_fields: int, seconds: float, folder: str) -> dict:
+    field = Field(cfg, n_cars, noisy_fields)
+    recorder = SessionRecorder(os.path.join(folder, "paced.icr2rec"), version=cfg.version, cfg=cfg)
+    costs: List[float] = []
+    reads: List[float] = []
+    period = 1.0 / HZ
+    next_tick = time.perf_counter()
+    end = next_tick + seconds
+    while next_tick < end:
+        t0 = time.perf_counter()
+        field.step()
+        reads.append((time.perf_counter() - t0) * 1e6)
+        # the same call MemoryReader makes with reader.recorder set, timed on its own
+        t0 = time.perf_counter()
+        recorder.record(field.tick, field.reader.read_plan.spans,
+                        field.reader._buffers[field.reader._buf_index])
+        costs.append((time.perf_counter() - t0) * 1e6)
+        next_tick += period
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    recorder.close()
+    costs.sort()
+    reads.sort()
+    s = recorder.stats()
+    s.update(record_p50_us=costs[len(costs) // 2], record_p99_us=costs[len(costs) * 99 // 100],
+             record_max_us=costs[-1], read_p50_us=reads[len(reads) // 2])
+    return s
+
+
+def throughput(cfg: Config, n_cars: int, noisy_fields: int, frames: int, folder: str) -> dict:
+    field = Field(cfg, n_cars, noisy_fields)
+    path = os.path.join(folder, "throughput.icr2rec")
+    ticks = []
+    for _ in range(frames):
+        field.step()
+        plan, buffers = field.reader.read_plan, field.reader._buffers[field.reader._buf_index]
+        ticks.append((field.tick, plan.spans, [bytes(b) for b in buffers]))
+    sent = [b"".join(buffers) for _, _, buffers in ticks]
+
+    recorder = SessionRecorder(path, version=cfg.version, queue_frames=frames + 1, cfg=cfg)
+    t0 = time.perf_counter()
+    for i, (tick, spans, buffers) in enumerate(ticks):
+        # virtual 100 Hz timestamps, so keyframes and bytes/min match a real session
+        recorder.record(tick, spans, buffers, timestamp=i / HZ)
+    recorder.close(timeout=None)
+    drain = time.perf_counter() - t0
+    decoded = [f.data for f in iter_frames(path)]
+    s = recorder.stats()
+    s.update(drain_s=drain, round_trip=decoded == sent)
+    return s
+
+
+def main(argv: List[str]) -> None:
+    seconds = float(argv[0]) if argv else 5.0
+    n_cars = int(argv[1]) if len(argv) > 1 else 40
+    noisy_fields = int(argv[2]) if len(argv) > 2 else 16
+
+    cfg = Config()
+    frames = int(seconds * HZ)
+    print(f"{HZ} Hz, {n_cars} cars x {cfg.car_state_size} B, {seconds:.0f} s paced, "
+          f"codecs available: {', '.join(available_codecs())}")
+    with tempfile.TemporaryDirectory() as folder:
+        for label, noisy in (("synthetic", 0), (f"noisy ({noisy_fields} fields)", noisy_fields)):
+            p = paced(cfg, n_cars, noisy, seconds, folder)
+            t = throughput(cfg, n_cars, noisy, frames, folder)
+            raw_per_min = t["raw_bytes"] / t["duration_s"] * 60
+            print(f"{label}:")
+            print(f"  paced       record() p50={p['record_p50_us']:.1f} us "
+                  f"p99={p['record_p99_us']:.1f} us max={p['record_max_us']:.0f} us  "
+                  f"(tick read p50={p['read_p50_us']:.0f} us)  dropped={p['dropped']}  "
+                  f"{p['bytes_per_minute'] / 1e6:.2f} MB/min")
+            print(f"  throughput  {t['frames'] / t['drain_s']:8.0f} frames/s "
+                  f"(x{t['frames'] / t['drain_s'] / HZ:.0f} headroom)  "
+                  f"{t['bytes_per_minute'] / 1e6:.2f} MB/min vs {raw_per_min / 1e6:.0f} MB/min raw "
+                  f"(x{t['ratio']:.0f})  keyframes={t['keyframes']}  "
+                  f"round trip: {'ok' if t['round_trip'] else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
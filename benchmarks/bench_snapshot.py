@@ -0,0 +1,91 @@
+"""
+bench_snapshot.py
+
+RaceState (dict of CarState objects) vs. RaceSnapshot (NumPy columns) per tick:
+
+  read            read_race_state() vs. read_snapshot() on a moving synthetic field
+  retained        bytes kept alive per snapshot (tracemalloc, as bench_alloc)
+  gaps            compute_gaps_display() on each type (per-car loop vs. compute_gap_ms)
+  radar           AdaptivePollScheduler.is_hot() on each type
+  adapter         a pass over snapshot.car_states reading four CarView attributes,
+                  on a fresh snapshot (columns converted on first use) and repeated
+
+At ~34 cars NumPy's per-call overhead is comparable to the work itself, so the
+column helpers win against the adapter rather than against the dedicated
+per-car code; their payoff is in read cost, retained memory and batch analysis.
+
+Usage:
+    python -m benchmarks.bench_snapshot [n_cars] [iterations]
+"""
+
+import sys
+import time
+from typing import Callable, List
+
+from analysis.gap_utils import compute_gaps_display
+from benchmarks.bench_alloc import allocated_per_call
+from benchmarks.synthetic import FakeMemory, advance, build_race_image
+from core.config import Config
+from core.reader import MemoryReader
+from updater.poll_scheduler import AdaptivePollScheduler
+
+
+def per_call_us(fn: Callable, iterations: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+
+def main(argv: List[str]) -> None:
+    n_cars = int(argv[0]) if argv else 34
+    iterations = int(argv[1]) if len(argv) > 1 else 2000
+
+    cfg = Config()
+    image = build_race_image(cfg, n_cars)
+    reader = MemoryReader(FakeMemory(image), cfg)
+    tick = [0]
+
+    def moving(read):
+        def fn():
+            tick[0] += 1
+            advance(image, cfg, n_cars, tick[0])
+            return read()
+        return fn
+
+    read_state = moving(reader.read_race_state)
+    read_snap = moving(reader.read_snapshot)
+    state, snap = read_state(), read_snap()
+    # disable the line check so is_hot() scans the whole field for the radar window
+    scheduler = AdaptivePollScheduler(50, 10, 500, cfg=cfg)
+    scheduler.line_range = 0
+
+    def adapter_pass():
+        for car in snap.car_states.values():
+            car.laps_completed, car.lap_end_clock, car.car_status, car.dlong
+
+    def adapter_first_pass():
+        snap._lists.clear()
+        adapter_pass()
+
+    rows = [
+        ("read", per_call_us(read_state, iterations), per_call_us(read_snap, iterations)),
+        ("gaps", per_call_us(lambda: compute_gaps_display(state), iterations),
+         per_call_us(lambda: compute_gaps_display(snap), iterations)),
+        ("radar", per_call_us(lambda: scheduler.is_hot(state), iterations),
+         per_call_us(lambda: scheduler.is_hot(snap), iterations)),
+    ]
+    retained = (allocated_per_call(read_state, 200), allocated_per_call(read_snap, 200))
+
+    print(f"cars={n_cars} iterations={iterations}")
+    print(f"{'':8} {'RaceState':>12} {'RaceSnapshot':>14}")
+    for label, a, b in rows:
+        print(f"{label:8} {a:9.1f} us {b:11.1f} us   x{a / b:4.1f}")
+    print(f"{'retained':8} {retained[0] / 1024:8.1f} KiB {retained[1] / 1024:10.1f} KiB")
+    print(f"adapter  {per_call_us(adapter_first_pass, iterations):9.1f} us first pass, "
+          f"{per_call_us(adapter_pass, iterations):.1f} us repeated (over snapshot.car_states)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
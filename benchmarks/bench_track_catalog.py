@@ -0,0 +1,79 @@
+"""
+bench_track_catalog.py
+
+WINDY track detection: rescanning TRACKS (what read_current_track used to do on
+every index change) vs. the persistent TrackCatalog (core/track_catalog.py).
+
+A temporary TRACKS folder with N tracks is generated. Reported: one full scan, a
+cold catalog build, a warm start from track_catalog.ini (signature check only)
+and the per-tick lookup. Also checks that the catalog order matches the scan and
+that touching a .TXT invalidates the saved catalog.
+
+Usage:
+    python -m benchmarks.bench_track_catalog [n_tracks]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import timeit
+from typing import List
+
+from core.track_catalog import TrackCatalog, scan_tracks
+
+
+def make_tracks(root: str, n_tracks: int) -> None:
+    for i in range(n_tracks):
+        folder = f"TRK{i:04d}"
+        os.makedirs(os.path.join(root, folder))
+        with open(os.path.join(root, folder, f"{folder}.TXT"), "w") as f:
+            f.write("; track description\n" * 40)
+            f.write(f"TNAME Track {(i * 7919) % n_tracks:04d}\n")
+            f.write("SNAME x\n" * 40)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main(argv: List[str]) -> None:
+    n_tracks = int(argv[0]) if argv else 60
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "TRACKS")
+        cache = os.path.join(tmp, "track_catalog.ini")
+        make_tracks(root, n_tracks)
+
+        entries, t_scan = timed(lambda: scan_tracks(root))
+
+        def load():
+            catalog = TrackCatalog(root, cache).start()
+            catalog.wait()
+            return catalog
+
+        cold, t_cold = timed(load)
+        warm, t_warm = timed(load)
+        assert cold.entries == entries and warm.entries == entries
+
+        lookups = 100_000
+        t_lookup = timeit.timeit(lambda: warm.lookup(n_tracks // 2), number=lookups) / lookups
+
+        # editing a track description must invalidate the saved catalog
+        txt = os.path.join(root, entries[0][0], f"{entries[0][0]}.TXT")
+        with open(txt, "a") as f:
+            f.write("TNAME Aaa First\n")
+        os.utime(txt, ns=(time.time_ns() + 10**9,) * 2)
+        assert load().entries == scan_tracks(root)
+
+    print(f"tracks={n_tracks}  check ok")
+    print(f"full TRACKS scan:        {t_scan * 1e3:8.2f} ms")
+    print(f"catalog cold build:      {t_cold * 1e3:8.2f} ms (background thread, saved to disk)")
+    print(f"catalog warm start:      {t_warm * 1e3:8.2f} ms (signature check, loaded from disk)")
+    print(f"per-tick lookup:         {t_lookup * 1e6:8.3f} us")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
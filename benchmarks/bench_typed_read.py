@@ -0,0 +1,57 @@
+"""
+bench_typed_read.py
+
+Typed multi-value reads: the original "slice, build '<' + fmt * count, struct.unpack"
+path vs. the cached struct.Struct + unpack_from path, for one 133-int car block
+served from a BulkReader; plus read_bytes() vs. read_into() a reused bytearray.
+
+Usage:
+    python -m benchmarks.bench_typed_read [iterations]
+"""
+
+import struct
+import sys
+import timeit
+from typing import List
+
+from benchmarks.synthetic import build_race_image
+from core.config import Config
+from core.memory_backend import BytearrayMemory
+
+
+def main(argv: List[str]) -> None:
+    iterations = int(argv[0]) if argv else 20000
+
+    cfg = Config()
+    mem = BytearrayMemory(build_race_image(cfg, 34))
+    fields = cfg.car_state_size // 4
+    blob_len = 34 * cfg.car_state_size
+    br = mem.bulk(cfg.car_state_base, blob_len)
+    off = cfg.car_state_base + 5 * cfg.car_state_size
+
+    def legacy():
+        rel = off - br._base
+        raw = br._buf[rel:rel + fields * 4]
+        return list(struct.unpack("<" + ("i" * fields), raw))
+
+    def cached():
+        return br.read(off, 'i32', fields)
+
+    assert legacy() == cached()
+    t_legacy = timeit.timeit(legacy, number=iterations)
+    t_cached = timeit.timeit(cached, number=iterations)
+
+    reused = bytearray(blob_len)
+    t_bytes = timeit.timeit(lambda: mem.read_bytes(cfg.car_state_base, blob_len), number=iterations)
+    t_into = timeit.timeit(lambda: mem.read_into(cfg.car_state_base, reused), number=iterations)
+
+    print(f"i32 x {fields} from BulkReader:")
+    print(f"  format string + unpack:    {t_legacy / iterations * 1e6:6.2f} us")
+    print(f"  cached Struct.unpack_from: {t_cached / iterations * 1e6:6.2f} us  ({t_legacy / t_cached:.1f}x)")
+    print(f"car-state blob ({blob_len} bytes):")
+    print(f"  read_bytes (new bytes):     {t_bytes / iterations * 1e6:6.2f} us")
+    print(f"  read_into (reused buf):     {t_into / iterations * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
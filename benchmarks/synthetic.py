@@ -0,0 +1,144 @@
+"""
+synthetic.py
+
+Builds a fake ICR2 memory image laid out with the Config offsets so the reader
+pipeline can be exercised and benchmarked without DOSBox.
+"""
+
+import random
+import struct
+
+from core.config import Config
+from core.memory_backend import BytearrayMemory, MemoryBackend
+
+SENTINEL = 0xFF000000
+
+
+def build_race_image(cfg: Config, n_cars: int = 34, total_laps: int = 200,
+                     seed: int = 0) -> bytearray:
+    """Return an EXE-relative memory image holding a plausible race with n_cars slots."""
+    rng = random.Random(seed)
+    fields = cfg.car_state_size // 4
+    end = max(
+        cfg.car_state_base + n_cars * cfg.car_state_size,
+        cfg.driver_names_base + n_cars * cfg.entry_bytes_name,
+        cfg.car_numbers_base + (n_cars + 8) * 4,
+        cfg.run_order_base + n_cars * 4,
+        cfg.cars_addr + 4,
+        cfg.laps_addr + 4,
+        cfg.track_length_addr + 4,
+        cfg.current_track_addr + 256,
+    )
+    image = bytearray(end)
+
+    for i in range(n_cars):
+        name = f"Driver {i:02d}".encode("ascii")
+        slot = i + cfg.names_index_base + cfg.names_shift
+        if slot >= 0:
+            start = cfg.driver_names_base + slot * cfg.entry_bytes_name
+            image[start:start + len(name)] = name
+        slot = i + cfg.numbers_index_base + cfg.numbers_shift
+        if slot >= 0:
+            struct.pack_into("<i", image, cfg.car_numbers_base + slot * 4, i + 1)
+
+    order = list(range(n_cars))
+    rng.shuffle(order)
+    struct.pack_into(f"<{n_cars}i", image, cfg.run_order_base, *order)
+
+    for i in range(n_cars):
+        base = cfg.car_state_base + i * cfg.car_state_size
+        values = [rng.randint(-2**31, 2**31 - 1) for _ in range(fields)]
+        struct.pack_into(f"<{fields}i", image, base, *values)
+        clock_end = rng.randint(0, 2**32 - 1)
+        clock_start = (clock_end - rng.randint(30_000, 60_000)) & 0xFFFFFFFF
+        if i % 7 == 3:
+            clock_start = SENTINEL
+        if i % 11 == 5:
+            clock_end = SENTINEL
+        struct.pack_into("<I", image, base + cfg.field_lap_clock_start, clock_start)
+        struct.pack_into("<I", image, base + cfg.field_lap_clock_end, clock_end)
+        struct.pack_into("<I", image, base + cfg.current_lap, rng.randint(0, total_laps))
+        struct.pack_into("<I", image, base + cfg.field_laps_down, rng.choice([0, 0, 1, 3, 250]))
+        struct.pack_into("<I", image, base + cfg.car_status, rng.choice([0, 0, 0, 2, 16, 40]))
+        struct.pack_into("<I", image, base + cfg.current_lp, rng.randint(0, 3))
+
+    # header values last: with a large field the car blocks run into them
+    struct.pack_into("<i", image, cfg.cars_addr, n_cars)
+    struct.pack_into("<i", image, cfg.laps_addr, total_laps)
+    struct.pack_into("<i", image, cfg.track_length_addr, 2_500 * 5280 * 12 * 500 // 1000)
+    if cfg.version == "WINDY":
+        struct.pack_into("<i", image, cfg.current_track_addr, 0)
+    else:
+        image[cfg.current_track_addr:cfg.current_track_addr + 9] = b"INDY500\x00\x00"
+    return image
+
+
+def advance(image: bytearray, cfg: Config, n_cars: int, tick: int) -> None:
+    """Move every car forward a little (DLONG, field 18 speed) to emulate one poll tick."""
+    for i in range(n_cars):
+        base = cfg.car_state_base + i * cfg.car_state_size
+        struct.pack_into("<i", image, base + cfg.dlong, (tick * 1000 + i) & 0x7FFFFFFF)
+        struct.pack_into("<i", image, base + 18 * 4, 2_000_000 + tick + i)
+
+
+def complete_lap(image: bytearray, cfg: Config, car: int, lap_ms: int) -> None:
+    """Car `car` crosses the line: lap clocks roll forward by lap_ms, current lap + 1."""
+    base = cfg.car_state_base + car * cfg.car_state_size
+    end, = struct.unpack_from("<I", image, base + cfg.field_lap_clock_end)
+    if end == SENTINEL:
+        end = 0
+    lap, = struct.unpack_from("<I", image, base + cfg.current_lap)
+    struct.pack_into("<I", image, base + cfg.field_lap_clock_start, end)
+    struct.pack_into("<I", image, base + cfg.field_lap_clock_end, (end + lap_ms) & 0xFFFFFFFF)
+    struct.pack_into("<I", image, base + cfg.current_lap, lap + 1)
+
+
+class FakeMemory(BytearrayMemory):
+    """BytearrayMemory over a synthetic image that counts process reads (syscalls)."""
+
+    def __init__(self, image: bytearray):
+        super().__init__(image)
+        self.syscalls = 0
+
+    def read_bytes(self, exe_offset: int, length: int) -> bytes:
+        self.syscalls += 1
+        return super().read_bytes(exe_offset, length)
+
+    def read(self, exe_offset: int, type_name: str, count: int = 1):
+        # every typed read is one process read, as with ICR2Memory
+        return MemoryBackend.read(self, exe_offset, type_name, count)
+
+    def read_into(self, exe_offset: int, buffer) -> int:
+        self.syscalls += 1
+        return super().read_into(exe_offset, buffer)
+
+
+def record_race(path: str, cfg: Config, n_cars: int = 34, frames: int = 6000, hz: int = 100,
+                lap_frames: int = 4000, keyframe_interval_s: float = 10.0, keep_states: bool = False):
+    """
+    Drive a synthetic race through a MemoryReader with a SessionRecorder attached and
+    write it to `path` at virtual `hz` timestamps. Car i crosses the line every
+    lap_frames ticks, staggered by i ticks. Returns the decoded RaceStates if
+    keep_states, else the recorder (closed).
+    """
+    from core.reader import MemoryReader
+    from core.session_recorder import SessionRecorder
+
+    image = build_race_image(cfg, n_cars)
+    reader = MemoryReader(BytearrayMemory(image), cfg)
+    recorder = SessionRecorder(path, version=cfg.version, queue_frames=frames + 1,
+                               keyframe_interval_s=keyframe_interval_s, cfg=cfg)
+    states = []
+    start = 1_700_000_000.0
+    for tick in range(frames):
+        advance(image, cfg, n_cars, tick)
+        for car in range(n_cars):
+            if tick and (tick - car) % lap_frames == 0:
+                complete_lap(image, cfg, car, lap_frames * 1000 // hz + car)
+        state = reader.read_race_state()
+        recorder.record(state.tick, reader.read_plan.spans,
+                        reader._buffers[reader._buf_index], timestamp=start + tick / hz)
+        if keep_states:
+            states.append(state)
+    recorder.close(timeout=None)
+    return states if keep_states else recorder
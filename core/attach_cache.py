@@ -0,0 +1,106 @@
+"""
+attach_cache.py
+
+Persists the computed EXE base so restarting the overlay mid-session is near-instant.
+
+The record (exe_base, PID, process start time, version, window title) is stored in
+attach_cache.ini next to settings.ini. On the next start the record is only trusted
+if the PID still belongs to a process started at the same time, the version matches,
+and one 16-byte read at exe_base + signature_offset returns the signature.
+
+Nothing here touches Windows directly: the process start time and the memory read
+are passed in, so the logic works with a fake process reader.
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import configparser
+import os
+import sys
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(sys.argv[0]), "attach_cache.ini")
+
+
+@dataclass(frozen=True)
+class AttachRecord:
+    pid: int
+    start_time: int          # process creation time (FILETIME ticks on Windows)
+    version: str
+    exe_base: int
+    window_title: str = ""
+
+
+class AttachCache:
+    """Load/save/validate one AttachRecord in an INI file."""
+
+    SECTION = "attach"
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+
+    def load(self) -> Optional[AttachRecord]:
+        parser = configparser.ConfigParser(interpolation=None)
+        try:
+            if not parser.read(self.path) or not parser.has_section(self.SECTION):
+                return None
+            sec = parser[self.SECTION]
+            return AttachRecord(
+                pid=sec.getint("pid"),
+                start_time=sec.getint("start_time"),
+                version=sec.get("version", "").upper(),
+                exe_base=int(sec.get("exe_base"), 0),
+                window_title=sec.get("window_title", ""),
+            )
+        except Exception as e:
+            log.warning(f"Ignoring unreadable attach cache {self.path}: {e}")
+            return None
+
+    def save(self, record: AttachRecord) -> None:
+        parser = configparser.ConfigParser(interpolation=None)
+        parser[self.SECTION] = {
+            "pid": str(record.pid),
+            "start_time": str(record.start_time),
+            "version": record.version,
+            "exe_base": f"0x{record.exe_base:08X}",
+            "window_title": record.window_title,
+        }
+        try:
+            with open(self.path, "w") as f:
+                parser.write(f)
+        except OSError as e:
+            log.warning(f"Could not write attach cache {self.path}: {e}")
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log.warning(f"Could not remove attach cache {self.path}: {e}")
+
+    @staticmethod
+    def validate(record: AttachRecord, version: str, start_time: Optional[int],
+                 read: Callable[[int, int], bytes],
+                 signature_bytes: bytes, signature_offset: int) -> bool:
+        """
+        True if `record` still describes the running process: same version, same process
+        start time, and the signature is found at exe_base + signature_offset (one read).
+        """
+        if record.version != version.upper():
+            log.debug("Attach cache: version changed")
+            return False
+        if start_time is None or start_time != record.start_time:
+            log.debug("Attach cache: process start time differs (PID reused or game restarted)")
+            return False
+        try:
+            raw = read(record.exe_base + int(signature_offset), len(signature_bytes))
+        except Exception as e:
+            log.debug(f"Attach cache: signature read failed: {e}")
+            return False
+        if bytes(raw) != signature_bytes:
+            log.debug("Attach cache: signature mismatch at cached base")
+            return False
+        return True
@@ -0,0 +1,132 @@
+"""
+buffered_writer.py
+
+BufferedCsvWriter: appends CSV rows through one open file handle, off the caller's
+thread. write_row() only appends to an in-memory buffer; a background thread
+writes the buffer out when it holds flush_rows rows or when its oldest row has
+waited flush_interval_s, whichever comes first. flush() blocks until
+everything buffered so far is on disk; close() flushes and stops the thread, and
+also runs at interpreter exit for writers that were never closed.
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import atexit
+import csv
+import threading
+import time
+from typing import Iterable, List, Optional, Sequence
+
+
+class BufferedCsvWriter:
+    """CSV rows buffered in memory and written by a background thread."""
+
+    def __init__(self, path: str, header: Optional[Sequence] = None, flush_rows: int = 256,
+                 flush_interval_s: float = 1.0, mode: str = "w"):
+        self.path = path
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval_s = max(0.0, float(flush_interval_s))
+        self._file = open(path, mode, newline="")
+        self._csv = csv.writer(self._file)
+        if header is not None:
+            self._csv.writerow(header)
+            self._file.flush()
+
+        self._rows: List[Sequence] = []
+        self._cond = threading.Condition()
+        self._pending = 0          # rows handed to write_row() but not yet on disk
+        self._oldest = 0.0         # monotonic time the oldest buffered row arrived
+        self._flush_requested = False
+        self._closing = False
+        self.rows_written = 0
+        self.flushes = 0
+        self.error: Optional[str] = None
+
+        self._thread = threading.Thread(target=self._run, name="BufferedCsvWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def closed(self) -> bool:
+        return self._closing
+
+    def write_row(self, row: Sequence) -> None:
+        self.write_rows((row,))
+
+    def write_rows(self, rows: Iterable[Sequence]) -> None:
+        with self._cond:
+            if self._closing:
+                raise ValueError(f"write to closed writer {self.path}")
+            before = len(self._rows)
+            self._rows.extend(rows)
+            added = len(self._rows) - before
+            self._pending += added
+            if before == 0 and added:
+                # start the interval for this batch
+                self._oldest = time.monotonic()
+                self._cond.notify_all()
+            elif len(self._rows) >= self.flush_rows:
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write out everything buffered so far; False if it did not finish within timeout."""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._pending == 0 or not self._thread.is_alive(),
+                                       timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Flush the remaining rows, stop the thread and close the file (idempotent)."""
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            log.warning(f"BufferedCsvWriter: {self.path} did not flush within {timeout}s")
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not (self._closing or self._flush_requested
+                           or len(self._rows) >= self.flush_rows):
+                    if not self._rows:
+                        self._cond.wait()   # until rows arrive
+                        continue
+                    wait = self._oldest + self.flush_interval_s - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                rows, self._rows = self._rows, []
+                self._flush_requested = False
+                closing = self._closing
+            if rows:
+                self._write(rows)
+            with self._cond:
+                self._pending -= len(rows)
+                self._cond.notify_all()
+                if closing and not self._rows:
+                    break
+        try:
+            self._file.close()
+        except OSError as e:
+            log.error(f"BufferedCsvWriter: closing {self.path} failed: {e}")
+
+    def _write(self, rows: List[Sequence]) -> None:
+        try:
+            self._csv.writerows(rows)
+            self._file.flush()
+            self.rows_written += len(rows)
+            self.flushes += 1
+        except OSError as e:
+            # keep draining so flush()/close() never hang on a broken file
+            if str(e) != self.error:
+                log.error(f"BufferedCsvWriter: writing {self.path} failed: {e}")
+            self.error = str(e)
@@ -0,0 +1,438 @@
+"""
+columnar_export.py
+
+ColumnarExporter: lap events, and optionally sampled per-car telemetry, written as
+typed columns to Parquet or Arrow IPC files for post-race analysis (pandas/polars
+read them directly, no CSV parsing). Two files per session:
+
+    <base>_laps.parquet        one row per completed lap: the TelemetryLapLogger
+                               columns plus position, laps down, laps left, fuel,
+                               LP line and status
+    <base>_telemetry.parquet   one row per car every telemetry_s seconds (if set)
+
+(.arrow instead of .parquet for format="arrow"). Times are UTC timestamps, car
+numbers and positions are nullable ints, and driver names are dictionary-encoded
+(int16 codes into one dictionary that only grows). Rows are grouped per
+laps_per_group laps of the leader, aligned to multiples of it: each Parquet row
+group / Arrow record batch holds the rows logged while the leader was on the same
+laps in both files, so a notebook can read "leader laps 120-129" without
+decoding the rest.
+
+Driven like TelemetryLapLogger (connect on_state_updated to the updater's
+state_updated; RaceState and RaceSnapshot both work), or from a session recording
+with export_recording(). Rows are gathered as NumPy columns on the caller's
+thread; every finished group goes to a background thread that builds the Arrow
+batch and writes it. close() writes the last group and the file footers.
+
+pyarrow is optional: without it ColumnarExporter raises ImportError.
+
+Usage (export a recording):
+    python -m core.columnar_export session_....icr2rec [--format arrow] [--telemetry-s 0.5]
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import argparse
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.config import Config
+from core.race_snapshot import RaceSnapshot
+from core.reader import MemoryReader, ReadError
+from core.session_recorder import ReplayMemory, SessionRecording
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:   # optional; only needed for columnar export
+    pa = None
+    pq = None
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# stored column -> NumPy dtype (the reader's field types: the car-block fields are
+# u32 but for DLONG/DLAT, laps down and status are range-checked). "time" holds
+# epoch microseconds, "driver" the code into the driver-name dictionary; NULLABLE
+# columns hold -1 for a missing value.
+LAP_COLUMNS: Tuple[Tuple[str, type], ...] = (
+    ("time", np.int64), ("tick", np.uint64), ("lap_end_s", np.float64),
+    ("struct_index", np.uint8), ("car_number", np.int16), ("driver", np.int16),
+    ("lap", np.uint32), ("last_lap_ms", np.uint32), ("position", np.int16),
+    ("laps_down", np.uint8), ("laps_left", np.uint32), ("fuel_laps_remaining", np.uint32),
+    ("current_lp", np.uint32), ("car_status", np.uint8),
+)
+TELEMETRY_COLUMNS: Tuple[Tuple[str, type], ...] = (
+    ("time", np.int64), ("tick", np.uint64), ("struct_index", np.uint8),
+    ("car_number", np.int16), ("driver", np.int16), ("lap", np.uint32),
+    ("position", np.int16), ("laps_down", np.uint8), ("car_status", np.uint8),
+    ("current_lp", np.uint32), ("fuel_laps_remaining", np.uint32),
+    ("dlong", np.int32), ("dlat", np.int32), ("last_lap_ms", np.uint32),
+)
+NULLABLE = frozenset(("car_number", "position"))
+
+# stored column -> CarState attribute, for the per-car columns
+_CAR_FIELDS = {"lap": "laps_completed", "last_lap_ms": "last_lap_ms", "laps_down": "laps_down",
+               "laps_left": "laps_left", "fuel_laps_remaining": "fuel_laps_remaining",
+               "current_lp": "current_lp", "car_status": "car_status",
+               "dlong": "dlong", "dlat": "dlat"}
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def _arrow_schema(columns: Sequence[Tuple[str, type]]):
+    fields = []
+    for name, dtype in columns:
+        if name == "time":
+            typ = pa.timestamp("us", tz="UTC")
+        elif name == "driver":
+            typ = pa.dictionary(pa.int16(), pa.string())
+        else:
+            typ = pa.from_numpy_dtype(np.dtype(dtype))
+        fields.append(pa.field(name, typ, nullable=name in NULLABLE or name == "driver"))
+    return pa.schema(fields)
+
+
+class _TableWriter:
+    """One output file: Parquet row groups or Arrow IPC record batches."""
+
+    def __init__(self, path: str, columns, fmt: str, compression: Optional[str]):
+        self.path = path
+        self.columns = columns
+        self.schema = _arrow_schema(columns)
+        self.rows = 0
+        self.groups = 0
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(path, self.schema, compression=compression or "none")
+        else:
+            # the driver dictionary grows as drivers appear: later batches carry deltas
+            options = pa.ipc.IpcWriteOptions(compression=compression, emit_dictionary_deltas=True)
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema, options=options)
+        self._fmt = fmt
+
+    def write(self, chunk: Dict[str, np.ndarray], names: List[str]) -> None:
+        n = len(chunk["tick"])
+        if not n:
+            return
+        arrays = []
+        for name, _ in self.columns:
+            values = chunk[name]
+            if name == "time":
+                arrays.append(pa.array(values, pa.timestamp("us", tz="UTC")))
+            elif name == "driver":
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(values, mask=values < 0), pa.array(names, pa.string())))
+            elif name in NULLABLE:
+                arrays.append(pa.array(values, mask=values < 0))
+            else:
+                arrays.append(pa.array(values))
+        batch = pa.record_batch(arrays, schema=self.schema)
+        if self._fmt == "parquet":
+            self._writer.write_batch(batch, row_group_size=n)
+        else:
+            self._writer.write_batch(batch)
+        self.rows += n
+        self.groups += 1
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._fmt != "parquet":
+            self._sink.close()
+
+
+class _Columns:
+    """Rows gathered for one group: per column, a list of NumPy chunks."""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.chunks: Dict[str, List[np.ndarray]] = {name: [] for name, _ in columns}
+        self.rows = 0
+
+    def append(self, values: Dict[str, np.ndarray]) -> None:
+        for name, dtype in self.columns:
+            self.chunks[name].append(values[name].astype(dtype, copy=False))
+        self.rows += len(values["tick"])
+
+    def concat(self) -> Dict[str, np.ndarray]:
+        return {name: (np.concatenate(self.chunks[name]) if self.chunks[name]
+                       else np.empty(0, dtype))
+                for name, dtype in self.columns}
+
+
+class ColumnarExporter:
+    """Lap events and sampled telemetry to Parquet/Arrow files; see module docstring."""
+
+    def __init__(self, base_path: str, fmt: str = "parquet", telemetry_s: Optional[float] = None,
+                 laps_per_group: int = 10, compression: Optional[str] = "zstd"):
+        if pa is None:
+            raise ImportError("columnar export needs pyarrow (pip install pyarrow)")
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown export format {fmt!r} (expected one of {', '.join(FORMATS)})")
+        folder = os.path.dirname(base_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.laps_path = f"{base_path}_laps{FORMATS[fmt]}"
+        self.telemetry_path = f"{base_path}_telemetry{FORMATS[fmt]}" if telemetry_s else None
+        self.telemetry_s = telemetry_s
+        self.laps_per_group = max(1, int(laps_per_group))
+
+        self._laps_out = _TableWriter(self.laps_path, LAP_COLUMNS, fmt, compression)
+        self._telemetry_out = (_TableWriter(self.telemetry_path, TELEMETRY_COLUMNS, fmt, compression)
+                               if self.telemetry_path else None)
+        self._laps = _Columns(LAP_COLUMNS)
+        self._telemetry = _Columns(TELEMETRY_COLUMNS)
+        self._group_lap: Optional[int] = None   # first leader lap of the current group
+        self._next_sample = 0.0
+        self._last_end_clock: Dict[int, int] = {}   # struct_idx -> previous lap_end_clock
+        self._last_tick: Optional[int] = None
+
+        # driver name -> dictionary code; the names list only grows
+        self._codes: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._drivers_src = None
+        self._car_numbers = np.empty(0, np.int16)
+        self._driver_codes = np.empty(0, np.int16)
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self.error: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, name="ColumnarExporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        log.info(f"[ColumnarExport] Writing {self.laps_path}"
+                 + (f" and {self.telemetry_path}" if self.telemetry_path else ""))
+
+    @property
+    def laps_written(self) -> int:
+        return self._laps_out.rows
+
+    @property
+    def samples_written(self) -> int:
+        return self._telemetry_out.rows if self._telemetry_out else 0
+
+    def on_state_updated(self, state, timestamp: Optional[float] = None) -> None:
+        """Take one RaceState/RaceSnapshot, observed at `timestamp` (epoch seconds, default now)."""
+        if self._closed:
+            return
+        try:
+            if timestamp is None:
+                timestamp = time.time()
+            if state.raw_count < 2:
+                return
+            columns = None
+            since = self._last_tick
+            finished = self._finished_laps(state)
+            # the leader's lap (and so the group) can only move when some car's laps do
+            if since is None or state.changed_indices("laps", since_tick=since):
+                if isinstance(state, RaceSnapshot):
+                    leader = int(state.laps_completed[1:].max())
+                else:
+                    leader = max(state.car_states[i].laps_completed for i in range(1, state.raw_count))
+                if self._group_lap is None:
+                    self._group_lap = leader - leader % self.laps_per_group
+                elif leader >= self._group_lap + self.laps_per_group:
+                    self._end_group()
+                    self._group_lap = leader - leader % self.laps_per_group
+
+            if finished:
+                columns = self._state_columns(state, timestamp)
+                idx = np.array(finished, dtype=np.intp)
+                row = {name: values[idx] for name, values in columns.items()}
+                clocks = [state.car_states[i].lap_end_clock or 0 for i in finished]
+                row["lap_end_s"] = np.array(clocks, dtype=np.float64) / 1000.0
+                self._laps.append(row)
+
+            if self.telemetry_s and timestamp >= self._next_sample:
+                self._next_sample = timestamp + self.telemetry_s
+                if columns is None:
+                    columns = self._state_columns(state, timestamp)
+                self._telemetry.append(columns)
+        except Exception as e:
+            log.error(f"[ColumnarExport] Error exporting state: {e}")
+
+    def flush(self) -> None:
+        """Hand the rows gathered so far to the writer as a group of their own."""
+        self._end_group()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write the last group and the file footers (idempotent)."""
+        if self._closed:
+            return
+        self._end_group()
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            log.warning(f"[ColumnarExport] {self.laps_path} did not finish within {timeout}s")
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+        log.info(f"[ColumnarExport] Closed {self.laps_path} ({self.laps_written} laps, "
+                 f"{self.samples_written} telemetry rows, {self._laps_out.groups} groups)")
+
+    # --- gathering (caller's thread) ---
+
+    def _finished_laps(self, state) -> List[int]:
+        """Struct indices that completed a lap since the last state, as in TelemetryLapLogger."""
+        if self._last_tick is None:
+            indices = state.car_states.keys()
+        else:
+            indices = state.changed_indices("lap_clock", since_tick=self._last_tick)
+        self._last_tick = state.tick
+        finished = []
+        for idx in indices:
+            car = state.car_states.get(idx)
+            if not car or not car.last_lap_valid:
+                continue
+            prev_clock = self._last_end_clock.get(idx)
+            if prev_clock is not None and car.lap_end_clock == prev_clock:
+                continue  # same lap
+            self._last_end_clock[idx] = car.lap_end_clock
+            if car.last_lap_ms > 0:
+                finished.append(idx)
+        return finished
+
+    def _state_columns(self, state, timestamp: float) -> Dict[str, np.ndarray]:
+        """Every stored column except lap_end_s, one value per struct index."""
+        n = state.raw_count
+        if isinstance(state, RaceSnapshot):
+            columns = {name: getattr(state, attr) for name, attr in _CAR_FIELDS.items()}
+        else:
+            cars = [state.car_states[i] for i in range(n)]
+            columns = {name: np.array([getattr(c, attr) for c in cars], dtype=np.int64)
+                       for name, attr in _CAR_FIELDS.items()}
+        position = np.full(n, -1, dtype=np.int16)
+        for pos, idx in enumerate(state.order, 1):
+            if idx is not None and 0 <= idx < n:
+                position[idx] = pos
+        self._update_drivers(state)
+        columns.update(
+            time=np.full(n, int(timestamp * 1_000_000), dtype=np.int64),
+            tick=np.full(n, state.tick, dtype=np.uint64),
+            struct_index=np.arange(n, dtype=np.uint8),
+            car_number=self._car_numbers[:n],
+            driver=self._driver_codes[:n],
+            position=position,
+        )
+        return columns
+
+    def _update_drivers(self, state) -> None:
+        # the reader hands out the same drivers dict until names/numbers change
+        if state.drivers is self._drivers_src and len(self._car_numbers) >= state.raw_count:
+            return
+        self._drivers_src = state.drivers
+        n = state.raw_count
+        numbers = np.full(n, -1, dtype=np.int16)
+        codes = np.full(n, -1, dtype=np.int16)
+        for idx, driver in state.drivers.items():
+            if not 0 <= idx < n:
+                continue
+            if driver.car_number is not None:
+                numbers[idx] = driver.car_number
+            if driver.name:
+                code = self._codes.get(driver.name)
+                if code is None:
+                    code = self._codes[driver.name] = len(self._names)
+                    self._names.append(driver.name)
+                codes[idx] = code
+        self._car_numbers, self._driver_codes = numbers, codes
+
+    def _end_group(self) -> None:
+        if not (self._laps.rows or self._telemetry.rows):
+            return
+        self._queue.put((self._laps, self._telemetry, list(self._names)))
+        self._laps = _Columns(LAP_COLUMNS)
+        self._telemetry = _Columns(TELEMETRY_COLUMNS)
+
+    # --- writing (background thread) ---
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            laps, telemetry, names = item
+            try:
+                self._laps_out.write(laps.concat(), names)
+                if self._telemetry_out is not None:
+                    self._telemetry_out.write(telemetry.concat(), names)
+            except Exception as e:
+                # a failed group is lost, but later groups and the footers are still
+                # attempted; logging once per distinct error keeps a full disk quiet
+                if str(e) != self.error:
+                    log.error(f"[ColumnarExport] Writing {self.laps_path} failed: {e}")
+                self.error = str(e)
+        for out in (self._laps_out, self._telemetry_out):
+            if out is None:
+                continue
+            try:
+                out.close()
+            except Exception as e:
+                log.error(f"[ColumnarExport] Closing {out.path} failed: {e}")
+
+
+def export_recording(path: str, base_path: Optional[str] = None, cfg: Optional[Config] = None,
+                     fmt: str = "parquet", telemetry_s: Optional[float] = None,
+                     laps_per_group: int = 10, compression: Optional[str] = "zstd") -> ColumnarExporter:
+    """
+    Export a session recording (every frame, at its recorded timestamps) to
+    <base_path>_laps / _telemetry files, base_path defaulting to the recording's
+    path without extension. Returns the closed exporter.
+    """
+    if base_path is None:
+        base_path = os.path.splitext(path)[0]
+    with SessionRecording(path) as recording:
+        if cfg is None:
+            cfg = Config.for_version(recording.version) if recording.version else Config()
+        memory = ReplayMemory(recording)
+        reader = MemoryReader(memory, cfg)
+        exporter = ColumnarExporter(base_path, fmt, telemetry_s, laps_per_group, compression)
+        skipped = 0
+        try:
+            while True:
+                try:
+                    exporter.on_state_updated(reader.read_snapshot(), memory.timestamp)
+                except ReadError:
+                    skipped += 1   # e.g. recorded while no race was loaded
+                if not memory.advance():
+                    break
+        finally:
+            exporter.close()
+    if skipped:
+        log.warning(f"[ColumnarExport] {skipped} of {len(recording)} frames of {path} could not be read")
+    return exporter
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export a session recording to Parquet / Arrow IPC.")
+    parser.add_argument("path", help="recording (.icr2rec)")
+    parser.add_argument("--out", help="output base path (default: the recording's path without extension)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--telemetry-s", type=float,
+                        help="also write every car's telemetry at this interval (seconds)")
+    parser.add_argument("--laps-per-group", type=int, default=10, help="leader laps per row group")
+    parser.add_argument("--version", help="game version (default: the one stored in the recording)")
+    args = parser.parse_args()
+    cfg = Config.for_version(args.version) if args.version else None
+    t0 = time.perf_counter()
+    exporter = export_recording(args.path, args.out, cfg, args.format, args.telemetry_s,
+                                args.laps_per_group)
+    print(f"{exporter.laps_written} laps -> {exporter.laps_path}")
+    if exporter.telemetry_path:
+        print(f"{exporter.samples_written} telemetry rows -> {exporter.telemetry_path}")
+    print(f"in {time.perf_counter() - t0:.1f} s")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
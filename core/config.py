@@ -87,6 +87,35 @@ class Config:
 
     resize_throttle_ms: int = _parser.getint("overlay", "resize_throttle_ms", fallback=333)
 
+    # Adaptive polling: poll_min_ms during close racing / near the line (0 = half of
+    # poll_ms; poll_ms or more turns the boost off; never below the engine's floor,
+    # 20 ms for qtimer, 5 ms for thread), backing off towards poll_max_ms while
+    # snapshots are unchanged or reads fail
+    adaptive_poll: bool = _parser.getboolean("overlay", "adaptive_poll", fallback=True)
+    poll_min_ms: int = _parser.getint("overlay", "poll_min_ms", fallback=0)
+    poll_max_ms: int = _parser.getint("overlay", "poll_max_ms", fallback=500)
+    poll_line_range_lengths: int = _parser.getint("overlay", "poll_line_range_lengths", fallback=2)
+
+    # Frame coalescing: the worker publishes into a latest-value mailbox that the GUI
+    # drains at refresh_hz, so overlays only ever paint the newest snapshot
+    coalesce_frames: bool = _parser.getboolean("overlay", "coalesce_frames", fallback=True)
+    refresh_hz: int = _parser.getint("overlay", "refresh_hz", fallback=60)
+
+    # Polling engine: "qtimer" (worker QThread event loop) or "thread" (dedicated
+    # deadline-loop thread, optional busy-wait for the last poll_busy_wait_ms)
+    poll_engine: str = _parser.get("overlay", "poll_engine", fallback="qtimer").lower()
+    poll_busy_wait_ms: float = _parser.getfloat("overlay", "poll_busy_wait_ms", fallback=0.0)
+
+    # Read and decode in a separate process that publishes snapshots through a
+    # shared-memory ring; the GUI process only maps the newest snapshot
+    reader_process: bool = _parser.getboolean("overlay", "reader_process", fallback=False)
+
+    # Session recording: every tick's raw regions, delta-compressed into
+    # record_dir/session_<timestamp>.icr2rec (keyframe every record_keyframe_s)
+    record_sessions: bool = _parser.getboolean("recording", "enabled", fallback=False)
+    record_dir: str = _parser.get("recording", "dir", fallback="recordings")
+    record_keyframe_s: float = _parser.getfloat("recording", "keyframe_s", fallback=10.0)
+
     # Mapping knobs
     order_index_base: int = 0
     names_index_base: int = 0
@@ -98,6 +127,9 @@ class Config:
     max_cars: int = 200
     max_laps: int = 10000
 
+    # Read plan: regions closer than this many bytes are fetched in one read
+    read_plan_max_gap: int = _parser.getint("memory", "read_plan_max_gap", fallback=16 * 1024)
+
     # Overlay column widths
     col_widths: Dict[str, int] = field(default_factory=lambda: {
         "Pos": 28,
@@ -151,6 +183,18 @@ class Config:
     # Paths
     game_exe: str = _parser.get("paths", "game_exe", fallback="")
 
+    @classmethod
+    def for_version(cls, version: str) -> "Config":
+        """Config with the offset map of `version` instead of the INI one (e.g. to decode a dump)."""
+        version = version.upper()
+        if version not in OFFSETS:
+            raise ValueError(f"Unsupported memory version: {version}")
+        cfg = cls()
+        cfg.version = version
+        for k, v in OFFSETS[version].items():
+            object.__setattr__(cfg, k, v)
+        return cfg
+
     def __post_init__(self):
         version = _parser.get("memory", "version", fallback="REND32A").upper()
         self.version = version   # <-- add this
@@ -0,0 +1,53 @@
+"""
+decode_cache.py
+
+Change detection for the slow-moving regions MemoryReader decodes every tick.
+
+Names, car numbers, total laps, track length and track name almost never change
+between two polls. DecodeCache keeps the raw bytes each region was last decoded
+from together with the decoded value; when the new bytes compare equal (a direct
+memcmp against the previous copy) the cached value is returned and the decoder is
+not called. Hits and misses are counted per region.
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class DecodeCache:
+    """Per-region (raw bytes -> decoded value) memo with hit/miss counters."""
+
+    def __init__(self):
+        # region -> (raw bytes copy, key, decoded value)
+        self._entries: Dict[str, Tuple[bytes, Hashable, Any]] = {}
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def decode(self, region: str, raw, decoder: Callable[[Any], Any],
+               key: Optional[Hashable] = None):
+        """
+        Return decoder(raw), reusing the previous result for `region` if `raw` is
+        byte-identical to the last decoded bytes and `key` (extra decode inputs such
+        as the car count) is unchanged. `raw` may be a memoryview into a reused
+        buffer; a copy is kept only when the region is decoded again.
+        """
+        entry = self._entries.get(region)
+        if entry is not None and entry[1] == key and entry[0] == raw:
+            self.hits[region] += 1
+            return entry[2]
+        value = decoder(raw)
+        self._entries[region] = (bytes(raw), key, value)
+        self.misses[region] += 1
+        return value
+
+    def stats(self) -> Dict[str, Tuple[int, int]]:
+        """region -> (hits, misses)."""
+        regions = set(self.hits) | set(self.misses)
+        return {r: (self.hits[r], self.misses[r]) for r in sorted(regions)}
+
+    def clear(self) -> None:
+        """Forget all decoded values (counters are kept)."""
+        self._entries.clear()
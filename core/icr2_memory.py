@@ -2,15 +2,20 @@
 icr2_memory.py — Minimal, efficient typed memory reader for ICR2 inside DOSBox.
 
 What this module does:
-  • Attaches to DOSBox by window-title keywords and computes the ICR2 EXE base via signature scan.
-  • Provides one unified, typed read API: read(offset, type, count=1).
-  • Provides BulkReader to prefetch a contiguous region once and slice many fields (zero extra syscalls).
+  • Attaches to DOSBox by window-title keywords and computes the ICR2 EXE base via signature scan
+    (core/sigscan.py: region-type filtering, adaptive chunks, parallel regions, base hint).
+  • Implements MemoryBackend (core/memory_backend.py), so it shares the typed read API
+    read(offset, type, count=1) and BulkReader prefetch with the offline backends.
   • Provides read_blocks() for N×K table layouts with optional stride/padding.
   • Cleans up process handles and supports `with ICR2Memory(...) as mem:`.
 
+  • Persists the attach result (core/attach_cache.py) so a restart only re-validates it.
+
 Configurable via settings.ini:
   • memory.version = REND32A or DOS
   • memory.window_keywords = comma-separated window title substrings (case-insensitive)
+  • memory.attach_cache = true/false (default true)
+  • memory.read_many_max_gap = bytes a read_many() span may read through (default 4096)
 
 Signature bytes/offset are **not** configurable — they are fixed internally.
 """
@@ -23,8 +28,8 @@ log = logging.getLogger(__name__)
 
 import ctypes
 import ctypes.wintypes
-import struct
-from typing import List, Optional, Tuple
+import time
+from typing import List, Optional
 
 import pymem
 import win32gui
@@ -32,6 +37,11 @@ import win32process
 import os, configparser
 import sys
 
+from core.attach_cache import DEFAULT_CACHE_PATH, AttachCache, AttachRecord
+from core.memory_backend import BulkReader, MemoryBackend
+from core.sigscan import (MEM_IMAGE, MEM_PRIVATE, MemoryRegion, filter_regions,
+                          scan_regions, verify_hint)
+
 # ----------------------------
 # Config
 # ----------------------------
@@ -59,6 +69,23 @@ class MEMORY_BASIC_INFORMATION(ctypes.Structure):
         ('Type', ctypes.wintypes.DWORD),
     ]
 
+class FILETIME(ctypes.Structure):
+    _fields_ = [
+        ('dwLowDateTime', ctypes.wintypes.DWORD),
+        ('dwHighDateTime', ctypes.wintypes.DWORD),
+    ]
+
+
+def process_start_time(process_handle) -> Optional[int]:
+    """Process creation time as FILETIME ticks, or None if it cannot be queried."""
+    creation, exited, kernel, user = FILETIME(), FILETIME(), FILETIME(), FILETIME()
+    ok = ctypes.windll.kernel32.GetProcessTimes(process_handle,
+                                                ctypes.byref(creation), ctypes.byref(exited),
+                                                ctypes.byref(kernel), ctypes.byref(user))
+    if not ok:
+        return None
+    return (creation.dwHighDateTime << 32) | creation.dwLowDateTime
+
 
 # ----------------------------
 # Window discovery + signature
@@ -89,37 +116,12 @@ def find_pid_by_window_title(keywords: List[str]) -> Optional[dict]:
     return result if result['pid'] else None
 
 
-def _scan_region_chunked(pm: pymem.Pymem, start: int, size: int,
-                         needle: bytes, chunk_size: int = 64 * 1024) -> Optional[int]:
-    if size <= 0 or not needle:
-        return None
-    end = start + size
-    overlap = max(0, len(needle) - 1)
-    leftover = b""
-    pos = start
-    while pos < end:
-        to_read = min(chunk_size, end - pos)
-        try:
-            chunk = pm.read_bytes(pos, to_read)
-        except Exception:
-            pos += to_read
-            leftover = b""
-            continue
-        data = leftover + chunk
-        idx = data.find(needle)
-        if idx != -1:
-            return (pos - len(leftover)) + idx
-        leftover = data[-overlap:] if overlap else b""
-        pos += to_read
-    return None
-
-
-def find_pattern_address(pm: pymem.Pymem, pattern_bytes: bytes) -> Optional[int]:
-    if not pattern_bytes:
-        return None
+def enumerate_regions(pm: pymem.Pymem) -> List[MemoryRegion]:
+    """Return every committed, readable region of the process (with its MEM_* type)."""
     mbi = MEMORY_BASIC_INFORMATION()
     addr = 0
     VirtualQueryEx = ctypes.windll.kernel32.VirtualQueryEx
+    regions: List[MemoryRegion] = []
     while True:
         ok = VirtualQueryEx(pm.process_handle,
                             ctypes.c_void_p(addr),
@@ -129,11 +131,33 @@ def find_pattern_address(pm: pymem.Pymem, pattern_bytes: bytes) -> Optional[int]
             break
         region_size = int(mbi.RegionSize) or 0
         if (mbi.State == MEM_COMMIT) and (mbi.Protect & PAGE_READABLE) and (region_size > 0):
-            hit = _scan_region_chunked(pm, addr, region_size, pattern_bytes)
-            if hit is not None:
-                return hit
+            regions.append(MemoryRegion(addr, region_size, int(mbi.Type)))
         addr += region_size if region_size else 0x1000
-    return None
+    return regions
+
+
+def find_pattern_address(pm: pymem.Pymem, pattern_bytes: bytes,
+                         region_types: Optional[List[int]] = None,
+                         hint: Optional[int] = None,
+                         workers: int = 4) -> Optional[int]:
+    """
+    Locate pattern_bytes in the process. `hint` (an address) is verified first with a
+    single read; otherwise regions of `region_types` are scanned concurrently, and the
+    remaining regions only if that finds nothing.
+    """
+    if not pattern_bytes:
+        return None
+    if hint is not None and verify_hint(pm.read_bytes, hint, pattern_bytes):
+        return hint
+    regions = enumerate_regions(pm)
+    log.debug(f"Scanning {len(filter_regions(regions, region_types))} of {len(regions)} readable regions")
+    hit = scan_regions(regions, pm.read_bytes, pattern_bytes,
+                       region_types=region_types, workers=workers)
+    if hit is None and region_types is not None:
+        log.info("Signature not in the expected region types; scanning the rest")
+        rest = [r for r in regions if r.type not in region_types]
+        hit = scan_regions(rest, pm.read_bytes, pattern_bytes, workers=workers)
+    return hit
 
 class WindowNotFoundError(RuntimeError):
     """Raised when the target DOSBox/ICR2 window cannot be found."""
@@ -145,24 +169,24 @@ class WindowNotFoundError(RuntimeError):
 # Main reader
 # ----------------------------
 
-class ICR2Memory:
-    TYPE_MAP: dict[str, Tuple[str, int]] = {
-        'u8':  ('<B', 1),
-        'i8':  ('<b', 1),
-        'u16': ('<H', 2),
-        'i16': ('<h', 2),
-        'u32': ('<I', 4),
-        'i32': ('<i', 4),
-        'f32': ('<f', 4),
-        'f64': ('<d', 8),
-    }
+class ICR2Memory(MemoryBackend):
+    # kept for callers that still spell it ICR2Memory.BulkReader(mem, offset, length)
+    BulkReader = BulkReader
 
     def __init__(self,
                  version: str = None,
                  signature_bytes: Optional[bytes] = None,
                  signature_offset: Optional[int] = None,
                  window_keywords: Optional[List[str]] = None,
-                 verbose: bool = True):
+                 verbose: bool = True,
+                 exe_base_hint: Optional[int] = None,
+                 attach_cache_path: Optional[str] = DEFAULT_CACHE_PATH):
+
+        t_start = time.perf_counter()
+        self.pm = None
+        self.exe_base = None
+        self.read_many_max_gap = _parser.getint("memory", "read_many_max_gap",
+                                                fallback=MemoryBackend.read_many_max_gap)
 
         # Load from INI
         ini_version = _parser.get("memory", "version", fallback=None)
@@ -177,19 +201,30 @@ class ICR2Memory:
             window_keywords = window_keywords or ["dosbox", "cart"]
             signature_bytes = bytes.fromhex("6C 69 63 65 6E 73 65 20 77 69 74 68 20 42 6F 62")
             signature_offset = int("B1C0C", 16)
+            region_types = [MEM_PRIVATE]  # DOSBox emulated RAM is a private allocation
         elif v == "DOS":
             window_keywords = window_keywords or ["dosbox", "indycar"]
             signature_bytes = bytes.fromhex("6C 69 63 65 6E 73 65 20 77 69 74 68 20 42 6F 62")
             signature_offset = int("A0D78", 16)
+            region_types = [MEM_PRIVATE]
         elif v == "WINDY":
             window_keywords = window_keywords or ["cart racing"]
             signature_bytes = bytes.fromhex("6C 69 63 65 6E 73 65 20 77 69 74 68 20 42 6F 62")
             signature_offset = int("4E2199", 16)
+            region_types = [MEM_IMAGE, MEM_PRIVATE]  # native exe: signature lives in the image
 
         else:
             log.warning(f"Unsupported version '{v}' in settings.ini")
             raise ValueError("version must be 'DOS' or 'REND32A' or 'WINDY")
 
+        use_cache = attach_cache_path and _parser.getboolean("memory", "attach_cache", fallback=True)
+        cache = AttachCache(attach_cache_path) if use_cache else None
+        record = cache.load() if cache else None
+        if record is not None and self._attach_from_cache(record, v, signature_bytes, signature_offset):
+            log.info(f"Attached from cache: PID={self.pid}, EXE base 0x{self.exe_base:08X} "
+                     f"(startup {(time.perf_counter() - t_start) * 1000:.1f} ms)")
+            return
+
         log.info(f"Searching for window with keywords {window_keywords}")
         info = find_pid_by_window_title(window_keywords)
         if not info:
@@ -212,7 +247,10 @@ class ICR2Memory:
 
         log.debug("Scanning process memory for version signature...")
 
-        hit = find_pattern_address(self.pm, signature_bytes)
+        if exe_base_hint is None and record is not None and record.pid == info['pid']:
+            exe_base_hint = record.exe_base
+        hint = None if exe_base_hint is None else exe_base_hint + int(signature_offset)
+        hit = find_pattern_address(self.pm, signature_bytes, region_types, hint=hint)
         if not hit:
             log.error("Signature not found — memory attach failed.")
             raise RuntimeError("Signature not found in process memory")
@@ -223,6 +261,37 @@ class ICR2Memory:
 
         log.info(f"Signature found at 0x{hit:08X}, EXE base set to 0x{self.exe_base:08X}")
 
+        if cache is not None:
+            start_time = process_start_time(self.pm.process_handle)
+            if start_time is not None:
+                cache.save(AttachRecord(self.pid, start_time, v, self.exe_base, self.window_title))
+        log.info(f"Attached by window search + signature scan "
+                 f"(startup {(time.perf_counter() - t_start) * 1000:.1f} ms)")
+
+    def _attach_from_cache(self, record: AttachRecord, version: str,
+                           signature_bytes: bytes, signature_offset: int) -> bool:
+        """Reopen the cached PID and accept the cached EXE base if it still validates."""
+        pm = pymem.Pymem()
+        try:
+            pm.open_process_from_id(record.pid)
+        except Exception as e:
+            log.debug(f"Attach cache: cannot open PID {record.pid}: {e}")
+            return False
+        start_time = process_start_time(pm.process_handle)
+        if not AttachCache.validate(record, version, start_time, pm.read_bytes,
+                                    signature_bytes, signature_offset):
+            log.info("Attach cache is stale; falling back to a full scan")
+            try:
+                pm.close_process()
+            except Exception:
+                pass
+            return False
+        self.pm = pm
+        self.exe_base = record.exe_base
+        self.pid = record.pid
+        self.window_title = record.window_title
+        return True
+
     # --- lifecycle / context management ---
 
     def close(self) -> None:
@@ -247,70 +316,44 @@ class ICR2Memory:
         self.close()
         return False
 
-    # --- typed read ---
+    # --- raw read (MemoryBackend) ---
 
-    def read(self, exe_offset: int, type_name: str, count: int = 1):
+    def read_bytes(self, exe_offset: int, length: int) -> bytes:
         if self.exe_base is None or self.pm is None:
             raise RuntimeError("Process not attached")
-        addr = self.exe_base + int(exe_offset)
-        if type_name == 'bytes':
-            return self.pm.read_bytes(addr, count)
-        fmt, size = self.TYPE_MAP[type_name]
-        if count == 1:
-            raw = self.pm.read_bytes(addr, size)
-            return struct.unpack(fmt, raw)[0]
-        raw = self.pm.read_bytes(addr, size * count)
-        full_fmt = "<" + (fmt[1:] * count)
-        return list(struct.unpack(full_fmt, raw))
-
-    # ----------------------------
-    # Bulk prefetch (contiguous)
-    # ----------------------------
-
-    class BulkReader:
-        def __init__(self, icr2mem: "ICR2Memory", base_exe_offset: int, length: int):
-            if icr2mem.exe_base is None or icr2mem.pm is None:
-                raise RuntimeError("Process not attached")
-            self._m = icr2mem
-            self._base = int(base_exe_offset)
-            self._len = int(length)
-            self._buf = icr2mem.pm.read_bytes(icr2mem.exe_base + self._base, self._len)
-
-        def __enter__(self): return self
-        def __exit__(self, exc_type, exc, tb): return False
-
-        def _slice(self, exe_offset: int, size: int) -> bytes:
-            rel = int(exe_offset) - self._base
-            if rel < 0 or rel + size > self._len:
-                raise ValueError("BulkReader slice out of range")
-            return self._buf[rel:rel + size]
-
-        def read(self, exe_offset: int, type_name: str, count: int = 1):
-            if type_name == 'bytes':
-                return self._slice(exe_offset, count)
-            fmt, size = ICR2Memory.TYPE_MAP[type_name]
-            if count == 1:
-                raw = self._slice(exe_offset, size)
-                return struct.unpack(fmt, raw)[0]
-            raw = self._slice(exe_offset, size * count)
-            full_fmt = "<" + (fmt[1:] * count)
-            return list(struct.unpack(full_fmt, raw))
+        return self.pm.read_bytes(self.exe_base + int(exe_offset), length)
+
+    def read_into(self, exe_offset: int, buffer) -> int:
+        """ReadProcessMemory straight into a writable buffer (no intermediate bytes)."""
+        if self.exe_base is None or self.pm is None:
+            raise RuntimeError("Process not attached")
+        view = memoryview(buffer).cast('B')
+        n = len(view)
+        c_buf = (ctypes.c_char * n).from_buffer(view)
+        n_read = ctypes.c_size_t(0)
+        ok = ctypes.windll.kernel32.ReadProcessMemory(self.pm.process_handle,
+                                                      ctypes.c_void_p(self.exe_base + int(exe_offset)),
+                                                      c_buf, n, ctypes.byref(n_read))
+        del c_buf
+        if not ok:
+            raise ctypes.WinError()
+        return n_read.value
 
 
 # ----------------------------
 # Utilities
 # ----------------------------
 
-def read_blocks(mem: ICR2Memory, base_exe_offset: int,
+def read_blocks(mem: MemoryBackend, base_exe_offset: int,
                 n_blocks: int, values_per_block: int,
                 type_name: str = 'i32',
                 stride_bytes: Optional[int] = None) -> List[List[int]]:
-    _, tsize = ICR2Memory.TYPE_MAP[type_name]
+    _, tsize = MemoryBackend.TYPE_MAP[type_name]
     block_size = values_per_block * tsize
     stride = block_size if stride_bytes is None else int(stride_bytes)
     total_span = (n_blocks - 1) * stride + block_size
     out: List[List[int]] = []
-    with ICR2Memory.BulkReader(mem, base_exe_offset, total_span) as br:
+    with mem.bulk(base_exe_offset, total_span) as br:
         for j in range(n_blocks):
             off = base_exe_offset + j * stride
             out.append(br.read(off, type_name, values_per_block))
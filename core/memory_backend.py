@@ -0,0 +1,275 @@
+"""
+memory_backend.py — Memory-source protocol shared by the live reader and offline backends.
+
+What this module does:
+  • Defines MemoryBackend: subclasses implement read_bytes(exe_offset, length); the typed
+    read(offset, type, count), bulk() prefetch and read_many() gather API are shared.
+  • Provides BulkReader to prefetch a contiguous region once and slice many fields.
+  • Provides backends that need neither Windows nor a running game:
+      - BytearrayMemory: an in-memory image (tests, synthetic benchmarks)
+      - FileMemory: a raw EXE-relative memory image file, mmap'd
+      - RecordedMemory: a sequence of images replayed one tick at a time
+
+ICR2Memory (core/icr2_memory.py) is the live DOSBox/Windows implementation.
+"""
+
+from __future__ import annotations
+
+import logging
+log = logging.getLogger(__name__)
+
+import bisect
+import functools
+import mmap
+import struct
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+# compiled struct.Struct objects kept per (type, count)
+STRUCT_CACHE_SIZE = 128
+
+TYPE_MAP: dict[str, Tuple[str, int]] = {
+    'u8':  ('<B', 1),
+    'i8':  ('<b', 1),
+    'u16': ('<H', 2),
+    'i16': ('<h', 2),
+    'u32': ('<I', 4),
+    'i32': ('<i', 4),
+    'f32': ('<f', 4),
+    'f64': ('<d', 8),
+}
+
+
+def merge_spans(ranges: Sequence[Tuple[int, int]], max_gap: int) -> List[Tuple[int, int]]:
+    """
+    Merge (offset, length) ranges into sorted (offset, length) spans.
+    Ranges that overlap or are separated by at most max_gap bytes share a span.
+    """
+    spans: List[Tuple[int, int]] = []
+    for off, length in sorted(r for r in ranges if r[1] > 0):
+        if spans:
+            s_off, s_len = spans[-1]
+            s_end = s_off + s_len
+            if off - s_end <= max_gap:
+                spans[-1] = (s_off, max(s_end, off + length) - s_off)
+                continue
+        spans.append((off, length))
+    return spans
+
+
+def type_size(type_name: str, count: int = 1) -> int:
+    """Byte size of `count` values of `type_name` ('bytes' counts bytes)."""
+    if type_name == 'bytes':
+        return int(count)
+    return TYPE_MAP[type_name][1] * int(count)
+
+
+@functools.lru_cache(maxsize=STRUCT_CACHE_SIZE)
+def compiled_struct(type_name: str, count: int = 1) -> struct.Struct:
+    """Compiled little-endian struct for `count` values of `type_name` (bounded LRU)."""
+    fmt, _ = TYPE_MAP[type_name]
+    return struct.Struct(f"<{count}{fmt[1:]}")
+
+
+def unpack_from(buf, offset: int, type_name: str, count: int = 1):
+    """Decode in place from `buf` at `offset`, the way MemoryBackend.read() returns values."""
+    if type_name == 'bytes':
+        return buf[offset:offset + count]
+    values = compiled_struct(type_name, count).unpack_from(buf, offset)
+    return values[0] if count == 1 else list(values)
+
+
+class MemoryBackend(ABC):
+    """
+    Abstract EXE-relative memory source.
+
+    Subclasses implement read_bytes(); everything MemoryReader needs is built on it:
+      • read(offset, type, count)       — typed read ('bytes', 'i32', 'u16', ...)
+      • bulk(offset, length)            — BulkReader over one contiguous prefetch
+      • read_many([(offset, type, count), ...]) — gather read: requests are grouped into
+        the fewest contiguous spans (gaps up to read_many_max_gap bytes are read through),
+        one read per span, all values decoded and returned in request order
+    """
+    TYPE_MAP = TYPE_MAP
+    read_many_max_gap: int = 4096
+
+    @abstractmethod
+    def read_bytes(self, exe_offset: int, length: int) -> bytes:
+        """Return `length` bytes starting at EXE-relative `exe_offset`."""
+
+    def read(self, exe_offset: int, type_name: str, count: int = 1):
+        raw = self.read_bytes(int(exe_offset), type_size(type_name, count))
+        return unpack_from(raw, 0, type_name, count)
+
+    def read_into(self, exe_offset: int, buffer) -> int:
+        """
+        Fill a writable buffer (e.g. a bytearray reused across ticks) with the bytes at
+        exe_offset. Returns the number of bytes written.
+        """
+        view = memoryview(buffer).cast('B')
+        n = len(view)
+        view[:] = self.read_bytes(int(exe_offset), n)
+        return n
+
+    def bulk(self, exe_offset: int, length: int) -> "BulkReader":
+        return BulkReader(self, exe_offset, length)
+
+    def read_many(self, requests: Sequence[Tuple[int, str, int]],
+                  max_gap: Optional[int] = None) -> list:
+        """Read several (offset, type, count) requests; returns decoded values in order."""
+        if max_gap is None:
+            max_gap = self.read_many_max_gap
+        sized = [(int(off), type_name, count, type_size(type_name, count))
+                 for off, type_name, count in requests]
+        spans = merge_spans([(off, size) for off, _, _, size in sized], max_gap)
+        starts = [off for off, _ in spans]
+        bufs = [self.read_bytes(off, length) for off, length in spans]
+        out = []
+        for off, type_name, count, size in sized:
+            i = bisect.bisect_right(starts, off) - 1
+            rel = off - starts[i]
+            out.append(unpack_from(bufs[i], rel, type_name, count))
+        return out
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+# ----------------------------
+# Bulk prefetch (contiguous)
+# ----------------------------
+
+class BulkReader:
+    def __init__(self, mem: MemoryBackend, base_exe_offset: int, length: int):
+        self._m = mem
+        self._base = int(base_exe_offset)
+        self._len = int(length)
+        self._buf = mem.read_bytes(self._base, self._len)
+
+    @classmethod
+    def wrap(cls, base_exe_offset: int, buffer) -> "BulkReader":
+        """BulkReader over an already-filled buffer (e.g. from read_into); no read issued."""
+        br = cls.__new__(cls)
+        br._m = None
+        br._base = int(base_exe_offset)
+        br._len = len(buffer)
+        br._buf = buffer
+        return br
+
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc, tb): return False
+
+    def covers(self, exe_offset: int, size: int) -> bool:
+        rel = int(exe_offset) - self._base
+        return 0 <= rel and rel + size <= self._len
+
+    def _rel(self, exe_offset: int, size: int) -> int:
+        rel = int(exe_offset) - self._base
+        if rel < 0 or rel + size > self._len:
+            raise ValueError("BulkReader slice out of range")
+        return rel
+
+    def read(self, exe_offset: int, type_name: str, count: int = 1):
+        rel = self._rel(exe_offset, type_size(type_name, count))
+        return unpack_from(self._buf, rel, type_name, count)
+
+    def read_many(self, requests: Sequence[Tuple[int, str, int]]) -> list:
+        """Same API as MemoryBackend.read_many(), served from the prefetched buffer."""
+        return [self.read(off, type_name, count) for off, type_name, count in requests]
+
+
+# ----------------------------
+# Offline backends
+# ----------------------------
+
+class BytearrayMemory(MemoryBackend):
+    """Backend over an in-memory image; image[0] sits at EXE offset `base_offset`."""
+
+    def __init__(self, image, base_offset: int = 0):
+        self.image = image
+        self.base_offset = int(base_offset)
+
+    def _rel(self, exe_offset: int, length: int) -> int:
+        rel = int(exe_offset) - self.base_offset
+        if rel < 0 or rel + length > len(self.image):
+            raise ValueError(f"read of {length} bytes at 0x{exe_offset:X} outside image")
+        return rel
+
+    def read_bytes(self, exe_offset: int, length: int) -> bytes:
+        rel = self._rel(exe_offset, length)
+        return bytes(self.image[rel:rel + length])
+
+    def read(self, exe_offset: int, type_name: str, count: int = 1):
+        if type_name == 'bytes':
+            return self.read_bytes(exe_offset, count)
+        rel = self._rel(exe_offset, type_size(type_name, count))
+        return unpack_from(self.image, rel, type_name, count)
+
+    def read_into(self, exe_offset: int, buffer) -> int:
+        view = memoryview(buffer).cast('B')
+        n = len(view)
+        rel = self._rel(exe_offset, n)
+        view[:] = memoryview(self.image)[rel:rel + n]
+        return n
+
+
+class FileMemory(BytearrayMemory):
+    """Backend over a raw EXE-relative memory image file, mapped read-only."""
+
+    def __init__(self, path: str, base_offset: int = 0):
+        self.path = path
+        self._f = open(path, "rb")
+        try:
+            image = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._f.close()
+            raise
+        super().__init__(image, base_offset)
+        log.info(f"Mapped memory image {path} ({len(image)} bytes)")
+
+    def close(self) -> None:
+        if self._f is None:
+            return
+        self.image.close()
+        self._f.close()
+        self._f = None
+
+
+class RecordedMemory(MemoryBackend):
+    """
+    Backend replaying a recorded session: a sequence of memory images, one per tick.
+    advance() moves to the next frame (wrapping around if loop=True).
+    """
+
+    def __init__(self, frames: Sequence, base_offset: int = 0, loop: bool = False):
+        if not frames:
+            raise ValueError("RecordedMemory needs at least one frame")
+        self.frames = frames
+        self.loop = loop
+        self.base_offset = int(base_offset)
+        self.index = 0
+        self._current = BytearrayMemory(frames[0], base_offset)
+
+    def read_bytes(self, exe_offset: int, length: int) -> bytes:
+        return self._current.read_bytes(exe_offset, length)
+
+    def advance(self) -> bool:
+        """Move to the next frame. Returns False once the recording is exhausted."""
+        nxt = self.index + 1
+        if nxt >= len(self.frames):
+            if not self.loop:
+                return False
+            nxt = 0
+        self.seek(nxt)
+        return True
+
+    def seek(self, index: int) -> None:
+        self.index = int(index)
+        self._current = BytearrayMemory(self.frames[self.index], self.base_offset)
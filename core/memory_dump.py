@@ -0,0 +1,178 @@
+"""
+memory_dump.py
+
+Compact dumps of the EXE-relative regions MemoryReader uses, for offline profiling.
+
+write_dump() copies the ReadPlan regions (car_state block, names, numbers, run order
+and the header addresses from OFFSETS) out of any MemoryBackend into one file.
+DumpMemory mmaps that file and serves read_bytes()/BulkReader requests as zero-copy
+memoryview slices, so decoding a dump runs exactly the same code as a live read.
+
+File layout (little-endian):
+    magic "ICR2DMP1" | version (8 bytes, ASCII, NUL-padded) | region count (u32)
+    region table: exe_offset (u32), length (u32), file_offset (u64) per region
+    region data
+
+Usage (attaches to the running game per settings.ini):
+    python -m core.memory_dump race.icr2dump [--capacity N]
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import argparse
+import bisect
+import mmap
+import struct
+from typing import List, Optional, Tuple
+
+from core.config import Config
+from core.memory_backend import BulkReader, MemoryBackend, type_size, unpack_from
+from core.read_plan import ReadPlan
+
+MAGIC = b"ICR2DMP1"
+_HEADER = struct.Struct("<8s8sI")
+_REGION = struct.Struct("<IIQ")
+
+
+def write_dump(mem: MemoryBackend, cfg: Config, path: str,
+               capacity: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Write the regions needed to decode a RaceState for `capacity` car slots (default:
+    the live car count) to `path`. Returns the (exe_offset, length) regions written.
+    """
+    if capacity is None:
+        capacity = mem.read(cfg.cars_addr, 'i32')
+        if not (0 < capacity <= cfg.max_cars):
+            raise ValueError(f"invalid car-count {capacity} at 0x{cfg.cars_addr:X}")
+
+    # max_gap=0: only overlapping/adjacent regions merge, keeping the dump compact
+    spans = ReadPlan(cfg, capacity, max_gap=0).spans
+    data = [mem.read_bytes(off, length) for off, length in spans]
+
+    file_offset = _HEADER.size + _REGION.size * len(spans)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, cfg.version.encode("ascii"), len(spans)))
+        for (off, length) in spans:
+            f.write(_REGION.pack(off, length, file_offset))
+            file_offset += length
+        for chunk in data:
+            f.write(chunk)
+
+    log.info(f"Wrote {cfg.version} dump {path}: {len(spans)} regions, "
+             f"{sum(length for _, length in spans)} bytes, {capacity} car slots")
+    return spans
+
+
+class DumpMemory(MemoryBackend):
+    """Read-only MemoryBackend over a file written by write_dump()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._f.close()
+            raise
+        self._view = memoryview(self._mm)
+
+        magic, version, n = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an ICR2 memory dump")
+        self.version = version.rstrip(b"\x00").decode("ascii")
+
+        regions = [_REGION.unpack_from(self._mm, _HEADER.size + i * _REGION.size) for i in range(n)]
+        regions.sort()
+        self.regions: List[Tuple[int, int]] = [(off, length) for off, length, _ in regions]
+        self._starts = [off for off, _, _ in regions]
+        self._file_offsets = [pos for _, _, pos in regions]
+
+    def config(self) -> Config:
+        """Config carrying the offsets of the version this dump was taken from."""
+        return Config.for_version(self.version)
+
+    def _locate(self, exe_offset: int, length: int) -> int:
+        """File position of [exe_offset, exe_offset+length), which must lie in one region."""
+        exe_offset = int(exe_offset)
+        i = bisect.bisect_right(self._starts, exe_offset) - 1
+        if i >= 0:
+            off, size = self.regions[i]
+            rel = exe_offset - off
+            if rel + length <= size:
+                return self._file_offsets[i] + rel
+        raise ValueError(f"read of {length} bytes at 0x{exe_offset:X} not in dump {self.path}")
+
+    def read_bytes(self, exe_offset: int, length: int) -> memoryview:
+        pos = self._locate(exe_offset, length)
+        return self._view[pos:pos + length]
+
+    def read(self, exe_offset: int, type_name: str, count: int = 1):
+        pos = self._locate(exe_offset, type_size(type_name, count))
+        return unpack_from(self._view, pos, type_name, count)
+
+    def read_into(self, exe_offset: int, buffer) -> int:
+        """
+        Fill `buffer` from the dump. A live read plan may span gaps that were never
+        dumped; those bytes are zero-filled.
+        """
+        view = memoryview(buffer).cast('B')
+        n = len(view)
+        start = int(exe_offset)
+        view[:] = bytes(n)
+        for (off, size), pos in zip(self.regions, self._file_offsets):
+            lo, hi = max(start, off), min(start + n, off + size)
+            if lo < hi:
+                view[lo - start:hi - start] = self._view[pos + lo - off:pos + hi - off]
+        return n
+
+    def bulk(self, exe_offset: int, length: int) -> "_DumpBulkReader":
+        return _DumpBulkReader(self, exe_offset, length)
+
+    def close(self) -> None:
+        if self._f is None:
+            return
+        try:
+            self._view.release()
+            self._mm.close()
+        except BufferError:
+            # slices are still referenced elsewhere; the map goes away with them
+            log.debug(f"DumpMemory {self.path}: views still exported, leaving map open")
+        self._f.close()
+        self._f = None
+
+
+class _DumpBulkReader(BulkReader):
+    """
+    BulkReader over a dump. A live read plan may span gaps that were never dumped,
+    so nothing is prefetched; each slice is served straight from the map.
+    """
+
+    def __init__(self, mem: DumpMemory, base_exe_offset: int, length: int):
+        self._m = mem
+        self._base = int(base_exe_offset)
+        self._len = int(length)
+
+    def read(self, exe_offset: int, type_name: str, count: int = 1):
+        if not self.covers(exe_offset, type_size(type_name, count)):
+            raise ValueError("BulkReader slice out of range")
+        return self._m.read(exe_offset, type_name, count)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='memory_dump')
+    parser.add_argument('path', help='Output dump file')
+    parser.add_argument('-c', '--capacity', type=int, help='Car slots to dump (default: live car count)')
+    args = parser.parse_args()
+
+    from core.icr2_memory import ICR2Memory
+
+    cfg = Config()
+    with ICR2Memory(verbose=False) as mem:
+        write_dump(mem, cfg, args.path, args.capacity)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -2,13 +2,74 @@
 model.py
 
 Immutable data models representing drivers, car state, and the overall race state.
+
+The models are slotted frozen dataclasses (no per-instance __dict__), which keeps
+snapshot history buffers small over a long race.
 """
 
+import struct
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Dict, Optional, List
+from typing import Dict, FrozenSet, Iterable, Optional, List
+
+# well-known CarState fields tracked per tick in RaceState.changed_fields
+CHANGE_FIELDS = ("lap_clock", "laps", "status", "lp")
+
+
+class RawValues(Sequence):
+    """
+    Read-only lazy view of one car's raw state block as signed 32-bit integers.
+    - shares the snapshot's car-state buffer; a slot is decoded only when accessed
+    - supports len(), indexing (incl. negative) and slicing (returns a list)
+    - compares equal to any sequence holding the same integers
+    """
+    __slots__ = ("_buf", "_base", "_len")
+
+    def __init__(self, buf, base: int, length: int):
+        self._buf = buf
+        self._base = base
+        self._len = length
+
+    def __len__(self) -> int:
+        return self._len
 
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._len)
+            if step == 1:
+                n = max(0, stop - start)
+                return list(struct.unpack_from(f"<{n}i", self._buf, self._base + start * 4))
+            return [self[j] for j in range(start, stop, step)]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("RawValues index out of range")
+        return struct.unpack_from("<i", self._buf, self._base + i * 4)[0]
 
-@dataclass(frozen=True)
+    def __iter__(self):
+        return iter(struct.unpack_from(f"<{self._len}i", self._buf, self._base))
+
+    def __eq__(self, other):
+        if isinstance(other, RawValues):
+            return self._len == other._len and (
+                self._buf[self._base:self._base + self._len * 4]
+                == other._buf[other._base:other._base + other._len * 4]
+            )
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def tobytes(self) -> bytes:
+        """The raw little-endian block (len * 4 bytes)."""
+        return bytes(self._buf[self._base:self._base + self._len * 4])
+
+    def __repr__(self) -> str:
+        return f"RawValues({list(self)!r})"
+
+
+@dataclass(frozen=True, slots=True)
 class Driver:
     """
     Single driver information keyed by struct index.
@@ -21,7 +82,7 @@ class Driver:
     car_number: Optional[int]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CarState:
     """
     Per-struct car runtime state.
@@ -34,7 +95,7 @@ class CarState:
     - lap_end_clock: clock value at end of last completed lap (field 22)
     - lap_start_clock: clock value at start of current lap (field 23)
     - car_status: retirement reason (0 = running, 1+ = retired with reason)
-    - values: full raw 0x214 block as signed 32-bit integers
+    - values: full raw 0x214 block as signed 32-bit integers (lazy RawValues view)
     """
     struct_index: int
     laps_left: int
@@ -49,10 +110,10 @@ class CarState:
     fuel_laps_remaining: int
     dlat: int
     dlong: int
-    values: List[int]   # NEW: all 133 4-byte signed ints from the car state block
+    values: Sequence[int]   # all 133 4-byte signed ints from the car state block, decoded on access
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RaceState:
     """
     Snapshot of the race state used by the UI.
@@ -62,6 +123,11 @@ class RaceState:
     - order: list of struct indices in running order (pace car excluded), length == display_count
     - drivers: mapping struct_index -> Driver for all struct indices 0..raw_count-1
     - car_states: mapping struct_index -> CarState for all struct indices 0..raw_count-1
+    - tick: sequence number of this snapshot (consecutive for consecutive reads)
+    - changed_cars: struct indices whose raw 0x214 block differs from the previous tick,
+      or None if unknown (first tick, car count changed)
+    - changed_fields: CHANGE_FIELDS name -> struct indices where that field changed
+      (lap_clock: fields 22/23, laps: laps left/current lap/laps down, status, lp)
     """
     raw_count: int
     display_count: int
@@ -71,4 +137,21 @@ class RaceState:
     car_states: Dict[int, CarState]
     track_length: float = 0.0   # miles, derived from memory
     track_name: str = ""   # e.g. "INDY500"
+    tick: int = 0
+    changed_cars: Optional[FrozenSet[int]] = None
+    changed_fields: Optional[Dict[str, FrozenSet[int]]] = None
+
+    def changed_indices(self, field: Optional[str] = None,
+                        since_tick: Optional[int] = None) -> Iterable[int]:
+        """
+        Struct indices a consumer needs to revisit: those whose block (or `field`, one
+        of CHANGE_FIELDS) changed since the previous tick. Falls back to every car when
+        the change set is unknown, or when `since_tick` (the last tick the consumer
+        processed) shows it skipped snapshots.
+        """
+        if self.changed_cars is None or (since_tick is not None and since_tick != self.tick - 1):
+            return self.car_states.keys()
+        if field is None:
+            return self.changed_cars
+        return self.changed_fields[field]
 
@@ -0,0 +1,257 @@
+"""
+race_snapshot.py
+
+RaceSnapshot: a column-oriented (struct-of-arrays) alternative to RaceState.
+
+Instead of one CarState dataclass per car, every per-car field is one NumPy
+column indexed by struct index, and the raw car blocks are a single read-only
+(raw_count x 133) int32 matrix. MemoryReader.read_snapshot() fills it straight
+from the decoded columns, so a tick costs a handful of arrays instead of ~40
+objects, and analysis can work on whole columns (gaps, radar culling).
+
+Existing consumers keep working through a cheap adapter: snapshot.car_states is a
+read-only mapping of struct index -> CarView, which exposes the CarState
+attributes by reading the columns (converted to Python lists once per snapshot,
+on first use). to_race_state() / from_race_state() convert between the two.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.model import CarState, Driver, RaceState, RawValues
+
+# CarState attribute -> column; clocks have a validity mask (invalid -> None)
+CAR_FIELDS = ("laps_left", "laps_completed", "last_lap_ms", "last_lap_valid", "laps_down",
+              "lap_end_clock", "lap_start_clock", "car_status", "current_lp",
+              "fuel_laps_remaining", "dlat", "dlong")
+CLOCK_VALID = {"lap_end_clock": "lap_end_valid", "lap_start_clock": "lap_start_valid"}
+
+# DLONG/DLAT units per mile (500 units per inch)
+UNITS_PER_MILE = 5280 * 12 * 500
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class RaceSnapshot:
+    """
+    Snapshot of the race state as struct-index-aligned columns.
+    - raw_count / display_count / total_laps / order / drivers / track_* / tick /
+      changed_cars / changed_fields: as in RaceState
+    - laps_left ... dlong: int64 columns, one value per struct index (see CarState)
+    - last_lap_valid, lap_end_valid, lap_start_valid: bool columns; the clock
+      columns hold 0 where the matching flag is False
+    - raw: (raw_count x 133) int32 car blocks
+    """
+    raw_count: int
+    display_count: int
+    total_laps: int
+    order: List[Optional[int]]
+    drivers: Dict[int, Driver]
+    laps_left: np.ndarray
+    laps_completed: np.ndarray
+    last_lap_ms: np.ndarray
+    last_lap_valid: np.ndarray
+    laps_down: np.ndarray
+    lap_end_clock: np.ndarray
+    lap_end_valid: np.ndarray
+    lap_start_clock: np.ndarray
+    lap_start_valid: np.ndarray
+    car_status: np.ndarray
+    current_lp: np.ndarray
+    fuel_laps_remaining: np.ndarray
+    dlat: np.ndarray
+    dlong: np.ndarray
+    raw: np.ndarray
+    track_length: float = 0.0
+    track_name: str = ""
+    tick: int = 0
+    changed_cars: Optional[FrozenSet[int]] = None
+    changed_fields: Optional[Dict[str, FrozenSet[int]]] = None
+    _lists: Dict[str, list] = field(default_factory=dict, repr=False)
+
+    changed_indices = RaceState.changed_indices
+
+    # --- per-car adapter ---
+
+    @property
+    def car_states(self) -> "CarViews":
+        """struct index -> CarView, for code written against RaceState.car_states."""
+        views = self._lists.get("_views")
+        if views is None:
+            views = self._lists["_views"] = CarViews(self)
+        return views
+
+    def car(self, struct_index: int) -> "CarView":
+        return self.car_states[struct_index]
+
+    def column_list(self, name: str) -> list:
+        """A CarState attribute's column as a Python list (cached; clocks hold None when invalid)."""
+        values = self._lists.get(name)
+        if values is None:
+            values = getattr(self, name).tolist()
+            if name in CLOCK_VALID:
+                valid = getattr(self, CLOCK_VALID[name]).tolist()
+                values = [v if ok else None for v, ok in zip(values, valid)]
+            self._lists[name] = values
+        return values
+
+    def raw_values(self, struct_index: int) -> RawValues:
+        return RawValues(memoryview(self.raw).cast("B"), struct_index * self.raw.shape[1] * 4,
+                         self.raw.shape[1])
+
+    # --- vectorized helpers ---
+
+    def order_array(self) -> np.ndarray:
+        """Running order as struct indices (-1 for empty positions)."""
+        return np.array([-1 if i is None else i for i in self.order], dtype=np.int64)
+
+    def running(self) -> np.ndarray:
+        """Bool mask of cars still running (car_status == 0)."""
+        return self.car_status == 0
+
+    def relative_to(self, struct_index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (dlat, dlong) of every car relative to `struct_index`, in track units; dlong
+        is wrapped to (-half a lap, half a lap] when the track length is known.
+        """
+        dx = self.dlat - self.dlat[struct_index]
+        dy = self.dlong - self.dlong[struct_index]
+        track_len = (self.track_length or 0) * UNITS_PER_MILE
+        if track_len > 0:
+            dy = (dy + track_len / 2) % track_len - track_len / 2
+        return dx, dy
+
+    def radar_mask(self, struct_index: int, forward: float, rear: float, side: float,
+                   running_only: bool = True) -> np.ndarray:
+        """Bool mask of the cars inside the radar window around `struct_index` (itself excluded)."""
+        dx, dy = self.relative_to(struct_index)
+        mask = (dy <= forward) & (dy >= -rear) & (np.abs(dx) <= side)
+        if running_only:
+            mask &= self.running()
+        mask[struct_index] = False
+        return mask
+
+    # --- conversion ---
+
+    def to_race_state(self) -> RaceState:
+        return RaceState(
+            raw_count=self.raw_count,
+            display_count=self.display_count,
+            total_laps=self.total_laps,
+            order=self.order,
+            drivers=self.drivers,
+            car_states={i: self.car(i).to_car_state() for i in range(self.raw_count)},
+            track_length=self.track_length,
+            track_name=self.track_name,
+            tick=self.tick,
+            changed_cars=self.changed_cars,
+            changed_fields=self.changed_fields,
+        )
+
+    @classmethod
+    def from_race_state(cls, state: RaceState) -> "RaceSnapshot":
+        cars = [state.car_states[i] for i in range(state.raw_count)]
+
+        def col(name: str, dtype=np.int64) -> np.ndarray:
+            return np.array([getattr(cs, name) or 0 for cs in cars], dtype=dtype)
+
+        raw = np.array([list(cs.values) for cs in cars], dtype=np.int32).reshape(len(cars), -1)
+        raw.setflags(write=False)
+        return cls(
+            raw_count=state.raw_count,
+            display_count=state.display_count,
+            total_laps=state.total_laps,
+            order=state.order,
+            drivers=state.drivers,
+            laps_left=col("laps_left"),
+            laps_completed=col("laps_completed"),
+            last_lap_ms=col("last_lap_ms"),
+            last_lap_valid=col("last_lap_valid", bool),
+            laps_down=col("laps_down"),
+            lap_end_clock=col("lap_end_clock"),
+            lap_end_valid=np.array([cs.lap_end_clock is not None for cs in cars], dtype=bool),
+            lap_start_clock=col("lap_start_clock"),
+            lap_start_valid=np.array([cs.lap_start_clock is not None for cs in cars], dtype=bool),
+            car_status=col("car_status"),
+            current_lp=col("current_lp"),
+            fuel_laps_remaining=col("fuel_laps_remaining"),
+            dlat=col("dlat"),
+            dlong=col("dlong"),
+            raw=raw,
+            track_length=state.track_length,
+            track_name=state.track_name,
+            tick=state.tick,
+            changed_cars=state.changed_cars,
+            changed_fields=state.changed_fields,
+        )
+
+
+class CarView:
+    """One car of a RaceSnapshot with CarState's attributes (read-only)."""
+    __slots__ = ("_snap", "_lists", "struct_index")
+
+    def __init__(self, snap: RaceSnapshot, struct_index: int):
+        self._snap = snap
+        self._lists = snap._lists
+        self.struct_index = struct_index
+
+    @property
+    def values(self) -> RawValues:
+        return self._snap.raw_values(self.struct_index)
+
+    def to_car_state(self) -> CarState:
+        return CarState(struct_index=self.struct_index, values=self.values,
+                        **{name: getattr(self, name) for name in CAR_FIELDS})
+
+    def __eq__(self, other):
+        if isinstance(other, (CarView, CarState)):
+            return self.to_car_state() == (other.to_car_state() if isinstance(other, CarView) else other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"CarView({self.struct_index}, tick={self._snap.tick})"
+
+
+def _column_property(name: str) -> property:
+    def get(self: CarView):
+        try:
+            return self._lists[name][self.struct_index]
+        except KeyError:
+            return self._snap.column_list(name)[self.struct_index]
+    get.__name__ = name
+    return property(get)
+
+
+for _name in CAR_FIELDS:
+    setattr(CarView, _name, _column_property(_name))
+del _name
+
+
+class CarViews(Mapping):
+    """Read-only struct index -> CarView mapping over a RaceSnapshot (views made on first access)."""
+    __slots__ = ("_snap", "_views")
+
+    def __init__(self, snap: RaceSnapshot):
+        self._snap = snap
+        self._views: List[Optional[CarView]] = [None] * snap.raw_count
+
+    def __getitem__(self, struct_index: int) -> CarView:
+        if not 0 <= struct_index < len(self._views):
+            raise KeyError(struct_index)
+        view = self._views[struct_index]
+        if view is None:
+            view = self._views[struct_index] = CarView(self._snap, struct_index)
+        return view
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self._views)))
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def __contains__(self, struct_index) -> bool:
+        return struct_index in range(len(self._views))
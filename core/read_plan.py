@@ -0,0 +1,108 @@
+"""
+read_plan.py
+
+ReadPlan: turns the per-tick memory regions named by Config into as few contiguous
+spans as possible, fetches each span once through a BulkReader and serves the usual
+typed read(offset, type, count) API from those in-memory buffers.
+
+All values decoded from one PlanSnapshot therefore come from the same moment in the
+game loop, and a tick costs len(plan.spans) syscalls instead of one per field.
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+from dataclasses import dataclass
+from typing import List
+
+from core.config import Config
+from core.memory_backend import BulkReader, MemoryBackend, merge_spans, type_size
+
+
+@dataclass(frozen=True)
+class Region:
+    """A named EXE-relative byte range read every tick."""
+    name: str
+    offset: int
+    length: int
+
+
+def build_regions(cfg: Config, capacity: int) -> List[Region]:
+    """Regions MemoryReader needs for a field of up to `capacity` car slots (incl. pace car)."""
+    track_len = 4 if cfg.version == "WINDY" else 256  # WINDY stores a track index
+    return [
+        Region("cars", cfg.cars_addr, 4),
+        Region("laps", cfg.laps_addr, 4),
+        Region("names", cfg.driver_names_base, capacity * cfg.entry_bytes_name),
+        Region("numbers", cfg.car_numbers_base, (capacity + abs(cfg.numbers_shift) + 4) * 4),
+        Region("car_state", cfg.car_state_base, capacity * cfg.car_state_size),
+        Region("order", cfg.run_order_base, capacity * 4),
+        Region("track_length", cfg.track_length_addr, 4),
+        Region("track_name", cfg.current_track_addr, track_len),
+    ]
+
+
+class ReadPlan:
+    """Merged read spans for a given car capacity; see module docstring."""
+
+    def __init__(self, cfg: Config, capacity: int, max_gap: int = None):
+        self.capacity = int(capacity)
+        self.max_gap = cfg.read_plan_max_gap if max_gap is None else int(max_gap)
+        self.regions = build_regions(cfg, self.capacity)
+        self.spans = merge_spans([(r.offset, r.length) for r in self.regions], self.max_gap)
+
+    @property
+    def syscalls(self) -> int:
+        """Number of process reads issued per tick."""
+        return len(self.spans)
+
+    @property
+    def bytes_per_tick(self) -> int:
+        """Total bytes copied out of the process per tick."""
+        return sum(length for _, length in self.spans)
+
+    def describe(self) -> str:
+        return (f"{self.syscalls} reads, {self.bytes_per_tick} bytes per tick "
+                f"for {self.capacity} car slots (max gap {self.max_gap} bytes)")
+
+    def fetch(self, mem: MemoryBackend) -> "PlanSnapshot":
+        """Read every span once and return a snapshot serving typed reads from them."""
+        readers = [mem.bulk(off, length) for off, length in self.spans]
+        return PlanSnapshot(mem, readers)
+
+    def allocate(self) -> List[bytearray]:
+        """One preallocated buffer per span, for fetch_into()."""
+        return [bytearray(length) for _, length in self.spans]
+
+    def fetch_into(self, mem: MemoryBackend, buffers: List[bytearray]) -> "PlanSnapshot":
+        """
+        Like fetch(), but fills `buffers` (from allocate()) in place via read_into().
+        The snapshot serves memoryviews of those buffers, so it is only valid until
+        the buffers are filled again.
+        """
+        readers = []
+        for (off, _), buf in zip(self.spans, buffers):
+            mem.read_into(off, buf)
+            readers.append(BulkReader.wrap(off, memoryview(buf)))
+        return PlanSnapshot(mem, readers)
+
+
+class PlanSnapshot(MemoryBackend):
+    """
+    MemoryBackend over the buffers fetched by ReadPlan.fetch() / fetch_into().
+    Reads not covered by any span fall through to the live memory object.
+    """
+
+    def __init__(self, mem: MemoryBackend, readers: List[BulkReader]):
+        self._mem = mem
+        self._readers = readers
+
+    def read_bytes(self, exe_offset: int, length: int) -> bytes:
+        return self.read(exe_offset, 'bytes', length)
+
+    def read(self, exe_offset: int, type_name: str, count: int = 1):
+        size = type_size(type_name, count)
+        for br in self._readers:
+            if br.covers(exe_offset, size):
+                return br.read(exe_offset, type_name, count)
+        return self._mem.read(exe_offset, type_name, count)
@@ -1,7 +1,8 @@
 """
 reader.py
 
-MemoryReader: translates raw memory (via ICR2Memory) to a RaceState (model.RaceState).
+MemoryReader: translates raw memory (via any MemoryBackend, e.g. ICR2Memory) to a
+RaceState (model.RaceState).
 All parsing/mapping logic lives here; no UI code in this module.
 
 Updated to compute last_lap_ms from per-car clock fields:
@@ -11,22 +12,48 @@ This handles unsigned wrap correctly and avoids using field 33 (which is persona
 Now also reads field 24 (laps_down) to show how many laps behind the leader each car is.
 Now also reads field 37 (car_status) to detect retirement reasons.
 
-NEW: also exports the full 0x214 block decoded as 133 signed i32s in CarState.values
-so the overlay can show arbitrary indices as custom columns.
+NEW: also exports the full 0x214 block as 133 signed i32s in CarState.values (a lazy
+RawValues view) so the overlay can show arbitrary indices as custom columns.
+
+Slow-moving regions (names, numbers, total laps, track length/name) go through a
+DecodeCache and are only decoded again when their raw bytes change.
+
+Each RaceState also carries per-car dirty tracking: the struct indices whose 0x214
+block changed since the previous tick, and which well-known fields changed
+(RaceState.changed_cars / changed_fields), so consumers can do O(changed) work.
+
+read_snapshot() returns the same tick as a column-oriented RaceSnapshot
+(core/race_snapshot.py) built straight from the decoded NumPy columns.
+
+Driver names are decoded once per distinct raw name and interned, so every
+snapshot shares the same str objects.
+
+With a SessionRecorder attached (reader.recorder), the read-plan buffers of every
+successfully decoded tick are handed to it for the session recording.
 """
 
 import logging
 log = logging.getLogger(__name__)
 
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
 import html
 
-from core.icr2_memory import ICR2Memory
+import numpy as np
+
+from core.decode_cache import DecodeCache
+from core.memory_backend import MemoryBackend, unpack_from
 from core.config import Config
-from core.model import Driver, CarState, RaceState
+from core.model import CHANGE_FIELDS, Driver, CarState, RaceState, RawValues
+from core.race_snapshot import RaceSnapshot
+from core.read_plan import ReadPlan
+from core.track_catalog import TrackCatalog, get_catalog
 
 import os
-import re
+import sys
+
+# distinct raw driver names kept in MemoryReader's name cache
+NAME_CACHE_SIZE = 1024
+
 
 class ReadError(RuntimeError):
     """Raised when a required read is missing or invalid."""
@@ -35,29 +62,46 @@ class ReadError(RuntimeError):
 
 class MemoryReader:
     """
-    MemoryReader reads memory using ICR2Memory and returns RaceState snapshots.
+    MemoryReader reads memory using a MemoryBackend and returns RaceState snapshots.
 
-    It is constructed with an ICR2Memory instance and a Config instance.
+    It is constructed with a MemoryBackend (ICR2Memory live, or an offline backend
+    such as BytearrayMemory / FileMemory) and a Config instance.
     """
 
-    _cached_tracks = None
-    _cached_index = None
-    
-
-    def __init__(self, mem: ICR2Memory, cfg: Config):
+    def __init__(self, mem: MemoryBackend, cfg: Config):
 
         log.info("Initializing MemoryReader")
 
         self._mem = mem
         self._cfg = cfg
+        # Source for the helpers below: the live memory object, or the planned
+        # snapshot while read_race_state() is decoding a tick.
+        self._src = mem
+        self._plan: Optional[ReadPlan] = None
+        # Double-buffered per-span read buffers, filled in place each tick; the
+        # previous tick's set stays intact while the other is being filled.
+        self._buffers: List[List[bytearray]] = []
+        self._buf_index = 0
+        self._decode_cache = DecodeCache()
+        self._drivers_from: Optional[tuple] = None
+        self._drivers: Dict[int, Driver] = {}
+        self._names: Dict[bytes, str] = {}   # raw name bytes -> decoded name
+        # per-car dirty tracking: this tick's and the previous tick's (raw_count x 133) blocks
+        self._blocks: Optional[np.ndarray] = None
+        self._prev_blocks: Optional[np.ndarray] = None
+        self._tick = 0
+        self._catalog: Optional[TrackCatalog] = None
+        self._missing_track_index: Optional[int] = None
         self._last_read_error: Optional[str] = None
         self._read_error_count = 0
+        # optional core.session_recorder.SessionRecorder fed with every good tick
+        self.recorder = None
 
     # --- low-level reading helpers ---
 
     def _read_i32(self, addr: int) -> Optional[int]:
         """Read a single i32 from memory. Returns None on short/absent reads."""
-        raw = self._mem.read(addr, 'i32', count=1)
+        raw = self._src.read(addr, 'i32', count=1)
         if raw is None:
             return None
         if isinstance(raw, int):
@@ -74,7 +118,7 @@ class MemoryReader:
 
     def _read_i32_list(self, addr: int, count: int) -> List[int]:
         """Read up to count i32s and return as list (may be shorter)."""
-        raw = self._mem.read(addr, 'i32', count=count)
+        raw = self._src.read(addr, 'i32', count=count)
         if raw is None:
             return []
         if isinstance(raw, int):
@@ -98,25 +142,44 @@ class MemoryReader:
             raise ReadError(f"invalid car-count {v} at 0x{self._cfg.cars_addr:X}")
         return v
 
+    def _read_region(self, addr: int, length: int):
+        """Raw bytes of a region (b"" if the backend returned nothing)."""
+        raw = self._src.read(addr, 'bytes', count=length)
+        return raw if raw is not None else b""
+
     def read_total_laps(self) -> int:
         """Read total race laps from memory. Raise ReadError on failure."""
-        v = self._read_i32(self._cfg.laps_addr)
-        if v is None:
+        raw = self._read_region(self._cfg.laps_addr, 4)
+        return self._decode_cache.decode("laps", raw, self._decode_total_laps)
+
+    def _decode_total_laps(self, raw) -> int:
+        if len(raw) < 4:
             raise ReadError(f"no laps at 0x{self._cfg.laps_addr:X}")
+        v = int.from_bytes(raw[:4], 'little', signed=True)
         if v <= 0 or v > self._cfg.max_laps:
             raise ReadError(f"invalid total_laps {v} at 0x{self._cfg.laps_addr:X}")
         return v
 
+    def decode_stats(self) -> Dict[str, tuple]:
+        """Change-detection counters: region -> (hits, misses)."""
+        return self._decode_cache.stats()
+
     def _read_names_full(self, raw_count: int) -> Dict[int, str]:
         """
         Read contiguous name slots sized to raw_count and return a map struct_index -> name.
         Name decoding: NUL-terminated ASCII, trimmed and HTML-escaped.
+        The decoded map is reused while the name bytes are unchanged.
 
         IMPORTANT: respects names_index_base and names_shift from Config.
         """
         total_bytes = raw_count * self._cfg.entry_bytes_name
-        raw = self._mem.read(self._cfg.driver_names_base, 'bytes', count=total_bytes)
-        blob = bytes(raw) if isinstance(raw, (bytes, bytearray)) else bytes(raw or b"")
+        raw = self._read_region(self._cfg.driver_names_base, total_bytes)
+        return self._decode_cache.decode(
+            "names", raw, lambda r: self._decode_names(r, raw_count), key=raw_count)
+
+    def _decode_names(self, raw, raw_count: int) -> Dict[int, str]:
+        total_bytes = raw_count * self._cfg.entry_bytes_name
+        blob = bytes(raw)
         if len(blob) < total_bytes:
             blob = blob.ljust(total_bytes, b'\x00')
 
@@ -132,19 +195,35 @@ class MemoryReader:
                 continue
             chunk = blob[start:end]
             name_raw = chunk.split(b'\x00', 1)[0]
-            out[struct_idx] = html.escape(name_raw.decode('ascii', errors='ignore').strip())
+            out[struct_idx] = self._name_from_bytes(name_raw)
         return out
 
+    def _name_from_bytes(self, name_raw: bytes) -> str:
+        """Decoded, escaped name for the raw bytes; one shared (interned) str per distinct name."""
+        name = self._names.get(name_raw)
+        if name is None:
+            if len(self._names) >= NAME_CACHE_SIZE:
+                self._names.clear()
+            name = sys.intern(html.escape(name_raw.decode('ascii', errors='ignore').strip()))
+            self._names[name_raw] = name
+        return name
+
     def _read_numbers_full(self, raw_count: int) -> Dict[int, Optional[int]]:
         """Read car numbers table and return a mapping struct_index -> int|None.
+        The decoded map is reused while the table bytes are unchanged.
 
         IMPORTANT: respects numbers_index_base and numbers_shift from Config.
         """
         # read a bit extra to be safe if shift is negative
-        vals = self._read_i32_list(
-            self._cfg.car_numbers_base,
-            raw_count + abs(self._cfg.numbers_shift) + 4
-        )
+        count = raw_count + abs(self._cfg.numbers_shift) + 4
+        raw = self._read_region(self._cfg.car_numbers_base, count * 4)
+        return self._decode_cache.decode(
+            "numbers", raw, lambda r: self._decode_numbers(r, raw_count), key=raw_count)
+
+    def _decode_numbers(self, raw, raw_count: int) -> Dict[int, Optional[int]]:
+        vals = unpack_from(raw, 0, 'i32', len(raw) // 4)
+        if isinstance(vals, int):
+            vals = [vals]
         out: Dict[int, Optional[int]] = {}
         base = self._cfg.numbers_index_base
         shift = self._cfg.numbers_shift
@@ -176,163 +255,160 @@ class MemoryReader:
             out.append(None)
         return out
 
-    def _read_laps_full(self, raw_count: int, total_laps: int) -> Dict[int, CarState]:
+    def _decode_car_columns(self, raw_count: int) -> Tuple[bytes, Dict[str, np.ndarray]]:
         """
-        Read car_state blob sized to raw_count and compute CarState for each struct index.
+        Read the car_state blob sized to raw_count and decode the named fields as columns.
+
+        The blob is viewed once as a (raw_count x 133) int32 array and every named
+        field is pulled out as a column; sentinels and clamps are applied as masks.
 
         last_lap_ms computed from two per-car clock fields (cfg.field_lap_clock_start/ end).
         If either clock is a known sentinel (0xFF000000 / -16777216) or missing -> last_lap_valid=False.
-        
+
         Also reads laps_down from field 24 to show how many laps behind the leader each car is.
         Also reads car_status from field 37 to detect retirement reasons.
 
-        NEW: decodes the entire 0x214 block as signed ints and stores in CarState.values.
+        Returns (blob, columns); columns are keyed by CarState attribute, plus
+        lap_end_valid / lap_start_valid for the clocks and raw for the whole matrix.
         """
         total_bytes = raw_count * self._cfg.car_state_size
-        raw = self._mem.read(self._cfg.car_state_base, 'bytes', count=total_bytes)
+        raw = self._src.read(self._cfg.car_state_base, 'bytes', count=total_bytes)
         blob = bytes(raw) if isinstance(raw, (bytes, bytearray)) else bytes(raw or b"")
         if len(blob) < total_bytes:
             blob = blob.ljust(total_bytes, b'\x00')
 
         # known sentinel: 0xFF000000 (unsigned) often appears as -16777216 if interpreted signed
         SENTINEL_UNSIGNED = 0xFF000000
-        SENTINEL_SIGNED = -16777216
 
-        out: Dict[int, CarState] = {}
-        for struct_idx in range(raw_count):
-            base = struct_idx * self._cfg.car_state_size
+        n_fields = self._cfg.car_state_size // 4
+        signed = np.frombuffer(blob, dtype='<i4', count=raw_count * n_fields).reshape(raw_count, n_fields)
+        unsigned = signed.view('<u4')
+        self._blocks = signed
+
+        def col(byte_offset: int) -> np.ndarray:
+            return unsigned[:, byte_offset // 4]
+
+        # laps_left (field 32)
+        laps_left = col(self._cfg.field_laps_left)
+
+        # current_lap (field 38), stored 1-based
+        current_lap = np.maximum(col(self._cfg.current_lap).astype(np.int64) - 1, 0)
+
+        # lap clocks (field 22 / 23); sentinel -> None
+        clock_start = col(self._cfg.field_lap_clock_start)
+        clock_end = col(self._cfg.field_lap_clock_end)
+        start_ok = clock_start != SENTINEL_UNSIGNED
+        end_ok = clock_end != SENTINEL_UNSIGNED
+
+        # laps down (field 24); field should be 0 for lead lap, positive for laps down
+        laps_down = col(self._cfg.field_laps_down)
+        laps_down = np.where(laps_down > 100, 0, laps_down)  # sanity check
+
+        # car status (field 37); should be 0-16 based on retirement reasons
+        car_status = col(self._cfg.car_status)
+        car_status = np.where(car_status > 16, 0, car_status)
+
+        # compute last_lap_ms if both clocks are valid; uint32 subtraction wraps like & 0xFFFFFFFF
+        last_lap_valid = start_ok & end_ok
+        last_lap_ms = np.where(last_lap_valid, clock_end - clock_start, 0)
+
+        # Old way to compute laps run
+        # completed = total_laps - laps_left
+        # if completed < 0:
+        #     completed = 0
+        # if completed > total_laps:
+        #     completed = total_laps
+
+        return blob, {
+            "laps_left": laps_left,
+            "laps_completed": current_lap,
+            "last_lap_ms": last_lap_ms,
+            "last_lap_valid": last_lap_valid,
+            "laps_down": laps_down,
+            "lap_end_clock": clock_end,
+            "lap_end_valid": end_ok,
+            "lap_start_clock": clock_start,
+            "lap_start_valid": start_ok,
+            "car_status": car_status,
+            "current_lp": col(self._cfg.current_lp),                    # possibly LP line (field 52)
+            "fuel_laps_remaining": col(self._cfg.fuel_laps_remaining),  # fuel laps remaining (field 35)
+            "dlat": signed[:, self._cfg.dlat // 4],                     # DLAT (field 11)
+            "dlong": signed[:, self._cfg.dlong // 4],                   # DLONG (field 31)
+            "raw": signed,
+        }
 
-            # laps_left (field 32)
-            start_ll = base + self._cfg.field_laps_left
-            raw4 = blob[start_ll:start_ll+4]
-            if len(raw4) < 4:
-                laps_left = 0
-            else:
-                laps_left = int.from_bytes(raw4, 'little', signed=False)
+    def _read_laps_full(self, raw_count: int, total_laps: int) -> Dict[int, CarState]:
+        """
+        Compute CarState for each struct index from the decoded car columns.
 
-            # current_lap (field 38)
-            start_ll = base + self._cfg.current_lap
-            raw4 = blob[start_ll:start_ll+4]
-            if len(raw4) < 4:
-                current_lap = 0
-            else:
-                current_lap = int.from_bytes(raw4, 'little', signed=False) - 1
-            if current_lap < 0:
-                current_lap = 0
-
-            # lap clock start (field 22 or cfg.field_lap_clock_start)
-            start_clock = base + self._cfg.field_lap_clock_start
-            raw4_start = blob[start_clock:start_clock+4]
-            if len(raw4_start) < 4:
-                clock_start = None
-            else:
-                clock_start_val = int.from_bytes(raw4_start, 'little', signed=False)
-                signed_start = int.from_bytes(raw4_start, 'little', signed=True)
-                if clock_start_val == SENTINEL_UNSIGNED or signed_start == SENTINEL_SIGNED:
-                    clock_start = None
-                else:
-                    clock_start = clock_start_val
-
-            # lap clock end (field 23 or cfg.field_lap_clock_end)
-            end_clock = base + self._cfg.field_lap_clock_end
-            raw4_end = blob[end_clock:end_clock+4]
-            if len(raw4_end) < 4:
-                clock_end = None
-            else:
-                clock_end_val = int.from_bytes(raw4_end, 'little', signed=False)
-                signed_end = int.from_bytes(raw4_end, 'little', signed=True)
-                if clock_end_val == SENTINEL_UNSIGNED or signed_end == SENTINEL_SIGNED:
-                    clock_end = None
-                else:
-                    clock_end = clock_end_val
-
-            # laps down (field 24)
-            laps_down_offset = base + self._cfg.field_laps_down
-            raw4_laps_down = blob[laps_down_offset:laps_down_offset+4]
-            if len(raw4_laps_down) < 4:
-                laps_down = 0
-            else:
-                laps_down = int.from_bytes(raw4_laps_down, 'little', signed=False)
-                # Clamp to reasonable range - field 24 should be 0 for lead lap, positive for laps down
-                if laps_down > 100:  # sanity check
-                    laps_down = 0
-
-            # possibly LP line (field 52)
-            car_offset = base + self._cfg.current_lp
-            raw4_current_lp = blob[car_offset:car_offset+4]
-            current_lp = int.from_bytes(raw4_current_lp, 'little', signed=False)
-
-            # fuel laps remaining (field 35)
-            fuel_offset = base + self._cfg.fuel_laps_remaining
-            raw4_fuel = blob[fuel_offset:fuel_offset+4]
-            fuel_laps_remaining = int.from_bytes(raw4_fuel, 'little', signed=False)
-
-            # car status (field 37)
-            car_status_offset = base + self._cfg.car_status
-            raw4_car_status = blob[car_status_offset:car_status_offset+4]
-            if len(raw4_car_status) < 4:
-                car_status = 0
-            else:
-                car_status = int.from_bytes(raw4_car_status, 'little', signed=False)
-                # Clamp to reasonable range - should be 0-16 based on retirement reasons
-                if car_status > 16:
-                    car_status = 0
-
-            # DLAT (field 11)
-            dlat_offset = base + self._cfg.dlat
-            raw4_dlat = blob[dlat_offset:dlat_offset+4]
-            dlat = int.from_bytes(raw4_dlat, 'little', signed=True) if len(raw4_dlat) == 4 else 0
-
-            # DLONG (field 31)
-            dlong_offset = base + self._cfg.dlong
-            raw4_dlong = blob[dlong_offset:dlong_offset+4]
-            dlong = int.from_bytes(raw4_dlong, 'little', signed=True) if len(raw4_dlong) == 4 else 0
-
-            # compute last_lap_ms if both clocks are valid; otherwise mark invalid
-            if clock_start is None or clock_end is None:
-                last_lap_ms = 0
-                last_lap_valid = False
-            else:
-                last_lap_ms = (clock_end - clock_start) & 0xFFFFFFFF
-                last_lap_valid = True
-
-            # Old way to compute laps run
-            # completed = total_laps - laps_left
-            # if completed < 0:
-            #     completed = 0
-            # if completed > total_laps:
-            #     completed = total_laps
-
-            # NEW: full 0x214 block decoded as signed i32s for research/custom fields
-            values: List[int] = [
-                int.from_bytes(blob[base + i*4: base + (i+1)*4], 'little', signed=True)
-                for i in range(self._cfg.car_state_size // 4)
-            ]
+        CarState.values is a lazy RawValues view over the (immutable) blob, so the
+        133 raw slots are only decoded for the cars/indices a consumer actually reads.
+        """
+        blob, c = self._decode_car_columns(raw_count)
+        n_fields = self._cfg.car_state_size // 4
+        columns = zip(
+            c["laps_left"].tolist(),
+            c["laps_completed"].tolist(),
+            c["last_lap_ms"].tolist(),
+            c["last_lap_valid"].tolist(),
+            c["laps_down"].tolist(),
+            c["lap_end_clock"].tolist(),
+            c["lap_end_valid"].tolist(),
+            c["lap_start_clock"].tolist(),
+            c["lap_start_valid"].tolist(),
+            c["car_status"].tolist(),
+            c["current_lp"].tolist(),
+            c["fuel_laps_remaining"].tolist(),
+            c["dlat"].tolist(),
+            c["dlong"].tolist(),
+        )
 
+        out: Dict[int, CarState] = {}
+        for struct_idx, (ll, lap, ms, valid, down, c_end, e_ok, c_start, s_ok,
+                         status, lp, fuel, dlat, dlong) in enumerate(columns):
             out[struct_idx] = CarState(
                 struct_index=struct_idx,
-                laps_left=laps_left,
-                laps_completed=current_lap,
-                last_lap_ms=last_lap_ms,
-                last_lap_valid=last_lap_valid,
-                laps_down=laps_down,
-                lap_end_clock=clock_end,
-                lap_start_clock=clock_start,
-                car_status=car_status,
-                current_lp=current_lp,
-                fuel_laps_remaining=fuel_laps_remaining,
+                laps_left=ll,
+                laps_completed=lap,
+                last_lap_ms=ms,
+                last_lap_valid=valid,
+                laps_down=down,
+                lap_end_clock=c_end if e_ok else None,
+                lap_start_clock=c_start if s_ok else None,
+                car_status=status,
+                current_lp=lp,
+                fuel_laps_remaining=fuel,
                 dlat=dlat,
                 dlong=dlong,
-                values=values,  # <-- keep the raw block too
+                values=RawValues(blob, struct_idx * self._cfg.car_state_size, n_fields),
             )
         return out
 
+    def _snapshot_columns(self, raw_count: int) -> Dict[str, np.ndarray]:
+        """Car columns for RaceSnapshot: int64 values, bool flags, the raw int32 matrix."""
+        _, c = self._decode_car_columns(raw_count)
+        out = {}
+        for name, column in c.items():
+            if column.dtype != np.bool_ and name != "raw":
+                column = column.astype(np.int64)
+            if name in ("lap_end_clock", "lap_start_clock"):
+                column = np.where(c[name.replace("clock", "valid")], column, 0)
+            out[name] = column
+        return out
+
     # --- public API ---
 
     def read_track_length_miles(self) -> float:
         """Read track length from memory and convert to miles."""
-        v = self._read_i32(self._cfg.track_length_addr)
-        if v is None or v <= 0:
+        raw = self._read_region(self._cfg.track_length_addr, 4)
+        return self._decode_cache.decode("track_length", raw, self._decode_track_length)
+
+    @staticmethod
+    def _decode_track_length(raw) -> float:
+        if len(raw) < 4:
+            return 0.0
+        v = int.from_bytes(raw[:4], 'little', signed=True)
+        if v <= 0:
             return 0.0
         inches = v / 500.0
         miles = inches / (12 * 5280)
@@ -342,90 +418,130 @@ class MemoryReader:
         """
         Detect current track folder name.
         - WINDY: read integer track index at 0x527D58 and map to the
-          alphabetical list of track folders (sorted by TNAME).
-          Returns the track's subfolder name (e.g. 'CLEVLAND').
-        - DOS/REND32A: read string at current_track_addr.
+          alphabetical list of track folders (sorted by TNAME) through the
+          persistent TrackCatalog. Returns the track's subfolder name
+          (e.g. 'CLEVLAND'), or "" while the catalog is still loading.
+        - DOS/REND32A: read string at current_track_addr (decoded only when
+          its bytes change).
         """
         version = getattr(self._cfg, "version", "").upper()
 
         # --- WINDY mode ---
         if version == "WINDY":
-            idx = self._mem.read(0x527D58, "i32")
-
-            # Use cached list if available and index unchanged
-            if (
-                hasattr(self, "_cached_tracks")
-                and hasattr(self, "_cached_index")
-                and self._cached_tracks is not None
-                and idx == self._cached_index
-            ):
-                try:
-                    return self._cached_tracks[idx][0]  # folder name
-                except Exception:
-                    pass  # rebuild if cache invalid
-
-            exe_path = self._cfg.game_exe
-            if not exe_path:
-                raise ReadError("game_exe not set in settings.ini")
-
-            tracks_root = os.path.join(os.path.dirname(exe_path), "TRACKS")
-            if not os.path.isdir(tracks_root):
-                raise ReadError(f"TRACKS folder not found: {tracks_root}")
-
-            # Build alphabetical list from TNAME lines
-            tname_pattern = re.compile(r"^\s*TNAME\s+(.+)$", re.IGNORECASE | re.MULTILINE)
-            track_entries = []
-
-            for sub in os.listdir(tracks_root):
-                sub_path = os.path.join(tracks_root, sub)
-                if not os.path.isdir(sub_path):
-                    continue
-                txt_path = os.path.join(sub_path, f"{sub}.TXT")
-                if not os.path.isfile(txt_path):
-                    continue
-                try:
-                    with open(txt_path, "r", errors="ignore") as f:
-                        txt = f.read()
-                    m = tname_pattern.search(txt)
-                    if not m:
-                        continue
-                    display_name = m.group(1).strip()
-                    track_entries.append((sub, display_name))
-                except Exception:
-                    continue
-
-            if not track_entries:
-                raise ReadError("no valid tracks found under TRACKS folder")
-
-            # Sort alphabetically by display name, but we’ll return folder name
-            track_entries.sort(key=lambda x: x[1].lower())
-
-            if not (0 <= idx < len(track_entries)):
-                raise ReadError(f"track index {idx} out of range")
-
-            # Cache list and index
-            self._cached_tracks = track_entries
-            self._cached_index = idx
-
-            return track_entries[idx][0]  # folder name
+            idx = self._src.read(self._cfg.current_track_addr, "i32")
+            catalog = self._track_catalog()
+            if not catalog.ready:
+                return ""  # still loading in the background; overlays ignore ""
+            folder = catalog.lookup(idx)
+            if folder is None:
+                if idx != self._missing_track_index:
+                    # an unknown index may mean tracks were added since the catalog was built
+                    self._missing_track_index = idx
+                    catalog.refresh()
+                raise ReadError(catalog.error or f"track index {idx} out of range")
+            return folder
 
         # --- DOS / REND32A fallback ---
-        raw = self._mem.read(self._cfg.current_track_addr, 'bytes', count=256)
+        raw = self._src.read(self._cfg.current_track_addr, 'bytes', count=256)
         if raw is None:
             raise ReadError(f"no track name at 0x{self._cfg.current_track_addr:X}")
-
-        blob = bytes(raw) if isinstance(raw, (bytes, bytearray)) else bytes(raw or b"")
+        return self._decode_cache.decode("track_name", raw, self._decode_track_name)
+
+    def _track_catalog(self) -> TrackCatalog:
+        """The shared catalog for game_exe's TRACKS folder (located once per reader)."""
+        if self._catalog is not None:
+            return self._catalog
+        exe_path = self._cfg.game_exe
+        if not exe_path:
+            raise ReadError("game_exe not set in settings.ini")
+        tracks_root = os.path.join(os.path.dirname(exe_path), "TRACKS")
+        if not os.path.isdir(tracks_root):
+            raise ReadError(f"TRACKS folder not found: {tracks_root}")
+        self._catalog = get_catalog(tracks_root)
+        return self._catalog
+
+    @staticmethod
+    def _decode_track_name(raw) -> str:
+        blob = bytes(raw)
         name_raw = blob.split(b'\x00', 1)[0]
         return name_raw.decode('ascii', errors='ignore').strip()
 
 
 
+    def _diff_car_blocks(self):
+        """
+        Compare this tick's car blocks with the previous tick's.
+        Returns (changed struct indices, {CHANGE_FIELDS name: struct indices}), or
+        (None, None) if there is nothing comparable (first tick, car count changed).
+        """
+        cur, prev = self._blocks, self._prev_blocks
+        if cur is None or prev is None or cur.shape != prev.shape:
+            return None, None
+        diff = cur != prev
+
+        def changed(*byte_offsets: int) -> FrozenSet[int]:
+            mask = diff[:, byte_offsets[0] // 4]
+            for off in byte_offsets[1:]:
+                mask = mask | diff[:, off // 4]
+            return frozenset(np.flatnonzero(mask).tolist())
+
+        cfg = self._cfg
+        fields = dict(zip(CHANGE_FIELDS, (
+            changed(cfg.field_lap_clock_start, cfg.field_lap_clock_end),
+            changed(cfg.field_laps_left, cfg.current_lap, cfg.field_laps_down),
+            changed(cfg.car_status),
+            changed(cfg.current_lp),
+        )))
+        return frozenset(np.flatnonzero(diff.any(axis=1)).tolist()), fields
+
+    @property
+    def read_plan(self) -> Optional[ReadPlan]:
+        """The ReadPlan used by read_race_state() (None until the first tick)."""
+        return self._plan
+
+    def _fetch_snapshot(self):
+        """
+        Fetch this tick's regions through the read plan into the next preallocated
+        buffer set. The plan is sized to the car count; it is (re)built on the first
+        tick and whenever the field grows.
+        """
+        if self._plan is None:
+            self._set_plan(self.read_raw_car_count())
+        self._src = self._fetch_into_next()
+        raw_count = self.read_raw_car_count()
+        if raw_count > self._plan.capacity:
+            self._set_plan(raw_count)
+            self._src = self._fetch_into_next()
+
+    def _fetch_into_next(self):
+        self._buf_index ^= 1
+        return self._plan.fetch_into(self._mem, self._buffers[self._buf_index])
+
+    def _set_plan(self, capacity: int) -> None:
+        self._plan = ReadPlan(self._cfg, capacity)
+        self._buffers = [self._plan.allocate(), self._plan.allocate()]
+        log.info(f"Read plan: {self._plan.describe()}")
+
     def read_race_state(self) -> RaceState:
         """
         Read the full RaceState. Raises ReadError if required reads fail.
         This method is deterministic given memory contents and the config.
+
+        All regions are fetched up front through the ReadPlan (a handful of bulk
+        reads) and decoded from those buffers, so every field comes from one moment.
         """
+        return self._read_tick(columnar=False)
+
+    def read_snapshot(self) -> RaceSnapshot:
+        """
+        Same tick as read_race_state(), returned as a column-oriented RaceSnapshot
+        (no per-car objects). Both share the tick counter and dirty tracking.
+        """
+        return self._read_tick(columnar=True)
+
+    def _read_tick(self, columnar: bool) -> Union[RaceState, RaceSnapshot]:
         try:
+            self._fetch_snapshot()
             raw_count = self.read_raw_car_count()
             # display_count excludes pace car
             if raw_count <= 1:
@@ -437,25 +553,59 @@ class MemoryReader:
             # read full maps sized to raw_count
             names_map = self._read_names_full(raw_count)
             numbers_map = self._read_numbers_full(raw_count)
-            car_states_map = self._read_laps_full(raw_count, total_laps)
-
-            # build Driver objects for all struct indices
-            drivers: Dict[int, Driver] = {}
-            for struct_idx in range(raw_count):
-                name = names_map.get(struct_idx, "")
-                num = numbers_map.get(struct_idx)
-                drivers[struct_idx] = Driver(struct_index=struct_idx, name=name, car_number=num)
+            if columnar:
+                columns = self._snapshot_columns(raw_count)
+            else:
+                car_states_map = self._read_laps_full(raw_count, total_laps)
+
+            # build Driver objects for all struct indices (reused while names and
+            # numbers are unchanged; unchanged entries are reused individually)
+            if self._drivers_from is None or self._drivers_from[0] is not names_map \
+                    or self._drivers_from[1] is not numbers_map:
+                drivers: Dict[int, Driver] = {}
+                prev = self._drivers
+                for struct_idx in range(raw_count):
+                    name = names_map.get(struct_idx, "")
+                    num = numbers_map.get(struct_idx)
+                    d = prev.get(struct_idx)
+                    if d is None or d.name != name or d.car_number != num:
+                        d = Driver(struct_index=struct_idx, name=name, car_number=num)
+                    drivers[struct_idx] = d
+                self._drivers = drivers
+                self._drivers_from = (names_map, numbers_map)
+            drivers = self._drivers
 
             order = self._read_order_struct_indices(raw_count, display_count)
 
             track_length = self.read_track_length_miles()
             track_name = self.read_current_track()
 
+            changed_cars, changed_fields = self._diff_car_blocks()
+            self._prev_blocks = self._blocks
+            self._tick += 1
+
             if self._last_read_error is not None:
                 log.info(f"Memory read recovered after {self._read_error_count} failures")
                 self._last_read_error = None
                 self._read_error_count = 0
 
+            if self.recorder is not None:
+                self.recorder.record(self._tick, self._plan.spans, self._buffers[self._buf_index])
+
+            if columnar:
+                return RaceSnapshot(
+                    raw_count=raw_count,
+                    display_count=display_count,
+                    total_laps=total_laps,
+                    order=order,
+                    drivers=drivers,
+                    track_length=track_length,
+                    track_name=track_name,
+                    tick=self._tick,
+                    changed_cars=changed_cars,
+                    changed_fields=changed_fields,
+                    **columns,
+                )
             return RaceState(
                 raw_count=raw_count,
                 display_count=display_count,
@@ -465,6 +615,9 @@ class MemoryReader:
                 car_states={k: v for k, v in car_states_map.items()},
                 track_length=track_length,
                 track_name=track_name,
+                tick=self._tick,
+                changed_cars=changed_cars,
+                changed_fields=changed_fields,
             )
         except Exception as e:
             err_str = str(e)
@@ -479,3 +632,5 @@ class MemoryReader:
                 self._read_error_count += 1
 
             raise ReadError(err_str)
+        finally:
+            self._src = self._mem
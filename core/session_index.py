@@ -0,0 +1,232 @@
+"""
+session_index.py
+
+SessionIndex: the seek index stored at the end of a session recording
+(core/session_recorder.py).
+
+  keyframes  one row per KEY frame (written every keyframe_s seconds): frame
+             number, tick, timestamp, file offset of the record and the span
+             layout in force. Seeking to a frame or a time is a bisect here, one
+             jump in the file and at most one keyframe interval of deltas.
+  laps       one row per lap-line crossing (a car's lap_end_clock changing to a
+             valid value), plus one row per car on the first frame of every
+             layout: frame, tick, timestamp, struct index, car number and the
+             laps completed at that frame. "Car #3, lap 120" is a lookup here.
+
+The recorder builds the index while writing (LapIndexer runs on its writer thread)
+and appends it when the recording is closed; rebuild_index() in session_recorder
+recreates it from a recording that has none (e.g. the recorder was killed).
+
+Payload layout (little-endian, zlib-compressed as a whole):
+    frames (u64) | last tick (u64) | last timestamp (f64) | has_laps (u8) | 3 pad |
+    layout count (u32) | keyframe count (u32) | lap row count (u32)
+    per layout: span count (u32), then exe_offset (u32), length (u32) per span
+    keyframe rows (KEY_DTYPE), lap rows (LAP_DTYPE)
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import struct
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.config import Config
+
+KEY_DTYPE = np.dtype([("frame", "<u8"), ("tick", "<u8"), ("timestamp", "<f8"),
+                      ("offset", "<u8"), ("layout", "<u4")])
+LAP_DTYPE = np.dtype([("frame", "<u8"), ("tick", "<u8"), ("timestamp", "<f8"),
+                      ("struct_index", "<u2"), ("car_number", "<i4"), ("lap", "<i4")])
+NO_CAR_NUMBER = -1
+
+_HEAD = struct.Struct("<QQdB3xIII")
+
+# lap clocks read 0xFF000000 until a car has a time (as in MemoryReader)
+SENTINEL_UNSIGNED = 0xFF000000
+
+Spans = Tuple[Tuple[int, int], ...]
+
+
+def locate(spans: Sequence[Tuple[int, int]], exe_offset: int, length: int) -> Optional[int]:
+    """Position of [exe_offset, +length) in a frame (spans' bytes concatenated), if one span holds it."""
+    base = 0
+    for off, span_len in spans:
+        rel = exe_offset - off
+        if 0 <= rel and rel + length <= span_len:
+            return base + rel
+        base += span_len
+    return None
+
+
+class SessionIndex:
+    """Keyframe and lap-crossing index of one recording; see module docstring."""
+
+    def __init__(self, has_laps: bool = False):
+        self.has_laps = has_laps
+        self.frames = 0
+        self.last_tick = 0
+        self.last_timestamp = 0.0
+        self.layouts: List[Spans] = []
+        self._key_rows: List[tuple] = []
+        self._lap_rows: List[tuple] = []
+        self._keys: Optional[np.ndarray] = None
+        self._laps: Optional[np.ndarray] = None
+
+    # --- building ---
+
+    def add_layout(self, spans: Spans) -> int:
+        self.layouts.append(tuple(spans))
+        return len(self.layouts) - 1
+
+    def add_frame(self, frame: int, tick: int, timestamp: float,
+                  key_offset: Optional[int] = None) -> None:
+        """Count a frame; key_offset is the file offset of its record if it is a keyframe."""
+        if key_offset is not None:
+            self._key_rows.append((frame, tick, timestamp, key_offset, len(self.layouts) - 1))
+            self._keys = None
+        self.frames = frame + 1
+        self.last_tick = tick
+        self.last_timestamp = timestamp
+
+    def add_laps(self, rows: Sequence[tuple]) -> None:
+        if rows:
+            self._lap_rows.extend(rows)
+            self._laps = None
+
+    # --- queries ---
+
+    @property
+    def keyframes(self) -> np.ndarray:
+        if self._keys is None:
+            self._keys = np.array(self._key_rows, dtype=KEY_DTYPE)
+        return self._keys
+
+    @property
+    def laps(self) -> np.ndarray:
+        if self._laps is None:
+            self._laps = np.array(self._lap_rows, dtype=LAP_DTYPE)
+        return self._laps
+
+    @property
+    def first_timestamp(self) -> float:
+        return float(self._key_rows[0][2]) if self._key_rows else 0.0
+
+    def key_for_frame(self, frame: int) -> np.void:
+        """The last keyframe row at or before `frame`."""
+        i = int(np.searchsorted(self.keyframes["frame"], frame, side="right")) - 1
+        if i < 0:
+            raise ValueError(f"no keyframe before frame {frame}")
+        return self.keyframes[i]
+
+    def key_for_time(self, timestamp: float) -> np.void:
+        """The last keyframe row recorded at or before `timestamp` (the first one if none)."""
+        i = int(np.searchsorted(self.keyframes["timestamp"], timestamp, side="right")) - 1
+        return self.keyframes[max(0, i)]
+
+    def lap_frame(self, lap: int, car_number: Optional[int] = None,
+                  struct_index: Optional[int] = None) -> Optional[int]:
+        """
+        First frame at which the car (by number or struct index; default: any car
+        but the pace car, i.e. the leader) has completed `lap` laps, or None.
+        """
+        rows = self.laps
+        if struct_index is not None:
+            rows = rows[rows["struct_index"] == struct_index]
+        elif car_number is not None:
+            rows = rows[rows["car_number"] == car_number]
+        else:
+            rows = rows[rows["struct_index"] != 0]
+        hits = rows["frame"][rows["lap"] >= lap]
+        return int(hits[0]) if len(hits) else None
+
+    def crossings(self, car_number: int) -> np.ndarray:
+        """Lap rows of one car (by number), in frame order."""
+        rows = self.laps
+        return rows[rows["car_number"] == car_number]
+
+    # --- storage ---
+
+    def pack(self) -> bytes:
+        keys, laps = self.keyframes, self.laps
+        parts = [_HEAD.pack(self.frames, self.last_tick, self.last_timestamp, self.has_laps,
+                            len(self.layouts), len(keys), len(laps))]
+        for spans in self.layouts:
+            parts.append(struct.pack("<I", len(spans)))
+            parts.extend(struct.pack("<II", off, length) for off, length in spans)
+        parts.append(keys.tobytes())
+        parts.append(laps.tobytes())
+        return zlib.compress(b"".join(parts))
+
+    @classmethod
+    def unpack(cls, payload: bytes) -> "SessionIndex":
+        raw = zlib.decompress(payload)
+        frames, last_tick, last_ts, has_laps, n_layouts, n_keys, n_laps = _HEAD.unpack_from(raw, 0)
+        index = cls(bool(has_laps))
+        index.frames, index.last_tick, index.last_timestamp = frames, last_tick, last_ts
+        pos = _HEAD.size
+        for _ in range(n_layouts):
+            (n,) = struct.unpack_from("<I", raw, pos)
+            pos += 4
+            index.layouts.append(tuple(struct.unpack_from("<II", raw, pos + 8 * i) for i in range(n)))
+            pos += 8 * n
+        keys = np.frombuffer(raw, dtype=KEY_DTYPE, count=n_keys, offset=pos)
+        pos += keys.nbytes
+        laps = np.frombuffer(raw, dtype=LAP_DTYPE, count=n_laps, offset=pos)
+        index._key_rows = keys.tolist()
+        index._lap_rows = laps.tolist()
+        index._keys, index._laps = keys, laps
+        return index
+
+
+class LapIndexer:
+    """
+    Lap rows for SessionIndex from consecutive frames: a row per car whose
+    lap_end_clock changed to a valid value, and a row per car on the first frame
+    after reset() (start of the recording, new span layout).
+    """
+
+    def __init__(self, cfg: Config):
+        self.cfg = cfg
+        self._n_fields = cfg.car_state_size // 4
+        self._prev_clock: Optional[np.ndarray] = None
+
+    def reset(self) -> None:
+        self._prev_clock = None
+
+    def feed(self, frame: int, tick: int, timestamp: float, spans: Spans, data) -> List[tuple]:
+        cfg = self.cfg
+        pos = locate(spans, cfg.cars_addr, 4)
+        if pos is None:
+            return []
+        raw_count = int.from_bytes(data[pos:pos + 4], "little", signed=True)
+        if not 0 < raw_count <= cfg.max_cars:
+            return []
+        pos = locate(spans, cfg.car_state_base, raw_count * cfg.car_state_size)
+        if pos is None:
+            return []
+        blocks = np.frombuffer(data, dtype="<u4", count=raw_count * self._n_fields,
+                               offset=pos).reshape(raw_count, self._n_fields)
+        clock = blocks[:, cfg.field_lap_clock_end // 4].copy()
+        prev = self._prev_clock
+        self._prev_clock = clock
+        if prev is None or prev.shape != clock.shape:
+            cars = range(raw_count)
+        else:
+            cars = np.flatnonzero((clock != prev) & (clock != SENTINEL_UNSIGNED)).tolist()
+            if not cars:
+                return []
+        laps = blocks[:, cfg.current_lap // 4]
+        return [(frame, tick, timestamp, i, self._car_number(spans, data, i), max(int(laps[i]) - 1, 0))
+                for i in cars]
+
+    def _car_number(self, spans: Spans, data, struct_index: int) -> int:
+        cfg = self.cfg
+        slot = struct_index + cfg.numbers_index_base + cfg.numbers_shift
+        if slot < 0:
+            return NO_CAR_NUMBER
+        pos = locate(spans, cfg.car_numbers_base + slot * 4, 4)
+        if pos is None:
+            return NO_CAR_NUMBER
+        return int.from_bytes(data[pos:pos + 4], "little", signed=True)
@@ -0,0 +1,786 @@
+"""
+session_recorder.py
+
+Full-session recording of the raw memory regions MemoryReader decodes, at the poll
+rate, for offline analysis and replay.
+
+SessionRecorder is attached to a MemoryReader (reader.recorder = recorder). After
+every successful tick the reader hands it the ReadPlan spans it just fetched (the
+car_state blob, run order, names/numbers and the header ints); record() copies them
+into one (recycled) frame buffer and puts it on a bounded queue. A background thread XORs the frame
+against the previous one, compresses it and appends it to the file, so the polling
+thread never waits on compression or disk. When the queue is full the frame is
+dropped and counted instead (frames_dropped); the next frame is simply a delta
+against the last one written.
+
+File layout (little-endian):
+    header   magic "ICR2REC1" | format (u16) | codec (u8) | 5 pad | version (8 bytes,
+             ASCII, NUL-padded) | start time (f64, epoch seconds)
+    records  kind (u8) | 3 pad | payload length (u32) | tick (u64) | timestamp (f64)
+             followed by the payload:
+               LAYOUT  span count (u32), then exe_offset (u32), length (u32) per span
+               KEY     compressed frame (the spans' bytes, concatenated in span order)
+               DELTA   compressed XOR of the frame with the previous frame
+               INDEX   SessionIndex.pack() (core/session_index.py)
+               FOOTER  magic "ICR2IDX1" | file offset of the INDEX record (u64)
+
+A LAYOUT record precedes the first frame and every change of the read plan (the
+field grew), and is always followed by a KEY frame; KEY frames are also written
+every keyframe_interval_s so a damaged or truncated file can be resynchronised.
+Frames are compressed with zlib, or with zstandard when it is installed and
+codec="auto"/"zstd". close() appends the INDEX and FOOTER records: keyframe
+offsets and, when the recorder has a Config, every car's lap-line crossings.
+
+Reading back: iter_frames() decodes a recording front to back. SessionRecording
+maps the file and loads its index (or scans the record headers of an unindexed
+file), so frame(i) and index_at(t) jump straight to the nearest keyframe.
+ReplayMemory is a MemoryBackend over one frame at a time, so MemoryReader (and
+everything behind it) runs on a recording exactly as on the game.
+find_lap_frame() locates the first frame of a lap. Playback pacing lives in
+updater/replay.py.
+
+Usage (rebuilds the index of a recording whose recorder did not close it):
+    python -m core.session_recorder session_....icr2rec [--version DOS]
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import argparse
+import bisect
+import collections
+import datetime
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Deque, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.config import Config
+from core.memory_backend import MemoryBackend
+from core.reader import MemoryReader
+from core.session_index import LapIndexer, SessionIndex
+
+try:
+    import zstandard
+except ImportError:   # optional; zlib is always available
+    zstandard = None
+
+MAGIC = b"ICR2REC1"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHB5x8sd")
+_RECORD = struct.Struct("<B3xIQd")
+_SPAN = struct.Struct("<II")
+
+KIND_LAYOUT = 1
+KIND_KEY = 2
+KIND_DELTA = 3
+KIND_INDEX = 4
+KIND_FOOTER = 5
+
+INDEX_MAGIC = b"ICR2IDX1"
+_FOOTER = struct.Struct("<8sQ")
+
+CODEC_ZLIB = 0
+CODEC_ZSTD = 1
+CODEC_NAMES = {"zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+Spans = Tuple[Tuple[int, int], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Frame:
+    """One decoded tick: the read-plan spans and their bytes, concatenated in span order."""
+    tick: int
+    timestamp: float
+    spans: Spans
+    data: bytes
+
+
+def available_codecs() -> List[str]:
+    return ["zlib", "zstd"] if zstandard is not None else ["zlib"]
+
+
+def _compressor(codec: int, level: Optional[int]):
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress
+    lvl = 1 if level is None else level
+    return lambda data: zlib.compress(data, lvl)
+
+
+def _decompressor(codec: int):
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("recording is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress
+    return zlib.decompress
+
+
+def xor_frames(a, b) -> bytes:
+    """Bytewise XOR of two equal-length frames (a delta, and its own inverse)."""
+    dtype = np.uint64 if len(a) % 8 == 0 else np.uint8
+    return np.bitwise_xor(np.frombuffer(a, dtype=dtype), np.frombuffer(b, dtype=dtype)).tobytes()
+
+
+def _pack_layout(spans: Spans) -> bytes:
+    return struct.pack("<I", len(spans)) + b"".join(_SPAN.pack(off, length) for off, length in spans)
+
+
+def _unpack_layout(payload: bytes) -> Spans:
+    (n,) = struct.unpack_from("<I", payload, 0)
+    return tuple(_SPAN.unpack_from(payload, 4 + i * _SPAN.size) for i in range(n))
+
+
+def _index_records(index: SessionIndex, offset: int) -> bytes:
+    """The INDEX and FOOTER records for an index written at file offset `offset`."""
+    payload = index.pack()
+    footer = _FOOTER.pack(INDEX_MAGIC, offset)
+    return (_RECORD.pack(KIND_INDEX, len(payload), index.last_tick, index.last_timestamp) + payload
+            + _RECORD.pack(KIND_FOOTER, len(footer), index.last_tick, index.last_timestamp) + footer)
+
+
+def session_path(folder: str = "", base_name: str = "session") -> str:
+    """Timestamped recording path, e.g. session_2025-10-08_00-53-42.icr2rec."""
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    return os.path.join(folder, f"{base_name}_{timestamp}.icr2rec")
+
+
+class SessionRecorder:
+    """Appends raw read-plan frames to a recording from a background thread; see module docstring."""
+
+    def __init__(self, path: str, version: str = "", queue_frames: int = 256,
+                 keyframe_interval_s: float = 10.0, codec: str = "auto",
+                 level: Optional[int] = None, cfg: Optional[Config] = None):
+        if codec == "auto":
+            codec = "zstd" if zstandard is not None else "zlib"
+        if codec not in CODEC_NAMES:
+            raise ValueError(f"unknown codec {codec!r} (expected one of {sorted(CODEC_NAMES)})")
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("codec 'zstd' needs the zstandard package")
+        self.path = path
+        self.codec = codec
+        self.keyframe_interval_s = max(0.0, float(keyframe_interval_s))
+        self._compress = _compressor(CODEC_NAMES[codec], level)
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        self._file = open(path, "wb", buffering=1 << 16)
+        self.start_time = time.time()
+        self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, CODEC_NAMES[codec],
+                                      version.encode("ascii")[:8], self.start_time))
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, int(queue_frames)))
+        # frame buffers handed back by the writer, reused by record() (no allocation per tick)
+        self._free: Deque[bytearray] = collections.deque()
+        self._closing = False
+        self._spans: Optional[Spans] = None
+        self._prev: Optional[bytearray] = None
+        self._last_key = 0.0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.keyframes = 0
+        self.raw_bytes = 0          # frame bytes before delta/compression
+        self.bytes_written = _HEADER.size
+        self.first_timestamp: Optional[float] = None
+        self.last_timestamp: Optional[float] = None
+        self.error: Optional[str] = None
+        # seek index, appended on close; lap crossings need the Config offsets
+        self.index = SessionIndex(has_laps=cfg is not None)
+        self._laps = LapIndexer(cfg) if cfg is not None else None
+
+        self._thread = threading.Thread(target=self._run, name="SessionRecorder", daemon=True)
+        self._thread.start()
+        log.info(f"Recording session to {path} ({codec})")
+
+    @classmethod
+    def for_config(cls, cfg) -> "SessionRecorder":
+        """A recorder writing a timestamped file into cfg.record_dir."""
+        return cls(session_path(cfg.record_dir), version=cfg.version,
+                   keyframe_interval_s=cfg.record_keyframe_s, cfg=cfg)
+
+    @property
+    def closed(self) -> bool:
+        return self._closing
+
+    @property
+    def duration_s(self) -> float:
+        if self.first_timestamp is None:
+            return 0.0
+        return self.last_timestamp - self.first_timestamp
+
+    @property
+    def bytes_per_minute(self) -> float:
+        """Recording growth rate over the ticks written so far."""
+        duration = self.duration_s
+        return self.bytes_written / duration * 60.0 if duration > 0 else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames_written, "dropped": self.frames_dropped,
+            "keyframes": self.keyframes, "raw_bytes": self.raw_bytes,
+            "bytes": self.bytes_written, "duration_s": self.duration_s,
+            "bytes_per_minute": self.bytes_per_minute,
+            "ratio": self.raw_bytes / self.bytes_written if self.bytes_written else 0.0,
+        }
+
+    # --- producer side (polling thread) ---
+
+    def record(self, tick: int, spans: Sequence[Tuple[int, int]], buffers: Sequence,
+               timestamp: Optional[float] = None) -> bool:
+        """
+        Queue one tick: `buffers` hold the bytes of `spans` (e.g. the ReadPlan span
+        buffers). The bytes are copied, so the buffers may be refilled right away.
+        Never blocks; returns False if the frame was dropped (queue full or closed).
+        """
+        if self._closing:
+            return False
+        size = sum(len(b) for b in buffers)
+        try:
+            frame = self._free.pop()
+            if len(frame) != size:
+                frame = bytearray(size)
+        except IndexError:
+            frame = bytearray(size)
+        pos = 0
+        for b in buffers:
+            n = len(b)
+            frame[pos:pos + n] = b
+            pos += n
+        item = (int(tick), time.time() if timestamp is None else timestamp, tuple(spans), frame)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.frames_dropped += 1
+            self._free.append(frame)
+            return False
+        return True
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Write the queued frames, stop the thread and close the file (idempotent)."""
+        if self._closing:
+            return
+        self._closing = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            log.warning(f"SessionRecorder: {self.path} did not finish within {timeout}s")
+            return
+        s = self.stats()
+        log.info(f"Recorded {s['frames']} frames to {self.path}: {s['bytes'] / 1e6:.2f} MB, "
+                 f"{s['bytes_per_minute'] / 1e6:.2f} MB/min, x{s['ratio']:.0f} compression, "
+                 f"{s['dropped']} dropped")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    # --- writer thread ---
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write_frame(*item)
+            except (OSError, ValueError) as e:
+                if str(e) != self.error:
+                    log.error(f"SessionRecorder: writing {self.path} failed: {e}")
+                self.error = str(e)
+        try:
+            self._file.write(_index_records(self.index, self.bytes_written))
+        except OSError as e:
+            log.error(f"SessionRecorder: writing the index of {self.path} failed: {e}")
+        try:
+            self._file.close()
+        except OSError as e:
+            log.error(f"SessionRecorder: closing {self.path} failed: {e}")
+
+    def _write_record(self, kind: int, tick: int, timestamp: float, payload: bytes) -> int:
+        """Append one record; returns its file offset."""
+        offset = self.bytes_written
+        self._file.write(_RECORD.pack(kind, len(payload), tick, timestamp))
+        self._file.write(payload)
+        self.bytes_written += _RECORD.size + len(payload)
+        return offset
+
+    def _write_frame(self, tick: int, timestamp: float, spans: Spans, data: bytearray) -> None:
+        if spans != self._spans:
+            self._write_record(KIND_LAYOUT, tick, timestamp, _pack_layout(spans))
+            self._spans = spans
+            self._prev = None   # a different size; the next record() allocates afresh
+            self.index.add_layout(spans)
+            if self._laps is not None:
+                self._laps.reset()
+        frame = self.frames_written
+        if self._prev is None or timestamp - self._last_key >= self.keyframe_interval_s:
+            offset = self._write_record(KIND_KEY, tick, timestamp, self._compress(data))
+            self.index.add_frame(frame, tick, timestamp, offset)
+            self._last_key = timestamp
+            self.keyframes += 1
+            # keyframes are resync points: make everything up to here durable
+            self._file.flush()
+        else:
+            self._write_record(KIND_DELTA, tick, timestamp, self._compress(xor_frames(data, self._prev)))
+            self.index.add_frame(frame, tick, timestamp)
+        if self._laps is not None:
+            self.index.add_laps(self._laps.feed(frame, tick, timestamp, spans, data))
+        if self._prev is not None:
+            self._free.append(self._prev)
+        self._prev = data
+        self.frames_written += 1
+        self.raw_bytes += len(data)
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+
+
+@dataclass(frozen=True)
+class RecordingHeader:
+    format: int
+    codec: str
+    version: str
+    start_time: float
+
+
+def read_header(f) -> RecordingHeader:
+    raw = f.read(_HEADER.size)
+    if len(raw) < _HEADER.size:
+        raise ValueError("not a session recording (file too short)")
+    magic, fmt, codec, version, start = _HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError(f"not a session recording (magic {magic!r})")
+    if fmt != FORMAT_VERSION:
+        raise ValueError(f"unsupported recording format {fmt}")
+    names = {v: k for k, v in CODEC_NAMES.items()}
+    if codec not in names:
+        raise ValueError(f"unknown recording codec {codec}")
+    return RecordingHeader(fmt, names[codec], version.rstrip(b"\x00").decode("ascii"), start)
+
+
+def iter_frames(path: str) -> Iterator[Frame]:
+    """
+    Decode a recording frame by frame. A truncated last record (recorder killed
+    mid-write) ends the iteration quietly.
+    """
+    with open(path, "rb") as f:
+        header = read_header(f)
+        decompress = _decompressor(CODEC_NAMES[header.codec])
+        spans: Optional[Spans] = None
+        prev: Optional[bytes] = None
+        while True:
+            raw = f.read(_RECORD.size)
+            if len(raw) < _RECORD.size:
+                return
+            kind, length, tick, timestamp = _RECORD.unpack(raw)
+            payload = f.read(length)
+            if len(payload) < length:
+                log.warning(f"{path}: truncated record at tick {tick}")
+                return
+            if kind == KIND_LAYOUT:
+                spans, prev = _unpack_layout(payload), None
+                continue
+            if kind == KIND_KEY:
+                data = decompress(payload)
+            elif kind == KIND_DELTA:
+                if prev is None:
+                    raise ValueError(f"{path}: delta frame at tick {tick} without a keyframe")
+                data = xor_frames(decompress(payload), prev)
+            else:
+                # unknown record kinds are skipped so newer files stay readable
+                continue
+            prev = data
+            yield Frame(tick, timestamp, spans, data)
+
+
+def read_index(mm) -> Optional[Tuple[SessionIndex, int]]:
+    """The stored index of a mapped recording and its file offset, or None if it has none."""
+    tail = _RECORD.size + _FOOTER.size
+    if len(mm) < _HEADER.size + tail:
+        return None
+    kind, length, _, _ = _RECORD.unpack_from(mm, len(mm) - tail)
+    if kind != KIND_FOOTER or length != _FOOTER.size:
+        return None
+    magic, offset = _FOOTER.unpack_from(mm, len(mm) - _FOOTER.size)
+    if magic != INDEX_MAGIC or offset + _RECORD.size > len(mm) - tail:
+        return None
+    kind, length, _, _ = _RECORD.unpack_from(mm, offset)
+    if kind != KIND_INDEX:
+        return None
+    payload = offset + _RECORD.size
+    return SessionIndex.unpack(mm[payload:payload + length]), offset
+
+
+def _records(mm, offset: int, end: int, path: str):
+    """(kind, tick, timestamp, record offset, payload offset, length) of each complete record."""
+    while offset + _RECORD.size <= end:
+        kind, length, tick, timestamp = _RECORD.unpack_from(mm, offset)
+        payload = offset + _RECORD.size
+        if payload + length > end:
+            log.warning(f"{path}: truncated record at tick {tick}")
+            return
+        yield kind, tick, timestamp, offset, payload, length
+        offset = payload + length
+
+
+def scan_index(mm, path: str, decompress, cfg: Optional[Config] = None,
+               end: Optional[int] = None) -> Tuple[SessionIndex, int]:
+    """
+    Build the index of a mapped recording by walking its records. Keyframes only
+    need the record headers; with a Config every frame is decoded as well, for the
+    lap crossings. Returns the index and the end of the last complete record.
+    """
+    end = len(mm) if end is None else end
+    index = SessionIndex(has_laps=cfg is not None)
+    laps = LapIndexer(cfg) if cfg is not None else None
+    frame = 0
+    prev = None
+    last = _HEADER.size
+    for kind, tick, timestamp, offset, payload, length in _records(mm, _HEADER.size, end, path):
+        last = payload + length
+        if kind == KIND_LAYOUT:
+            index.add_layout(_unpack_layout(mm[payload:payload + length]))
+            prev = None
+            if laps is not None:
+                laps.reset()
+            continue
+        if kind not in (KIND_KEY, KIND_DELTA) or not index.layouts:
+            continue
+        index.add_frame(frame, tick, timestamp, offset if kind == KIND_KEY else None)
+        if laps is not None:
+            if kind == KIND_KEY:
+                prev = decompress(mm[payload:payload + length])
+            elif prev is None:
+                raise ValueError(f"{path}: delta frame at tick {tick} without a keyframe")
+            else:
+                prev = xor_frames(decompress(mm[payload:payload + length]), prev)
+            index.add_laps(laps.feed(frame, tick, timestamp, index.layouts[-1], prev))
+        frame += 1
+    return index, last
+
+
+def rebuild_index(path: str, cfg: Optional[Config] = None) -> SessionIndex:
+    """
+    (Re)write the index of a recording, e.g. one whose recorder was killed. An
+    existing index and any truncated last record are cut off first. The lap
+    crossings are decoded with `cfg` (default: the Config for the recording's
+    game version).
+    """
+    with open(path, "r+b") as f:
+        header = read_header(f)
+        if cfg is None:
+            cfg = Config.for_version(header.version) if header.version else Config()
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            found = read_index(mm)
+            t0 = time.perf_counter()
+            index, end = scan_index(mm, path, _decompressor(CODEC_NAMES[header.codec]), cfg,
+                                    end=found[1] if found else None)
+        finally:
+            mm.close()
+        f.truncate(end)
+        f.seek(end)
+        f.write(_index_records(index, end))
+    log.info(f"Indexed {path}: {index.frames} frames, {len(index.keyframes)} keyframes, "
+             f"{len(index.laps)} lap rows in {time.perf_counter() - t0:.1f} s")
+    return index
+
+
+@dataclass(frozen=True, slots=True)
+class _Cursor:
+    """Position in a recording: a frame, where its successor starts, and (if decoded) its data."""
+    frame: int
+    tick: int
+    timestamp: float
+    next_offset: int
+    layout: int
+    data: Optional[bytes]
+
+
+class SessionRecording:
+    """
+    Random access to a recording. The file is mapped and its SessionIndex loaded
+    (an unindexed file's record headers are scanned instead, without decompressing;
+    pass cfg to also derive its lap crossings). frame(i) decodes from the nearest
+    keyframe at or before i, or from the previously decoded frame when that is
+    closer, so sequential playback costs one delta per frame and a seek at most
+    one keyframe interval of deltas.
+    """
+
+    def __init__(self, path: str, cfg: Optional[Config] = None):
+        self.path = path
+        self._f = open(path, "rb")
+        try:
+            self.header = read_header(self._f)
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._f.close()
+            raise
+        self._decompress = _decompressor(CODEC_NAMES[self.header.codec])
+        found = read_index(self._mm)
+        self.indexed = found is not None
+        if found is not None:
+            self.index = found[0]
+        else:
+            log.info(f"{path} has no index, scanning it")
+            self.index, _ = scan_index(self._mm, path, self._decompress, cfg)
+        self._cursor: Optional[_Cursor] = None
+        log.info(f"Opened recording {path}: {len(self)} frames, {self.duration_s:.0f} s, "
+                 f"{len(self.keyframes)} keyframes")
+
+    def __len__(self) -> int:
+        return self.index.frames
+
+    @property
+    def version(self) -> str:
+        return self.header.version
+
+    @property
+    def layouts(self) -> List[Spans]:
+        return self.index.layouts
+
+    @property
+    def keyframes(self) -> np.ndarray:
+        """Frame numbers of the keyframes."""
+        return self.index.keyframes["frame"]
+
+    @property
+    def first_timestamp(self) -> float:
+        return self.index.first_timestamp
+
+    @property
+    def duration_s(self) -> float:
+        return self.index.last_timestamp - self.index.first_timestamp if len(self) else 0.0
+
+    def index_at(self, timestamp: float) -> int:
+        """The last frame recorded at or before `timestamp` (epoch seconds; 0 if before the first)."""
+        key = self.index.key_for_time(timestamp)
+        cur = self._cursor
+        if cur is None or not int(key["frame"]) <= cur.frame or cur.timestamp > timestamp:
+            cur = self._at_key(key, decode=False)
+        while cur.frame + 1 < len(self):
+            nxt = self._step(cur, decode=False)
+            if nxt.timestamp > timestamp:
+                break
+            cur = nxt
+        return cur.frame
+
+    def index_at_offset(self, seconds: float) -> int:
+        """The frame `seconds` into the recording."""
+        return self.index_at(self.first_timestamp + seconds) if len(self) else 0
+
+    def frame(self, index: int) -> Frame:
+        if not 0 <= index < len(self):
+            raise IndexError(f"frame {index} out of range (0..{len(self) - 1})")
+        key = self.index.key_for_frame(index)
+        cur = self._cursor
+        if cur is None or not int(key["frame"]) <= cur.frame <= index:
+            cur = self._at_key(key, decode=True)
+        while cur.frame < index:
+            cur = self._step(cur, decode=True)
+        self._cursor = cur
+        return Frame(cur.tick, cur.timestamp, self.index.layouts[cur.layout], cur.data)
+
+    def _at_key(self, key, decode: bool) -> _Cursor:
+        offset = int(key["offset"])
+        kind, length, tick, timestamp = _RECORD.unpack_from(self._mm, offset)
+        if kind != KIND_KEY:
+            raise ValueError(f"{self.path}: index points at a record of kind {kind}, not a keyframe")
+        payload = offset + _RECORD.size
+        data = self._decompress(self._mm[payload:payload + length]) if decode else None
+        return _Cursor(int(key["frame"]), tick, timestamp, payload + length, int(key["layout"]), data)
+
+    def _step(self, cur: _Cursor, decode: bool) -> _Cursor:
+        """The frame after `cur` (decoded if `decode`; cur must then carry its data)."""
+        layout, data = cur.layout, cur.data
+        for kind, tick, timestamp, _, payload, length in _records(
+                self._mm, cur.next_offset, len(self._mm), self.path):
+            if kind == KIND_LAYOUT:
+                layout, data = layout + 1, None
+                continue
+            if kind == KIND_KEY:
+                data = self._decompress(self._mm[payload:payload + length]) if decode else None
+            elif kind == KIND_DELTA:
+                if decode:
+                    if data is None:
+                        raise ValueError(f"{self.path}: delta frame at tick {tick} without a keyframe")
+                    data = xor_frames(self._decompress(self._mm[payload:payload + length]), data)
+            else:
+                continue
+            return _Cursor(cur.frame + 1, tick, timestamp, payload + length, layout, data)
+        raise IndexError(f"{self.path}: no frame after {cur.frame}")
+
+    def close(self) -> None:
+        if self._f is None:
+            return
+        self._mm.close()
+        self._f.close()
+        self._f = None
+
+    def __enter__(self) -> "SessionRecording":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+class ReplayMemory(MemoryBackend):
+    """
+    MemoryBackend serving one frame of a SessionRecording at a time, so a
+    MemoryReader decodes it exactly as it decoded the live tick. seek()/advance()
+    move between frames (like RecordedMemory). Bytes the recording did not cover
+    (e.g. a ReadPlan merged with a larger gap than when recording) read as zeros.
+    """
+
+    def __init__(self, recording: SessionRecording, start: int = 0, loop: bool = False):
+        if not len(recording):
+            raise ValueError(f"{recording.path}: recording has no frames")
+        self.recording = recording
+        self.loop = loop
+        self.index = -1
+        self.frame: Optional[Frame] = None
+        self._spans: Optional[Spans] = None
+        self._starts: List[int] = []
+        self._bases: List[int] = []
+        self.seek(start)
+
+    @property
+    def timestamp(self) -> float:
+        return self.frame.timestamp
+
+    def seek(self, index: int) -> None:
+        frame = self.recording.frame(int(index))
+        if frame.spans is not self._spans:
+            self._spans = frame.spans
+            self._starts = [off for off, _ in frame.spans]
+            self._bases = [0]
+            for _, length in frame.spans:
+                self._bases.append(self._bases[-1] + length)
+        self.index = int(index)
+        self.frame = frame
+
+    def advance(self) -> bool:
+        """Move to the next frame. Returns False once the recording is exhausted."""
+        nxt = self.index + 1
+        if nxt >= len(self.recording):
+            if not self.loop:
+                return False
+            nxt = 0
+        self.seek(nxt)
+        return True
+
+    def _locate(self, exe_offset: int, length: int) -> Optional[int]:
+        """Position of [exe_offset, +length) in the frame data, if one span holds all of it."""
+        i = bisect.bisect_right(self._starts, exe_offset) - 1
+        if i < 0:
+            return None
+        rel = exe_offset - self._starts[i]
+        if rel + length > self._spans[i][1]:
+            return None
+        return self._bases[i] + rel
+
+    def _gather(self, exe_offset: int, length: int) -> bytearray:
+        out = bytearray(length)
+        end = exe_offset + length
+        for (off, span_len), base in zip(self._spans, self._bases):
+            lo, hi = max(off, exe_offset), min(off + span_len, end)
+            if lo < hi:
+                out[lo - exe_offset:hi - exe_offset] = self.frame.data[base + lo - off:base + hi - off]
+        return out
+
+    def read_bytes(self, exe_offset: int, length: int) -> bytes:
+        exe_offset = int(exe_offset)
+        pos = self._locate(exe_offset, length)
+        if pos is None:
+            return bytes(self._gather(exe_offset, length))
+        return self.frame.data[pos:pos + length]
+
+    def read_into(self, exe_offset: int, buffer) -> int:
+        view = memoryview(buffer).cast('B')
+        n = len(view)
+        exe_offset = int(exe_offset)
+        pos = self._locate(exe_offset, n)
+        if pos is None:
+            view[:] = self._gather(exe_offset, n)
+        else:
+            view[:] = memoryview(self.frame.data)[pos:pos + n]
+        return n
+
+
+def find_lap_frame(recording: SessionRecording, cfg, lap: int, car_number: Optional[int] = None,
+                   struct_index: Optional[int] = None) -> Optional[int]:
+    """
+    First frame in which the car with `car_number` or at `struct_index` (default:
+    the leader, i.e. any car but the pace car) has completed `lap` laps, or None if
+    the recording never gets there. A lookup in the recording's lap index when it
+    has one; otherwise a binary search over the keyframes (laps only go up during
+    a session), then a frame-by-frame scan of one keyframe interval, each probe a
+    read_snapshot().
+    """
+    if recording.index.has_laps:
+        return recording.index.lap_frame(lap, car_number, struct_index)
+
+    memory = ReplayMemory(recording)
+    reader = MemoryReader(memory, cfg)
+    if struct_index is None and car_number is not None:
+        drivers = reader.read_snapshot().drivers
+        struct_index = next((i for i, d in drivers.items() if d.car_number == car_number), None)
+        if struct_index is None:
+            log.warning(f"Car #{car_number} is not in {recording.path}")
+            return None
+
+    def laps_at(index: int) -> int:
+        memory.seek(index)
+        laps = reader.read_snapshot().laps_completed
+        if struct_index is not None:
+            return int(laps[struct_index]) if struct_index < len(laps) else -1
+        return int(laps[1:].max()) if len(laps) > 1 else -1
+
+    keys = recording.keyframes
+    if laps_at(0) >= lap:
+        return 0
+    lo, hi = 0, len(keys)   # laps_at(keys[lo]) < lap (keys[0] is frame 0); keys[hi:] >= lap
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if laps_at(int(keys[mid])) >= lap:
+            hi = mid
+        else:
+            lo = mid
+    end = int(keys[hi]) if hi < len(keys) else len(recording)
+    for index in range(int(keys[lo]) + 1, end):
+        if laps_at(index) >= lap:
+            return index
+    return end if hi < len(keys) else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Write (or rewrite) the seek and lap index of a session recording.")
+    parser.add_argument("path", help="recording (.icr2rec)")
+    parser.add_argument("--version", help="game version for the lap index "
+                                          "(default: the one stored in the recording)")
+    args = parser.parse_args()
+    cfg = Config.for_version(args.version) if args.version else None
+    index = rebuild_index(args.path, cfg)
+    laps = index.laps
+    if len(laps):
+        print(f"{index.frames} frames, {len(index.keyframes)} keyframes, laps "
+              f"{laps['lap'].min()}..{laps['lap'].max()} for {len(np.unique(laps['struct_index']))} cars")
+    else:
+        print(f"{index.frames} frames, {len(index.keyframes)} keyframes, no lap crossings")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
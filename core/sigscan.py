@@ -0,0 +1,136 @@
+"""
+sigscan.py
+
+Pure signature scanner used to locate the ICR2 EXE inside the game process.
+
+The scan core works on a list of MemoryRegion plus a read(address, length) callable,
+so it has no Windows dependency and can be exercised against synthetic address
+spaces. icr2_memory.py feeds it the regions from VirtualQueryEx and pm.read_bytes.
+
+Speed-ups over a plain linear scan:
+  • regions whose type cannot hold the emulated RAM are skipped (region_types)
+  • chunks grow geometrically while reads succeed (fewer, larger reads)
+  • regions are scanned concurrently in a thread pool (process reads release the GIL)
+  • an optional hint address is verified with a single read before any scanning
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional
+
+# VirtualQueryEx MEMORY_BASIC_INFORMATION.Type values
+MEM_PRIVATE = 0x20000
+MEM_MAPPED = 0x40000
+MEM_IMAGE = 0x1000000
+
+ReadFn = Callable[[int, int], bytes]
+
+
+@dataclass(frozen=True)
+class MemoryRegion:
+    """A committed, readable region of the target process."""
+    base: int
+    size: int
+    type: int = MEM_PRIVATE
+
+
+def filter_regions(regions: Iterable[MemoryRegion],
+                   region_types: Optional[Iterable[int]] = None) -> List[MemoryRegion]:
+    """Keep regions whose type is in region_types (all regions if None), in address order."""
+    allowed = None if region_types is None else set(region_types)
+    return sorted((r for r in regions if r.size > 0 and (allowed is None or r.type in allowed)),
+                  key=lambda r: r.base)
+
+
+def scan_region(read: ReadFn, start: int, size: int, needle: bytes,
+                min_chunk: int = 64 * 1024, max_chunk: int = 4 * 1024 * 1024,
+                stop: Optional[threading.Event] = None) -> Optional[int]:
+    """
+    Return the address of the first `needle` in [start, start+size), or None.
+    Chunks start at min_chunk and double up to max_chunk while reads succeed; a failed
+    read is retried with half the chunk (which also becomes the new ceiling) before the
+    range is skipped.
+    """
+    if size <= 0 or not needle:
+        return None
+    end = start + size
+    overlap = len(needle) - 1
+    leftover = b""
+    chunk = min_chunk
+    pos = start
+    while pos < end:
+        if stop is not None and stop.is_set():
+            return None
+        to_read = min(chunk, end - pos)
+        try:
+            data = read(pos, to_read)
+        except Exception:
+            if chunk > min_chunk:
+                chunk //= 2
+                max_chunk = chunk
+                continue
+            pos += to_read
+            leftover = b""
+            continue
+        if leftover:
+            data = leftover + data
+        idx = data.find(needle)
+        if idx != -1:
+            return (pos - len(leftover)) + idx
+        leftover = data[-overlap:] if overlap else b""
+        pos += to_read
+        chunk = min(chunk * 2, max_chunk)
+    return None
+
+
+def verify_hint(read: ReadFn, address: int, needle: bytes) -> bool:
+    """True if `needle` sits exactly at `address` (one read)."""
+    try:
+        return bytes(read(address, len(needle))) == needle
+    except Exception:
+        return False
+
+
+def scan_regions(regions: Iterable[MemoryRegion], read: ReadFn, needle: bytes,
+                 region_types: Optional[Iterable[int]] = None,
+                 hint: Optional[int] = None, workers: int = 4,
+                 min_chunk: int = 64 * 1024, max_chunk: int = 4 * 1024 * 1024) -> Optional[int]:
+    """
+    Find `needle` in the given regions and return its address (lowest region first),
+    or None. A `hint` address is checked with one read before anything is scanned.
+    """
+    if not needle:
+        return None
+    if hint is not None and verify_hint(read, hint, needle):
+        log.debug(f"Signature confirmed at hint 0x{hint:08X}")
+        return hint
+
+    candidates = filter_regions(regions, region_types)
+    if not candidates:
+        return None
+
+    if workers <= 1 or len(candidates) == 1:
+        for r in candidates:
+            hit = scan_region(read, r.base, r.size, needle, min_chunk, max_chunk)
+            if hit is not None:
+                return hit
+        return None
+
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(scan_region, read, r.base, r.size, needle,
+                               min_chunk, max_chunk, stop)
+                   for r in candidates]
+        try:
+            # collect in address order so the result matches a sequential scan
+            for fut in futures:
+                hit = fut.result()
+                if hit is not None:
+                    return hit
+        finally:
+            stop.set()
+    return None
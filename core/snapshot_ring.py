@@ -0,0 +1,360 @@
+"""
+snapshot_ring.py
+
+Fixed-layout RaceState snapshots in a multiprocessing.shared_memory ring.
+
+The reader process decodes each tick and writes it into the next slot of the
+ring (SnapshotRing(create=True).write); the GUI process attaches to the same block
+by name and reads the newest slot in place. Every slot is a NumPy structured
+record, so latest_slot() hands out zero-copy column views; read_latest() makes
+the one copy needed for an immutable RaceState.
+
+Consistency is a per-slot seqlock: the writer makes the slot's sequence number
+odd while it writes and even (2 * generation) when done. A reader checks the
+number before and after using a slot and retries if it changed or was odd. With
+N slots a slot is only rewritten N-1 ticks after it was published, so retries
+are rare.
+
+Layout: header record, then `slots` slot records (see header_dtype/slot_dtype).
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Dict, FrozenSet, Optional, Tuple
+
+import numpy as np
+
+from core.model import CHANGE_FIELDS, CarState, Driver, RaceState, RawValues
+
+MAGIC = b"ICR2RNG1"
+NAME_BYTES = 64
+TRACK_BYTES = 32
+ERROR_BYTES = 256
+
+# CarState scalar fields stored as one int64 column each (None -> NONE_VALUE)
+CAR_COLUMNS = ("laps_left", "laps_completed", "last_lap_ms", "laps_down", "lap_end_clock",
+               "lap_start_clock", "car_status", "current_lp", "fuel_laps_remaining", "dlat", "dlong")
+NONE_VALUE = np.iinfo(np.int64).min
+
+
+def header_dtype() -> np.dtype:
+    return np.dtype([
+        ("magic", "S8"),
+        ("slots", "<i4"),
+        ("capacity", "<i4"),
+        ("n_fields", "<i4"),
+        ("latest", "<i4"),            # slot index of the newest complete snapshot, -1 = none
+        ("published", "<u8"),         # snapshots written so far
+        ("error_seq", "<u8"),         # bumped on every failed poll
+        ("error", f"S{ERROR_BYTES}"),
+        ("failing", "u1"),            # the writer's last poll failed
+        ("interval_ms", "<f8"),       # writer's current poll interval
+        ("base_ms", "<f8"),           # requested base interval (written by the consumer)
+        ("writer_pid", "<i8"),
+    ])
+
+
+def slot_dtype(capacity: int, n_fields: int) -> np.dtype:
+    return np.dtype([
+        ("seq", "<u8"),
+        ("tick", "<u8"),
+        ("timestamp", "<f8"),
+        ("raw_count", "<i4"),
+        ("display_count", "<i4"),
+        ("total_laps", "<i4"),
+        ("track_length", "<f8"),
+        ("track_name", f"S{TRACK_BYTES}"),
+        ("has_changes", "u1"),
+        ("order", "<i4", (capacity,)),               # -1 = None
+        ("name", f"S{NAME_BYTES}", (capacity,)),
+        ("car_number", "<i8", (capacity,)),           # NONE_VALUE = None
+        ("last_lap_valid", "u1", (capacity,)),
+        ("changed", "u1", (capacity,)),               # block changed since previous tick
+        ("changed_fields", "u1", (capacity,)),        # bit i -> CHANGE_FIELDS[i]
+        ("columns", "<i8", (len(CAR_COLUMNS), capacity)),
+        ("values", "<i4", (capacity, n_fields)),
+    ], align=True)
+
+
+class RingFull(ValueError):
+    """The snapshot has more cars than the ring's capacity."""
+
+
+def _attach(name: str, untrack: bool) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block. With untrack, keep this process's resource
+    tracker from unlinking it at exit (the creator owns it). Children of the
+    creating process share its tracker and must not untrack.
+    """
+    if not untrack:
+        return shared_memory.SharedMemory(name=name)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+class SnapshotRing:
+    """
+    Shared-memory ring of RaceState snapshots.
+
+    create=True allocates the block (the owner unlinks it on close()); otherwise
+    the named block is attached and its geometry read from the header. Pass
+    untrack=False when attaching from a child of the creating process.
+    """
+
+    def __init__(self, name: Optional[str] = None, create: bool = False, slots: int = 4,
+                 capacity: int = 64, n_fields: int = 133, untrack: bool = True):
+        self._owner = create
+        hdr = header_dtype()
+        if create:
+            size = hdr.itemsize + slots * slot_dtype(capacity, n_fields).itemsize
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            if name is None:
+                raise ValueError("name is required to attach to a ring")
+            self.shm = _attach(name, untrack)
+        self._header = np.ndarray((), dtype=hdr, buffer=self.shm.buf)
+        if create:
+            self._header[()] = (MAGIC, slots, capacity, n_fields, -1, 0, 0, b"", 0, 0.0, 0.0, 0)
+        elif self._header["magic"].item() != MAGIC:
+            self.close()
+            raise ValueError(f"shared memory {name} is not a snapshot ring")
+        self.slots = int(self._header["slots"])
+        self.capacity = int(self._header["capacity"])
+        self.n_fields = int(self._header["n_fields"])
+        self._slots = np.ndarray((self.slots,), dtype=slot_dtype(self.capacity, self.n_fields),
+                                 buffer=self.shm.buf, offset=hdr.itemsize)
+        if create:
+            self._slots["seq"] = 0
+        self._last_seen: Tuple[int, int] = (-1, 0)   # (slot, seq) returned by read_latest()
+        self._last_error_seq = 0
+        self._drivers_from: Optional[bytes] = None     # names + numbers the Driver map was built from
+        self._drivers: Dict[int, Driver] = {}
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def published(self) -> int:
+        return int(self._header["published"])
+
+    @property
+    def failing(self) -> bool:
+        return bool(self._header["failing"])
+
+    # small control fields shared by both sides (each has a single writer)
+
+    @property
+    def interval_ms(self) -> float:
+        return float(self._header["interval_ms"])
+
+    @interval_ms.setter
+    def interval_ms(self, ms: float) -> None:
+        self._header["interval_ms"] = ms
+
+    @property
+    def base_ms(self) -> float:
+        return float(self._header["base_ms"])
+
+    @base_ms.setter
+    def base_ms(self, ms: float) -> None:
+        self._header["base_ms"] = ms
+
+    @property
+    def writer_pid(self) -> int:
+        return int(self._header["writer_pid"])
+
+    @writer_pid.setter
+    def writer_pid(self, pid: int) -> None:
+        self._header["writer_pid"] = pid
+
+    def close(self) -> None:
+        self._slots = None
+        self._header = None
+        try:
+            self.shm.close()
+        except BufferError:
+            log.debug(f"Snapshot ring {self.shm.name}: views still exported")
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self._owner = False
+
+    # --- writer side ---
+
+    def write(self, state: RaceState) -> None:
+        """Publish `state` into the next slot (the writer is the only one doing so)."""
+        n = state.raw_count
+        if n > self.capacity:
+            raise RingFull(f"{n} cars do not fit a ring of capacity {self.capacity}")
+        gen = int(self._header["published"]) + 1
+        index = gen % self.slots
+        slot = self._slots[index]
+        slot["seq"] = 2 * gen - 1            # odd: being written
+
+        slot["tick"] = state.tick
+        slot["timestamp"] = time.time()
+        slot["raw_count"] = n
+        slot["display_count"] = state.display_count
+        slot["total_laps"] = state.total_laps
+        slot["track_length"] = state.track_length
+        slot["track_name"] = state.track_name.encode("utf-8", "replace")[:TRACK_BYTES]
+
+        order = slot["order"]
+        order[:] = -1
+        order[:len(state.order)] = [-1 if i is None else i for i in state.order]
+
+        names, numbers = slot["name"], slot["car_number"]
+        cols, valid, values = slot["columns"], slot["last_lap_valid"], slot["values"]
+        for i in range(n):
+            d = state.drivers.get(i)
+            names[i] = (d.name if d else "").encode("utf-8", "replace")[:NAME_BYTES]
+            numbers[i] = NONE_VALUE if d is None or d.car_number is None else d.car_number
+            cs = state.car_states[i]
+            valid[i] = cs.last_lap_valid
+            for c, attr in enumerate(CAR_COLUMNS):
+                v = getattr(cs, attr)
+                cols[c, i] = NONE_VALUE if v is None else v
+            raw = cs.values
+            if isinstance(raw, RawValues):
+                values[i] = np.frombuffer(raw.tobytes(), dtype="<i4")
+            else:
+                values[i] = raw
+
+        changed, fields = slot["changed"], slot["changed_fields"]
+        changed[:] = 0
+        fields[:] = 0
+        slot["has_changes"] = state.changed_cars is not None
+        if state.changed_cars is not None:
+            changed[list(state.changed_cars)] = 1
+            for bit, key in enumerate(CHANGE_FIELDS):
+                idx = list(state.changed_fields[key])
+                fields[idx] |= 1 << bit
+
+        slot["seq"] = 2 * gen                # even: complete
+        self._header["latest"] = index
+        self._header["published"] = gen
+        self._header["failing"] = 0
+
+    def write_error(self, message: str) -> None:
+        self._header["error"] = message.encode("utf-8", "replace")[:ERROR_BYTES]
+        self._header["failing"] = 1
+        self._header["error_seq"] = int(self._header["error_seq"]) + 1
+
+    # --- reader side ---
+
+    def latest_slot(self) -> Optional[Tuple[int, int, np.void]]:
+        """(slot index, seq, zero-copy slot record) of the newest snapshot, or None."""
+        index = int(self._header["latest"])
+        if index < 0:
+            return None
+        slot = self._slots[index]
+        seq = int(slot["seq"])
+        if seq & 1:
+            return None
+        return index, seq, slot
+
+    def still_valid(self, index: int, seq: int) -> bool:
+        """True if slot `index` was not rewritten since it was read at `seq`."""
+        return int(self._slots[index]["seq"]) == seq
+
+    def read_latest(self, only_new: bool = True, retries: int = 3) -> Optional[RaceState]:
+        """
+        Newest snapshot as a RaceState (one copy of the slot), or None if there is
+        none yet, or nothing new since the last call with only_new.
+        """
+        for _ in range(retries):
+            found = self.latest_slot()
+            if found is None:
+                return None
+            index, seq, slot = found
+            if only_new and (index, seq) == self._last_seen:
+                return None
+            rec = self._slots[index:index + 1].copy()   # the one copy
+            if self.still_valid(index, seq):
+                self._last_seen = (index, seq)
+                return self._to_race_state(rec)
+        return None
+
+    def take_error(self) -> Optional[str]:
+        """Latest writer error message if a new one was posted since the last call."""
+        seq = int(self._header["error_seq"])
+        if seq == self._last_error_seq:
+            return None
+        self._last_error_seq = seq
+        return self._header["error"].item().decode("utf-8", "replace")
+
+    def _to_race_state(self, rec: np.ndarray) -> RaceState:
+        """RaceState from a private one-record copy (CarState.values view its block)."""
+        n = int(rec["raw_count"][0])
+        names = rec["name"][0, :n]
+        numbers = rec["car_number"][0, :n]
+        key = names.tobytes() + numbers.tobytes()
+        if key != self._drivers_from:
+            self._drivers = {
+                i: Driver(struct_index=i, name=sys.intern(name.decode("utf-8", "replace")),
+                          car_number=None if num == NONE_VALUE else num)
+                for i, (name, num) in enumerate(zip(names.tolist(), numbers.tolist()))
+            }
+            self._drivers_from = key
+
+        blob = rec["values"][0, :n].tobytes()
+        n_fields = self.n_fields
+        columns = zip(rec["last_lap_valid"][0, :n].tolist(), *rec["columns"][0, :, :n].tolist())
+        car_states: Dict[int, CarState] = {}
+        for i, (valid, ll, lap, ms, down, c_end, c_start, status, lp, fuel, dlat, dlong) \
+                in enumerate(columns):
+            car_states[i] = CarState(
+                struct_index=i,
+                laps_left=ll,
+                laps_completed=lap,
+                last_lap_ms=ms,
+                last_lap_valid=bool(valid),
+                laps_down=down,
+                lap_end_clock=None if c_end == NONE_VALUE else c_end,
+                lap_start_clock=None if c_start == NONE_VALUE else c_start,
+                car_status=status,
+                current_lp=lp,
+                fuel_laps_remaining=fuel,
+                dlat=dlat,
+                dlong=dlong,
+                values=RawValues(blob, i * n_fields * 4, n_fields),
+            )
+
+        changed_cars: Optional[FrozenSet[int]] = None
+        changed_fields: Optional[Dict[str, FrozenSet[int]]] = None
+        if rec["has_changes"][0]:
+            changed_cars = frozenset(np.flatnonzero(rec["changed"][0, :n]).tolist())
+            bits = rec["changed_fields"][0, :n]
+            changed_fields = {key: frozenset(np.flatnonzero(bits & (1 << b)).tolist())
+                              for b, key in enumerate(CHANGE_FIELDS)}
+
+        display_count = int(rec["display_count"][0])
+        order = [None if i < 0 else i for i in rec["order"][0, :display_count].tolist()]
+        return RaceState(
+            raw_count=n,
+            display_count=display_count,
+            total_laps=int(rec["total_laps"][0]),
+            order=order,
+            drivers=self._drivers,
+            car_states=car_states,
+            track_length=float(rec["track_length"][0]),
+            track_name=rec["track_name"][0].decode("utf-8", "replace"),
+            tick=int(rec["tick"][0]),
+            changed_cars=changed_cars,
+            changed_fields=changed_fields,
+        )
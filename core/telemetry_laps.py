@@ -4,33 +4,40 @@ telemetry_laps.py
 Logs a line each time a car crosses the finish line.
 Uses the in-game lap_end_clock (ms) as the timestamp.
 Each session creates a timestamped CSV file (e.g. telemetry_laps_2025-10-08_00-53-42.csv).
+
+Rows go through a BufferedCsvWriter: the state-update slot only appends them to a
+buffer, and a background thread writes them through one open file handle when
+flush_rows rows are waiting or the oldest has waited flush_interval_s. Call close()
+(or flush()) to get everything on disk.
 """
 import logging
 log = logging.getLogger(__name__)
 
-import csv
 import os
 import datetime
+from core.buffered_writer import BufferedCsvWriter
 from core.model import RaceState
 
 
 class TelemetryLapLogger:
-    def __init__(self, base_name: str = "telemetry_laps"):
+    def __init__(self, base_name: str = "telemetry_laps", flush_rows: int = 64,
+                 flush_interval_s: float = 1.0):
         # Create timestamped filename
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         self.file_path = f"{base_name}_{timestamp}.csv"
 
         self._last_end_clock = {}  # struct_idx -> previous lap_end_clock
+        self._last_tick = None     # tick of the last processed RaceState
 
         # Ensure folder exists if base_name includes directories
         folder = os.path.dirname(self.file_path)
         if folder and not os.path.exists(folder):
             os.makedirs(folder)
 
-        # Create CSV header
-        with open(self.file_path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["timestamp_s", "car_number", "lap", "last_lap_ms"])
+        # Create CSV header; the file stays open until close()
+        self._writer = BufferedCsvWriter(
+            self.file_path, header=["timestamp_s", "car_number", "lap", "last_lap_ms"],
+            flush_rows=flush_rows, flush_interval_s=flush_interval_s)
 
         log.info(f"[LapLogger] Logging to {self.file_path}")
 
@@ -38,9 +45,28 @@ class TelemetryLapLogger:
         """Return the current CSV filename."""
         return os.path.basename(self.file_path)
 
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until every logged lap is written."""
+        return self._writer.flush(timeout)
+
+    def close(self) -> None:
+        """Write the remaining laps and close the file."""
+        self._writer.close()
+        log.info(f"[LapLogger] Closed {self.file_path} ({self._writer.rows_written} laps)")
+
+    def _write_row(self, row) -> None:
+        self._writer.write_row(row)
+
     def on_state_updated(self, state: RaceState):
         try:
-            for idx, car in state.car_states.items():
+            # only cars whose lap clocks changed since the last snapshot can log a lap
+            if self._last_tick is None:
+                indices = state.car_states.keys()
+            else:
+                indices = state.changed_indices("lap_clock", since_tick=self._last_tick)
+            self._last_tick = state.tick
+            for idx in indices:
+                car = state.car_states.get(idx)
                 if not car or not car.last_lap_valid:
                     continue
 
@@ -63,9 +89,7 @@ class TelemetryLapLogger:
                 # Convert lap_end_clock (ms) to seconds for timestamp
                 timestamp = round((car.lap_end_clock or 0) / 1000.0, 3)
 
-                with open(self.file_path, "a", newline="") as f:
-                    writer = csv.writer(f)
-                    writer.writerow([timestamp, car_number, lap_num, lap_time])
+                self._write_row([timestamp, car_number, lap_num, lap_time])
 
                 #print(f"[LapLogger] Lap {lap_num} - #{car_number} {name} ({lap_time} ms, t={timestamp}s)")
 
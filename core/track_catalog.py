@@ -0,0 +1,192 @@
+"""
+track_catalog.py
+
+WINDY track index -> TRACKS subfolder mapping, built once and persisted.
+
+WINDY stores the current track as an index into the track list sorted by TNAME.
+Building that list means listing TRACKS and opening every <sub>/<sub>.TXT, which is
+far too slow for the poll loop. TrackCatalog does it on a background thread and
+saves the result to track_catalog.ini next to settings.ini, keyed by the TRACKS
+path and a signature of the folder/TXT modification times. On the next start a
+matching signature only costs a few stat() calls; in the poll loop, lookup() is a
+list index.
+
+Catalogs are shared per TRACKS folder (get_catalog), so every MemoryReader in the
+process uses the same one.
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import configparser
+import hashlib
+import os
+import re
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(sys.argv[0]), "track_catalog.ini")
+
+_TNAME = re.compile(r"^\s*TNAME\s+(.+)$", re.IGNORECASE | re.MULTILINE)
+
+
+def catalog_signature(tracks_root: str) -> str:
+    """Digest of the TRACKS folder and each <sub>/<sub>.TXT modification time."""
+    h = hashlib.sha1(os.path.normcase(os.path.abspath(tracks_root)).encode("utf-8", "replace"))
+    h.update(str(os.stat(tracks_root).st_mtime_ns).encode())
+    for sub in sorted(os.listdir(tracks_root)):
+        sub_path = os.path.join(tracks_root, sub)
+        txt_path = os.path.join(sub_path, f"{sub}.TXT")
+        try:
+            stamp = f"{os.stat(sub_path).st_mtime_ns}:{os.stat(txt_path).st_mtime_ns}"
+        except OSError:
+            continue
+        h.update(f"{sub}={stamp};".encode("utf-8", "replace"))
+    return h.hexdigest()
+
+
+def scan_tracks(tracks_root: str) -> List[Tuple[str, str]]:
+    """(folder, TNAME) for every track under tracks_root, sorted the way WINDY indexes them."""
+    entries = []
+    for sub in os.listdir(tracks_root):
+        sub_path = os.path.join(tracks_root, sub)
+        if not os.path.isdir(sub_path):
+            continue
+        txt_path = os.path.join(sub_path, f"{sub}.TXT")
+        if not os.path.isfile(txt_path):
+            continue
+        try:
+            with open(txt_path, "r", errors="ignore") as f:
+                m = _TNAME.search(f.read())
+        except Exception:
+            continue
+        if m:
+            entries.append((sub, m.group(1).strip()))
+    # Sort alphabetically by display name; the index maps to the folder name
+    entries.sort(key=lambda x: x[1].lower())
+    return entries
+
+
+class TrackCatalog:
+    """Sorted (folder, TNAME) list for one TRACKS folder, loaded or built in the background."""
+
+    def __init__(self, tracks_root: str, cache_path: str = DEFAULT_CATALOG_PATH):
+        self.tracks_root = tracks_root
+        self.cache_path = cache_path
+        self._entries: Optional[List[Tuple[str, str]]] = None
+        self._error: Optional[str] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- lifecycle ---
+
+    def start(self) -> "TrackCatalog":
+        """Load or build the catalog on a background thread (no-op if already running/done)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load_or_build,
+                                                name="TrackCatalog", daemon=True)
+                self._thread.start()
+        return self
+
+    def refresh(self) -> None:
+        """Rebuild from disk in the background (e.g. after tracks were added)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._ready.clear()
+            self._thread = None
+        self.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def error(self) -> Optional[str]:
+        """Why the last build produced no catalog (None if it succeeded)."""
+        return self._error
+
+    # --- lookups (poll loop) ---
+
+    @property
+    def entries(self) -> List[Tuple[str, str]]:
+        return list(self._entries or [])
+
+    def lookup(self, index: int) -> Optional[str]:
+        """Folder name for a WINDY track index; None if not ready or out of range."""
+        entries = self._entries
+        if entries is None or not (0 <= index < len(entries)):
+            return None
+        return entries[index][0]
+
+    # --- build / persistence ---
+
+    def _load_or_build(self) -> None:
+        try:
+            signature = catalog_signature(self.tracks_root)
+            entries = self._load(signature)
+            if entries is None:
+                entries = scan_tracks(self.tracks_root)
+                if entries:
+                    self._save(signature, entries)
+                log.info(f"Track catalog built: {len(entries)} tracks under {self.tracks_root}")
+            else:
+                log.info(f"Track catalog loaded: {len(entries)} tracks from {self.cache_path}")
+            self._entries = entries
+            self._error = None if entries else "no valid tracks found under TRACKS folder"
+        except Exception as e:
+            log.warning(f"Track catalog for {self.tracks_root} failed: {e}")
+            self._error = str(e)
+        finally:
+            self._ready.set()
+
+    def _load(self, signature: str) -> Optional[List[Tuple[str, str]]]:
+        parser = configparser.ConfigParser(interpolation=None)
+        parser.optionxform = str
+        try:
+            if not parser.read(self.cache_path) or not parser.has_section("catalog"):
+                return None
+            sec = parser["catalog"]
+            if sec.get("root") != os.path.abspath(self.tracks_root) or sec.get("signature") != signature:
+                return None
+            count = sec.getint("count")
+            return [(parser["tracks"][str(i)], parser["names"][str(i)]) for i in range(count)]
+        except Exception as e:
+            log.warning(f"Ignoring unreadable track catalog {self.cache_path}: {e}")
+            return None
+
+    def _save(self, signature: str, entries: List[Tuple[str, str]]) -> None:
+        parser = configparser.ConfigParser(interpolation=None)
+        parser.optionxform = str
+        parser["catalog"] = {
+            "root": os.path.abspath(self.tracks_root),
+            "signature": signature,
+            "count": str(len(entries)),
+        }
+        parser["tracks"] = {str(i): folder for i, (folder, _) in enumerate(entries)}
+        parser["names"] = {str(i): name for i, (_, name) in enumerate(entries)}
+        try:
+            with open(self.cache_path, "w") as f:
+                parser.write(f)
+        except OSError as e:
+            log.warning(f"Could not write track catalog {self.cache_path}: {e}")
+
+
+_catalogs: Dict[str, TrackCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(tracks_root: str, cache_path: str = DEFAULT_CATALOG_PATH) -> TrackCatalog:
+    """Process-wide catalog for tracks_root, started on first use."""
+    key = os.path.normcase(os.path.abspath(tracks_root))
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = TrackCatalog(tracks_root, cache_path)
+    return catalog.start()
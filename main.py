@@ -2,14 +2,21 @@
 main.py
 
 Entry point: starts the control panel and wires it to the updater.
+
+    python main.py --replay recordings/session_....icr2rec [--speed 4] [--lap 120 [--car 3]]
+
+runs the overlays on a session recording instead of the game (--speed 0 = as fast
+as possible); no DOSBox or Windows needed.
 """
-import logging, os, sys
+import argparse, logging, multiprocessing, os, sys
 from collections import deque
 from PyQt5 import QtWidgets, QtCore
-from core.icr2_memory import ICR2Memory, WindowNotFoundError
 from core.config import Config
 from core.reader import MemoryReader
+from core.session_recorder import SessionRecorder
 from updater.updater import RaceUpdater
+from updater.reader_process import ProcessPollCore, ReaderProcess
+from updater.replay import ReplayPollCore
 from ui.control_panel import ControlPanel
 from core.version import __version__
 from PyQt5.QtGui import QIcon
@@ -48,7 +55,20 @@ logging.getLogger(__name__).info(f"Starting ICR2 Timing Overlay {__version__}")
 
 
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="ICR2 Timing Overlay")
+    parser.add_argument("--replay", metavar="RECORDING", help="play a session recording instead of the game")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed (1 = real time, 0 = as fast as possible)")
+    parser.add_argument("--lap", type=int, help="start the replay at this lap of the leader")
+    parser.add_argument("--car", type=int, help="with --lap: this car's lap instead of the leader's")
+    # Qt consumes its own options from sys.argv
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
 def main():
+    args = parse_args(sys.argv[1:])
     app = QtWidgets.QApplication(sys.argv)
     
     # ✅ Set icon path (works for both dev & frozen .exe)
@@ -65,9 +85,24 @@ def main():
 
     cfg = Config()
     mem = None
+    reader_proc = None
+    recorder = None
+    replay = None
+
+    if args.replay:
+        replay = ReplayPollCore(args.replay, poll_ms=cfg.poll_ms, speed=args.speed)
+        if args.lap is not None and not replay.seek_lap(args.lap, car_number=args.car):
+            logging.getLogger(__name__).warning(f"Replay: lap {args.lap} not in {args.replay}")
+    elif cfg.reader_process:
+        from core.icr2_memory import ICR2Memory   # Windows only (pymem/pywin32)
+        # the child opens the game itself and reports "window not found" as an error
+        reader_proc = ReaderProcess(ICR2Memory, {"verbose": False}, cfg, poll_ms=cfg.poll_ms)
+        reader_proc.start()
 
     # --- Retry loop ---
-    while mem is None:
+    if reader_proc is None and replay is None:
+        from core.icr2_memory import ICR2Memory, WindowNotFoundError
+    while mem is None and reader_proc is None and replay is None:
         try:
             mem = ICR2Memory(verbose=False)
         except WindowNotFoundError as e:
@@ -88,8 +123,15 @@ def main():
             )
             sys.exit(1)
 
-    reader = MemoryReader(mem, cfg)
-    updater = RaceUpdater(reader, poll_ms=cfg.poll_ms)
+    if replay is not None:
+        updater = RaceUpdater(replay.reader, poll_ms=cfg.poll_ms, core=replay)
+    elif reader_proc is not None:
+        updater = RaceUpdater(None, poll_ms=cfg.poll_ms, core=ProcessPollCore(reader_proc))
+    else:
+        reader = MemoryReader(mem, cfg)
+        if cfg.record_sessions:
+            recorder = reader.recorder = SessionRecorder.for_config(cfg)
+        updater = RaceUpdater(reader, poll_ms=cfg.poll_ms)
 
     # Control panel (owns overlay + signal wiring)
     panel = ControlPanel(updater)
@@ -117,7 +159,17 @@ def main():
         except Exception:
             pass
         try:
-            mem.close()
+            if recorder is not None:
+                recorder.close()
+        except Exception:
+            pass
+        try:
+            if replay is not None:
+                replay.recording.close()
+            elif reader_proc is not None:
+                reader_proc.stop()
+            else:
+                mem.close()
         except Exception:
             pass
 
@@ -130,4 +182,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
@@ -677,6 +677,7 @@ class ControlPanel(QtWidgets.QMainWindow):
                 self.updater.state_updated.disconnect(self.lap_logger.on_state_updated)
             except Exception:
                 pass
+            self.lap_logger.close()
             self._lap_logger_enabled = False
             self.btnLapLogger.setText("Enable Lap Logger")
             self._recording_file = None
@@ -927,6 +928,15 @@ class ControlPanel(QtWidgets.QMainWindow):
             except Exception as e:
                 print(f"[ControlPanel] Error stopping updater: {e}")
 
+        # --- Write out any buffered lap log rows ---
+        if self.lap_logger is not None:
+            try:
+                if self._lap_logger_enabled:
+                    self.updater.state_updated.disconnect(self.lap_logger.on_state_updated)
+                self.lap_logger.close()
+            except Exception as e:
+                print(f"[ControlPanel] Error closing lap logger: {e}")
+
         # --- Close overlays so they don't keep the process alive ---
         try:
             if self.track_overlay and self.track_overlay.isVisible():
@@ -0,0 +1,302 @@
+"""
+async_poller.py
+
+AsyncRacePoller: asyncio polling core for headless consumers (loggers, timing
+feeds) that should not need PyQt5 or a Qt event loop.
+
+One polling task reads through PollCore; each subscriber gets its own async
+iterator of RaceState snapshots at its own rate. The task reads no faster than
+the scheduler interval and no faster than the most eager subscriber needs, and
+not at all while nobody is subscribed:
+
+    async with AsyncRacePoller(reader, poll_ms=20) as poller:
+        async with poller.subscribe(interval_ms=1000) as feed:
+            async for state in feed:
+                ...
+
+Backpressure is per subscription:
+  • "latest" (default): a bounded queue; when the subscriber falls behind, the
+    oldest pending snapshot is dropped and counted
+  • "block": the polling task waits for the subscriber, so a slow consumer slows
+    polling instead of losing snapshots
+
+Read failures never end a subscription. They are counted, kept in last_error,
+and, for subscriptions made with errors=True, yielded in the stream as
+PollError items. Closing the poller ends every subscription (StopAsyncIteration);
+a consumer leaving its `async with subscription` block, including by being
+cancelled, only removes its own subscription.
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+from core.model import RaceState
+from core.reader import MemoryReader
+from updater.poll_core import PollCore
+from updater.reader_process import ProcessPollCore
+
+_CLOSED = object()
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+@dataclass(frozen=True)
+class PollError:
+    """A failed read, delivered to subscriptions created with errors=True."""
+    message: str
+
+
+class Subscription:
+    """Async iterator of snapshots for one subscriber (see AsyncRacePoller.subscribe)."""
+
+    def __init__(self, poller: "AsyncRacePoller", interval_ms: float, maxsize: int,
+                 policy: str, errors: bool):
+        if policy not in ("latest", "block"):
+            raise ValueError(f"unknown backpressure policy {policy!r}")
+        self._poller = poller
+        self.interval_ms = max(0.0, float(interval_ms))
+        self.policy = policy
+        self.errors = errors
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, int(maxsize)))
+        self._closed_event = asyncio.Event()
+        self._putting = False      # a "block" offer is waiting for queue space
+        self._next_due = 0.0
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+
+    # --- poller side ---
+
+    def _due(self, now: float) -> bool:
+        return now >= self._next_due
+
+    async def _offer(self, item, now: float) -> None:
+        self._next_due = now + self.interval_ms / 1000.0
+        if self.policy == "block":
+            if not self._queue.full():
+                self._queue.put_nowait(item)
+                return
+            # wait for space, but give up as soon as the subscription is closed
+            put = asyncio.ensure_future(self._queue.put(item))
+            closed = asyncio.ensure_future(self._closed_event.wait())
+            self._putting = True
+            try:
+                await asyncio.wait((put, closed), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                self._putting = False
+                put.cancel()
+                closed.cancel()
+            return
+        if self._queue.full():
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self._queue.put_nowait(item)
+
+    def _end(self) -> None:
+        self.closed = True
+        self._closed_event.set()
+        if self._putting:
+            # the queue is full and the pending offer gives up on the event: the
+            # subscriber drains what is queued, then __anext__ sees closed + empty
+            return
+        while True:
+            try:
+                self._queue.put_nowait(_CLOSED)
+                return
+            except asyncio.QueueFull:
+                # make room for the end marker; the subscriber is going away anyway
+                self._queue.get_nowait()
+
+    # --- subscriber side ---
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Union[RaceState, PollError]:
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        self.delivered += 1
+        return item
+
+    def close(self) -> None:
+        """Unsubscribe; a pending or later __anext__ ends the iteration."""
+        self._poller._unsubscribe(self)
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+class AsyncRacePoller:
+    """
+    Polls only as often as its subscribers need: at most every scheduler interval
+    (poll_ms / the adaptive scheduler), less often when every subscriber wants a
+    slower rate, and not at all while nobody is subscribed.
+    """
+
+    def __init__(self, reader: Union[MemoryReader, PollCore, ProcessPollCore], poll_ms: int = 250,
+                 offload: bool = False):
+        if isinstance(reader, (PollCore, ProcessPollCore)):
+            self.core = reader
+        else:
+            self.core = PollCore(reader, poll_ms)
+        # offload=True runs each read in the default executor instead of on the loop
+        self.offload = offload
+        self._subs: List[Subscription] = []
+        self._task: Optional[asyncio.Task] = None
+        self._waiter: Optional[asyncio.Future] = None   # the poll task's pending wait
+        self.ticks = 0
+        self.error_count = 0
+        self.last_error: Optional[str] = None
+        self.last_state: Optional[RaceState] = None
+
+    # --- subscriptions ---
+
+    def subscribe(self, interval_ms: Optional[float] = None, maxsize: int = 1,
+                  policy: str = "latest", errors: bool = False) -> Subscription:
+        """
+        New subscription receiving at most one snapshot per interval_ms (default:
+        every poll). maxsize bounds its queue; policy is "latest" or "block".
+        """
+        sub = Subscription(self, interval_ms or 0.0, maxsize, policy, errors)
+        self._subs.append(sub)
+        self._wake()  # a faster (or the first) subscriber may bring the next poll forward
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        if sub in self._subs:
+            self._subs.remove(sub)
+            self._wake()  # the next poll may now be later, or not needed at all
+        sub._end()
+
+    @property
+    def subscriptions(self) -> List[Subscription]:
+        return list(self._subs)
+
+    # --- lifecycle ---
+
+    def start(self) -> asyncio.Task:
+        """Start the polling task on the running loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="AsyncRacePoller")
+        return self._task
+
+    async def aclose(self) -> None:
+        """Stop polling and end every subscription."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for sub in list(self._subs):
+            self._unsubscribe(sub)
+
+    async def __aenter__(self) -> "AsyncRacePoller":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        await self.aclose()
+        return False
+
+    # --- polling ---
+
+    def _next_poll(self, started: float) -> Optional[float]:
+        """
+        Monotonic time of the next poll, or None (no subscribers: wait for one).
+        One scheduler interval after the last poll was due (so read time does not
+        drift the rate), later if no subscriber is due before then.
+        """
+        if not self._subs:
+            return None
+        earliest = min(sub._next_due for sub in self._subs)
+        return max(started + self.core.interval_ms / 1000.0, earliest)
+
+    def _wake(self) -> None:
+        """Have the polling task recompute its next poll (the subscribers changed)."""
+        if self._waiter is not None:
+            _resolve(self._waiter)
+
+    async def _wait_next_poll(self, started: float) -> float:
+        """
+        Wait for the next poll; returns the time it was due, so the rate is kept
+        from deadline to deadline rather than drifting by the loop's wake-up lag
+        (about a millisecond per poll: the selector timeout is rounded up).
+        """
+        loop = asyncio.get_running_loop()   # its clock is time.monotonic()
+        while True:
+            deadline = self._next_poll(started)
+            now = loop.time()
+            if deadline is not None and deadline <= now:
+                # a whole interval behind (a slow read, a blocked subscriber, an
+                # idle spell): start over from now instead of catching up
+                return deadline if now - deadline < self.core.interval_ms / 1000.0 else now
+            # one future and one timer handle per wait: cheaper than wait_for(Event)
+            self._waiter = waiter = loop.create_future()
+            timer = loop.call_at(deadline, _resolve, waiter) if deadline is not None else None
+            try:
+                await waiter
+            finally:
+                self._waiter = None
+                if timer is not None:
+                    timer.cancel()
+
+    async def _run(self) -> None:
+        try:
+            await self._poll_loop()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("AsyncRacePoller stopped")
+            for sub in list(self._subs):
+                self._unsubscribe(sub)
+            raise
+
+    async def _poll_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        while True:
+            if self.offload:
+                result = await loop.run_in_executor(None, self.core.poll)
+            else:
+                result = self.core.poll()
+            self.ticks += 1
+            now = time.monotonic()
+            if result.state is None and result.error is None:
+                item = None   # ProcessPollCore: nothing new since the last poll
+            elif result.state is not None:
+                self.last_state = result.state
+                self.last_error = None
+                item = result.state
+            else:
+                self.error_count += 1
+                if result.error != self.last_error:
+                    log.warning(f"AsyncRacePoller: {result.error}")
+                self.last_error = result.error
+                item = PollError(result.error)
+            for sub in list(self._subs):
+                if sub.closed or item is None or isinstance(item, PollError) and not sub.errors:
+                    continue
+                if sub._due(now):
+                    await sub._offer(item, now)
+
+            started = await self._wait_next_poll(started)
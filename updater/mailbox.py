@@ -0,0 +1,49 @@
+"""
+mailbox.py
+
+LatestValueMailbox: a single-slot, thread-safe handoff between the polling worker
+and the GUI. The worker publishes every snapshot; the consumer takes only the
+newest one. A snapshot overwritten before it was taken counts as a dropped
+frame, so a stalled GUI never has a backlog of stale snapshots to paint.
+"""
+
+import threading
+from typing import Any, Optional, Tuple
+
+
+class LatestValueMailbox:
+    """One slot; publish() overwrites, take() empties."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self._full = False
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def publish(self, value: Any) -> bool:
+        """Store `value`. Returns True if an untaken value was dropped."""
+        with self._lock:
+            dropped = self._full
+            if dropped:
+                self.dropped += 1
+            self._value = value
+            self._full = True
+            self.published += 1
+        return dropped
+
+    def take(self) -> Optional[Any]:
+        """Newest published value, or None if nothing new since the last take()."""
+        with self._lock:
+            if not self._full:
+                return None
+            value, self._value = self._value, None
+            self._full = False
+            self.delivered += 1
+        return value
+
+    def stats(self) -> Tuple[int, int, int]:
+        """(published, delivered, dropped)."""
+        with self._lock:
+            return self.published, self.delivered, self.dropped
@@ -0,0 +1,71 @@
+"""
+poll_core.py
+
+PollCore: one poll step (read a RaceState, pick the next interval) with no Qt or
+asyncio dependency. RaceUpdater (Qt) and AsyncRacePoller (asyncio) are thin
+drivers around it, so both share the same read, error and scheduling behaviour.
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+from dataclasses import dataclass
+from typing import Optional
+
+from core.config import Config
+from core.model import RaceState
+from core.reader import MemoryReader, ReadError
+from updater.poll_scheduler import AdaptivePollScheduler
+
+
+@dataclass(frozen=True)
+class PollResult:
+    """Outcome of one poll: a state or an error message, plus the interval to wait next."""
+    state: Optional[RaceState]
+    error: Optional[str]
+    interval_ms: int
+
+
+class PollCore:
+    """Reads through a MemoryReader and applies the (optional) adaptive scheduler."""
+
+    def __init__(self, reader: MemoryReader, poll_ms: int = 250,
+                 scheduler: Optional[AdaptivePollScheduler] = None,
+                 adaptive: Optional[bool] = None):
+        self.reader = reader
+        cfg = getattr(reader, "_cfg", None) or Config()
+        self.base_ms = max(1, int(poll_ms))
+        # poll_min_ms = 0: boost to half of poll_ms, following set_base()
+        self._auto_min = scheduler is None and not cfg.poll_min_ms
+        if scheduler is None and (cfg.adaptive_poll if adaptive is None else adaptive):
+            scheduler = AdaptivePollScheduler(
+                self.base_ms, cfg.poll_min_ms or self.base_ms // 2, cfg.poll_max_ms, cfg=cfg)
+        self.scheduler = scheduler
+        self.interval_ms = self.base_ms
+
+    def set_base(self, ms: int) -> None:
+        self.base_ms = max(1, int(ms))
+        self.interval_ms = self.base_ms
+        if self.scheduler is not None:
+            if self._auto_min:
+                self.scheduler.min_ms = max(1, self.base_ms // 2)
+            self.scheduler.set_base(self.base_ms)
+
+    def poll(self) -> PollResult:
+        """Read one RaceState; never raises for read failures."""
+        try:
+            state = self.reader.read_race_state()
+        except ReadError as e:
+            # Required read failed (persistent until the game is back)
+            return self._failed(str(e))
+        except Exception as e:
+            # Unexpected errors: report but keep polling
+            return self._failed(f"{type(e).__name__}: {e}")
+        if self.scheduler is not None:
+            self.interval_ms = self.scheduler.after_state(state)
+        return PollResult(state, None, self.interval_ms)
+
+    def _failed(self, message: str) -> PollResult:
+        if self.scheduler is not None:
+            self.interval_ms = self.scheduler.after_error()
+        return PollResult(None, message, self.interval_ms)
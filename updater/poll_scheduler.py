@@ -0,0 +1,126 @@
+"""
+poll_scheduler.py
+
+AdaptivePollScheduler picks the next poll interval from the last RaceState.
+
+  • close racing (another running car inside the player's radar window) or any
+    running car near the start/finish line -> min_ms
+  • snapshots that keep coming back unchanged (paused, menus, replays stopped)
+    or reads that keep failing -> the interval backs off exponentially to max_ms
+  • otherwise -> base_ms (the configured poll_ms)
+
+No Qt here, so the policy can be driven headlessly; RaceUpdater applies it to
+its QTimer.
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+from typing import Optional, Union
+
+import numpy as np
+
+from core.config import Config
+from core.model import RaceState
+from core.race_snapshot import RaceSnapshot
+
+# DLONG/DLAT units per inch
+UNITS_PER_INCH = 500
+
+
+class AdaptivePollScheduler:
+    """Next-interval policy for the poll loop (all times in ms)."""
+
+    def __init__(self, base_ms: int, min_ms: Optional[int] = None, max_ms: Optional[int] = None,
+                 backoff: float = 2.0, idle_ticks: int = 3, cfg: Optional[Config] = None):
+        cfg = cfg or Config()
+        self.base_ms = max(1, int(base_ms))
+        self.min_ms = max(1, min(int(min_ms if min_ms is not None else self.base_ms), self.base_ms))
+        self.max_ms = max(self.base_ms, int(max_ms if max_ms is not None else self.base_ms))
+        self.backoff = max(1.0, float(backoff))
+        self.idle_ticks = max(1, int(idle_ticks))
+
+        car_len = cfg.radar_car_length_in * UNITS_PER_INCH
+        car_wid = cfg.radar_car_width_in * UNITS_PER_INCH
+        self.player_index = cfg.player_index
+        self.range_forward = cfg.radar_range_forward * car_len
+        self.range_rear = cfg.radar_range_rear * car_len
+        self.range_side = cfg.radar_range_side * car_wid
+        self.line_range = cfg.poll_line_range_lengths * car_len
+
+        self.interval_ms = self.base_ms
+        self._unchanged = 0
+        self._errors = 0
+
+    @property
+    def hz(self) -> float:
+        return 1000.0 / self.interval_ms
+
+    def set_base(self, base_ms: int) -> None:
+        """Change the normal interval (e.g. the control panel's poll spin box)."""
+        self.base_ms = max(1, int(base_ms))
+        self.min_ms = min(self.min_ms, self.base_ms)
+        self.max_ms = max(self.max_ms, self.base_ms)
+        self.interval_ms = self.base_ms
+
+    def after_state(self, state: Union[RaceState, RaceSnapshot]) -> int:
+        """Interval to wait after a successful read of `state`."""
+        self._errors = 0
+        if state.changed_cars is not None and not state.changed_cars:
+            self._unchanged += 1
+        else:
+            self._unchanged = 0
+
+        if self._unchanged >= self.idle_ticks:
+            self.interval_ms = self._backed_off()
+        elif self.is_hot(state):
+            self.interval_ms = self.min_ms
+        else:
+            self.interval_ms = self.base_ms
+        return self.interval_ms
+
+    def after_error(self) -> int:
+        """Interval to wait after a failed read."""
+        self._errors += 1
+        self._unchanged = 0
+        self.interval_ms = self.base_ms if self._errors < self.idle_ticks else self._backed_off()
+        return self.interval_ms
+
+    def _backed_off(self) -> int:
+        return min(self.max_ms, max(self.base_ms, int(self.interval_ms * self.backoff)))
+
+    def is_hot(self, state: Union[RaceState, RaceSnapshot]) -> bool:
+        """True if a running car is in the player's radar window or near the line."""
+        if self.min_ms >= self.base_ms:
+            return False
+        track_len = (state.track_length or 0) * 5280 * 12 * UNITS_PER_INCH
+        if isinstance(state, RaceSnapshot):
+            return self._is_hot_columns(state, track_len)
+        player = state.car_states.get(self.player_index)
+        for idx, car in state.car_states.items():
+            if car is None or car.car_status != 0:
+                continue
+            if track_len > 0 and self.line_range > 0:
+                to_line = car.dlong % track_len
+                if to_line < self.line_range or track_len - to_line < self.line_range:
+                    return True
+            if player is None or idx == self.player_index:
+                continue
+            dy = car.dlong - player.dlong
+            if track_len > 0:
+                dy = (dy + track_len / 2) % track_len - track_len / 2
+            if -self.range_rear <= dy <= self.range_forward and abs(car.dlat - player.dlat) <= self.range_side:
+                return True
+        return False
+
+    def _is_hot_columns(self, snap: RaceSnapshot, track_len: float) -> bool:
+        running = snap.running()
+        if track_len > 0 and self.line_range > 0:
+            to_line = snap.dlong % track_len
+            near = (to_line < self.line_range) | (track_len - to_line < self.line_range)
+            if np.any(near & running):
+                return True
+        if not 0 <= self.player_index < snap.raw_count:
+            return False
+        return bool(np.any(snap.radar_mask(self.player_index, self.range_forward,
+                                           self.range_rear, self.range_side)))
@@ -0,0 +1,137 @@
+"""
+poll_thread.py
+
+PollingThread: a plain-thread polling engine with a monotonic deadline loop.
+
+Each tick is scheduled against an absolute deadline (start + n * interval), so
+time spent reading and decoding does not accumulate as drift. The thread sleeps
+until shortly before the deadline and, if busy_wait_ms > 0, spins for the rest,
+which avoids the OS timer slack of a plain sleep. Deadlines that have already
+passed are counted as missed and skipped (the loop re-anchors instead of firing
+a burst of catch-up ticks).
+
+JitterStats keeps the recent tick-to-tick intervals for p50/p99 reporting. Nothing
+here depends on Qt; RaceUpdater hands results to the GUI through its mailbox.
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+class JitterStats:
+    """Recent tick intervals (ms) plus missed-deadline count."""
+
+    def __init__(self, window: int = 2048):
+        self._intervals = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.missed = 0
+
+    def record(self, interval_ms: float) -> None:
+        with self._lock:
+            self._intervals.append(interval_ms)
+
+    @staticmethod
+    def _pick(data, p: float) -> Optional[float]:
+        if not data:
+            return None
+        return data[min(len(data) - 1, max(0, round(p / 100 * (len(data) - 1))))]
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            data = sorted(self._intervals)
+        return self._pick(data, p)
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """{'ticks', 'missed', 'p50_ms', 'p99_ms', 'max_ms'} over the recent window."""
+        with self._lock:
+            data = sorted(self._intervals)
+        return {
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "p50_ms": self._pick(data, 50),
+            "p99_ms": self._pick(data, 99),
+            "max_ms": data[-1] if data else None,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._intervals.clear()
+        self.ticks = 0
+        self.missed = 0
+
+
+class PollingThread(threading.Thread):
+    """
+    Calls tick() every interval on a dedicated daemon thread.
+
+    tick() does the read and handoff; it may return the next interval in ms (e.g.
+    from AdaptivePollScheduler) or None to keep the current one.
+    """
+
+    def __init__(self, tick: Callable[[], Optional[int]], interval_ms: float,
+                 busy_wait_ms: float = 1.0, name: str = "PollingThread"):
+        super().__init__(name=name, daemon=True)
+        self._tick = tick
+        self.interval_ms = max(0.1, float(interval_ms))
+        self.busy_wait_ms = max(0.0, float(busy_wait_ms))
+        self.stats = JitterStats()
+        self._stop_event = threading.Event()
+
+    def set_interval(self, ms: float) -> None:
+        """Takes effect from the next deadline."""
+        self.interval_ms = max(0.1, float(ms))
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def _wait_until(self, deadline: float) -> bool:
+        """Sleep/spin until `deadline` (perf_counter seconds). False if stopped meanwhile."""
+        spin = self.busy_wait_ms / 1000.0
+        remaining = deadline - time.perf_counter()
+        if remaining > spin:
+            if self._stop_event.wait(remaining - spin):
+                return False
+        while time.perf_counter() < deadline:
+            if self._stop_event.is_set():
+                return False
+        return not self._stop_event.is_set()
+
+    def run(self) -> None:
+        stats = self.stats
+        deadline = time.perf_counter()
+        last_start: Optional[float] = None
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            if last_start is not None:
+                stats.record((start - last_start) * 1000.0)
+            last_start = start
+            stats.ticks += 1
+            try:
+                nxt = self._tick()
+                if nxt is not None:
+                    self.interval_ms = max(0.1, float(nxt))
+            except Exception as e:
+                log.error(f"{self.name}: tick failed: {type(e).__name__}: {e}")
+
+            interval = self.interval_ms / 1000.0
+            deadline += interval
+            now = time.perf_counter()
+            if now >= deadline:
+                # overran one or more deadlines: count them and re-anchor on now
+                missed = int((now - deadline) // interval) + 1
+                stats.missed += missed
+                deadline += missed * interval
+            if not self._wait_until(deadline):
+                break
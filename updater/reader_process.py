@@ -0,0 +1,212 @@
+"""
+reader_process.py
+
+Optional out-of-process reader ([overlay] reader_process = true).
+
+ReaderProcess starts a child process that opens the memory backend, polls and
+decodes through PollCore on a PollingThread deadline loop, and publishes every
+RaceState into a SnapshotRing (core/snapshot_ring.py) in shared memory. The GUI
+process never touches game memory: ProcessPollCore has PollCore's poll()
+interface but only looks at the newest ring slot, so RaceUpdater and
+AsyncRacePoller drive it unchanged.
+
+    proc = ReaderProcess(ICR2Memory, {"verbose": False}, cfg, poll_ms=cfg.poll_ms)
+    proc.start()
+    updater = RaceUpdater(None, poll_ms=cfg.poll_ms, core=ProcessPollCore(proc))
+
+The backend is built inside the child from a picklable factory (a class or a
+module-level function plus keyword arguments); failures to open it are reported
+through the ring as errors and retried, like a failed read. The child stops when
+asked, or on its own when the parent process goes away.
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import multiprocessing
+from typing import Any, Callable, Dict, Optional
+
+from core.config import Config
+from core.memory_backend import MemoryBackend
+from core.reader import MemoryReader
+from core.session_recorder import SessionRecorder
+from core.snapshot_ring import SnapshotRing
+from updater.poll_core import PollCore, PollResult
+from updater.poll_thread import PollingThread
+
+OPEN_RETRY_S = 1.0
+
+
+def _open_backend(ring: SnapshotRing, factory: Callable[..., MemoryBackend],
+                  factory_kwargs: Dict[str, Any], stop_event) -> Optional[MemoryBackend]:
+    """Build the backend, posting failures to the ring and retrying until stopped."""
+    last_error = None
+    while not stop_event.is_set():
+        try:
+            return factory(**factory_kwargs)
+        except Exception as e:
+            message = f"{type(e).__name__}: {e}"
+            if message != last_error:
+                log.warning(f"Reader process: cannot open memory backend: {message}")
+                last_error = message
+            ring.write_error(message)
+            stop_event.wait(OPEN_RETRY_S)
+    return None
+
+
+def _reader_main(ring_name: str, factory: Callable[..., MemoryBackend],
+                 factory_kwargs: Dict[str, Any], cfg: Config, poll_ms: int,
+                 busy_wait_ms: float, stop_event) -> None:
+    """Child process entry point (module level so it pickles under spawn)."""
+    ring = SnapshotRing(ring_name, untrack=False)   # shares the parent's resource tracker
+    parent = multiprocessing.parent_process()
+    mem = _open_backend(ring, factory, factory_kwargs, stop_event)
+    if mem is None:
+        ring.close()
+        return
+
+    reader = MemoryReader(mem, cfg)
+    if cfg.record_sessions:
+        # recorded here, next to the reads, rather than from the ring
+        reader.recorder = SessionRecorder.for_config(cfg)
+    core = PollCore(reader, poll_ms)
+
+    def tick() -> int:
+        base = ring.base_ms
+        if base and int(base) != core.base_ms:
+            core.set_base(int(base))
+        result = core.poll()
+        if result.state is not None:
+            ring.write(result.state)
+        else:
+            ring.write_error(result.error)
+        ring.interval_ms = result.interval_ms
+        return result.interval_ms
+
+    thread = PollingThread(tick, poll_ms, busy_wait_ms=busy_wait_ms, name="ReaderProcessPoll")
+    thread.start()
+    try:
+        while not stop_event.wait(0.5):
+            if parent is not None and not parent.is_alive():
+                log.info("Reader process: parent exited, stopping")
+                break
+    finally:
+        thread.stop()
+        if reader.recorder is not None:
+            reader.recorder.close()
+        try:
+            mem.close()
+        except Exception:
+            pass
+        ring.close()
+
+
+class ReaderProcess:
+    """Owns the shared-memory ring and the child process that fills it."""
+
+    def __init__(self, factory: Callable[..., MemoryBackend],
+                 factory_kwargs: Optional[Dict[str, Any]] = None,
+                 cfg: Optional[Config] = None, poll_ms: int = 250,
+                 slots: int = 4, capacity: int = 64, start_method: Optional[str] = None):
+        self.cfg = cfg or Config()
+        self.factory = factory
+        self.factory_kwargs = dict(factory_kwargs or {})
+        self.poll_ms = max(1, int(poll_ms))
+        self.slots = slots
+        self.capacity = capacity
+        self._ctx = multiprocessing.get_context(start_method)
+        self.ring: Optional[SnapshotRing] = None
+        self._process = None
+        self._stop_event = None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def exitcode(self) -> Optional[int]:
+        return None if self._process is None else self._process.exitcode
+
+    def start(self) -> SnapshotRing:
+        """Create the ring and start the child (idempotent). Returns the ring."""
+        if self._process is not None:
+            return self.ring
+        self.ring = SnapshotRing(create=True, slots=self.slots, capacity=self.capacity,
+                                 n_fields=self.cfg.car_state_size // 4)
+        self.ring.base_ms = self.poll_ms
+        self.ring.interval_ms = self.poll_ms
+        self._stop_event = self._ctx.Event()
+        self._process = self._ctx.Process(
+            target=_reader_main, name="ICR2Reader", daemon=True,
+            args=(self.ring.name, self.factory, self.factory_kwargs, self.cfg,
+                  self.poll_ms, self.cfg.poll_busy_wait_ms, self._stop_event),
+        )
+        self._process.start()
+        self.ring.writer_pid = self._process.pid
+        log.info(f"Reader process {self._process.pid} started, ring {self.ring.name}")
+        return self.ring
+
+    def set_poll_interval(self, ms: int) -> None:
+        """New base interval for the child's PollCore (picked up on its next tick)."""
+        self.poll_ms = max(1, int(ms))
+        if self.ring is not None:
+            self.ring.base_ms = self.poll_ms
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the child and release the ring."""
+        if self._process is not None:
+            self._stop_event.set()
+            self._process.join(timeout)
+            if self._process.is_alive():
+                log.warning("Reader process did not stop, terminating")
+                self._process.terminate()
+                self._process.join(timeout)
+            self._process = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def __enter__(self) -> "ReaderProcess":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.stop()
+        return False
+
+
+class ProcessPollCore:
+    """
+    PollCore stand-in that reads snapshots from a ReaderProcess's ring.
+
+    poll() returns the newest snapshot once, a new error once, and
+    PollResult(None, None, interval) when nothing happened since the last call.
+    The interval is the child's current (adaptive) interval.
+    """
+
+    def __init__(self, process: ReaderProcess):
+        self.process = process
+        self.scheduler = None   # scheduling happens in the child
+        self.base_ms = process.poll_ms
+        self.interval_ms = process.poll_ms
+        self._reported_exit = False
+
+    def set_base(self, ms: int) -> None:
+        self.base_ms = max(1, int(ms))
+        self.process.set_poll_interval(self.base_ms)
+
+    def poll(self) -> PollResult:
+        ring = self.process.ring
+        if ring is None:
+            return PollResult(None, "reader process not started", self.interval_ms)
+        if not self.process.alive:
+            if self._reported_exit:
+                return PollResult(None, None, self.interval_ms)
+            self._reported_exit = True
+            return PollResult(None, f"reader process exited (code {self.process.exitcode})",
+                              self.interval_ms)
+        self.interval_ms = int(ring.interval_ms) or self.base_ms
+        error = ring.take_error()
+        if error is not None and ring.failing:
+            return PollResult(None, error, self.interval_ms)
+        return PollResult(ring.read_latest(), None, self.interval_ms)
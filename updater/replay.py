@@ -0,0 +1,136 @@
+"""
+replay.py
+
+ReplayPollCore: PollCore over a session recording (core/session_recorder.py), so
+RaceUpdater, AsyncRacePoller, the overlays and the loggers run on a recorded race
+exactly as on the live game, without DOSBox or Windows.
+
+    core = ReplayPollCore("recordings/session_....icr2rec", poll_ms=cfg.poll_ms, speed=4)
+    core.seek_lap(120)                 # or seek_lap(120, car_number=3)
+    updater = RaceUpdater(core.reader, poll_ms=cfg.poll_ms, core=core)
+
+Before each poll the ReplayMemory under the MemoryReader is moved to the frame
+that was current at the replay clock, then the normal read/scheduling step runs:
+
+  speed = 1.0     real time: the frame recorded poll time ago (re-read if the
+                  recording has no newer frame yet, like a live poll)
+  speed = N       N times faster (or slower) than real time
+  speed = None/0  as fast as possible: every recorded frame exactly once, and an
+                  interval of FAST_INTERVAL_MS
+
+seek(), seek_time() and seek_lap() jump through the recording's index (keyframes
+and lap crossings) and restart the clock from there. Once the last frame has been delivered poll()
+returns PollResult(None, None, interval) ("nothing new"), unless loop=True.
+"""
+
+import logging
+log = logging.getLogger(__name__)
+
+import time
+from typing import Optional, Tuple, Union
+
+from core.config import Config
+from core.reader import MemoryReader
+from core.session_recorder import ReplayMemory, SessionRecording, find_lap_frame
+from updater.poll_core import PollCore, PollResult
+from updater.poll_scheduler import AdaptivePollScheduler
+
+FAST_INTERVAL_MS = 1
+
+
+class ReplayPollCore(PollCore):
+    """Paces a ReplayMemory by the replay clock and polls it like a live game."""
+
+    def __init__(self, recording: Union[str, SessionRecording], cfg: Optional[Config] = None,
+                 poll_ms: int = 250, speed: Optional[float] = 1.0, loop: bool = False,
+                 scheduler: Optional[AdaptivePollScheduler] = None,
+                 adaptive: Optional[bool] = None):
+        if not isinstance(recording, SessionRecording):
+            recording = SessionRecording(recording)
+        self.recording = recording
+        if cfg is None:
+            cfg = Config.for_version(recording.version) if recording.version else Config()
+        self.memory = ReplayMemory(recording, loop=loop)
+        super().__init__(MemoryReader(self.memory, cfg), poll_ms,
+                         scheduler=scheduler, adaptive=adaptive)
+        self.speed = speed
+        self.finished = False
+        self._delivered = -1                           # last frame index polled
+        self._anchor: Optional[Tuple[float, float]] = None   # (perf_counter, recording timestamp)
+
+    @property
+    def fast(self) -> bool:
+        return not self.speed
+
+    @property
+    def position_s(self) -> float:
+        """Replay position in seconds from the start of the recording."""
+        return self.memory.timestamp - self.recording.first_timestamp
+
+    def set_speed(self, speed: Optional[float]) -> None:
+        self.speed = speed
+        self._anchor = None   # restart the clock from the current frame
+
+    def seek(self, index: int) -> None:
+        """Continue playback at frame `index` (it is the next frame polled)."""
+        self.memory.seek(max(0, min(int(index), len(self.recording) - 1)))
+        self._delivered = -1
+        self._anchor = None
+        self.finished = False
+
+    def seek_time(self, seconds: float) -> None:
+        """Continue playback `seconds` into the recording."""
+        self.seek(self.recording.index_at_offset(seconds))
+
+    def seek_lap(self, lap: int, car_number: Optional[int] = None,
+                 struct_index: Optional[int] = None) -> bool:
+        """
+        Continue playback where the leader (or car `car_number`, or `struct_index`)
+        completes `lap` laps. Returns False, leaving the position unchanged, if the
+        recording never gets there.
+        """
+        index = find_lap_frame(self.recording, self.reader._cfg, lap, car_number, struct_index)
+        if index is None:
+            return False
+        self.seek(index)
+        who = f"car #{car_number}" if car_number is not None else "the leader"
+        log.info(f"Replay: {who} completes lap {lap} at frame {index} ({self.position_s:.1f} s)")
+        return True
+
+    def poll(self) -> PollResult:
+        if not self._position():
+            return PollResult(None, None, FAST_INTERVAL_MS if self.fast else self.interval_ms)
+        self._delivered = self.memory.index
+        result = super().poll()
+        if self.fast:
+            return PollResult(result.state, result.error, FAST_INTERVAL_MS)
+        return result
+
+    def _position(self) -> bool:
+        """Move the memory to the frame due now; False once the recording is over."""
+        if self.finished:
+            return False
+        last = len(self.recording) - 1
+        if self.fast:
+            if self._delivered < self.memory.index:
+                return True   # fresh seek: play the frame we are on first
+            if self.memory.advance():
+                return True
+            self.finished = True
+            return False
+
+        now = time.perf_counter()
+        if self._anchor is None:
+            self._anchor = (now, self.memory.timestamp)
+        wall, start = self._anchor
+        target = start + (now - wall) * self.speed
+        index = self.recording.index_at(target)
+        if index == last and self._delivered == last and target > self.memory.timestamp:
+            if not self.memory.loop:
+                self.finished = True
+                return False
+            self.seek(0)
+            return True
+        if index > self.memory.index:
+            self.memory.seek(index)
+        return True
@@ -4,14 +4,44 @@ updater.py
 RaceUpdater runs in a worker QThread and polls MemoryReader periodically.
 It emits `state_updated` (RaceState) and `error` (str).
 
+With adaptive polling (settings.ini [overlay] adaptive_poll) the interval after each
+tick comes from AdaptivePollScheduler, and `rate_changed` (float Hz) is emitted
+whenever the effective rate changes.
+
+With frame coalescing ([overlay] coalesce_frames) the worker does not queue one
+`state_updated` per tick to the GUI. It publishes into a LatestValueMailbox and a
+MailboxDrain living in the GUI thread emits `state_updated` with only the newest
+snapshot, at most refresh_hz times per second. Overwritten snapshots are counted
+and reported through `frames_dropped` (cumulative count).
+
+With [overlay] poll_engine = thread, ticks run on a PollingThread (monotonic
+deadline loop, optional busy-wait) instead of the worker's QTimer; poll_stats()
+reports tick-interval jitter for either engine.
+
+The read/error/scheduling step itself is the Qt-free PollCore (updater/poll_core.py),
+shared with the asyncio poller; this class only adds the Qt timer/thread, signals
+and GUI handoff. Passing core=ProcessPollCore(...) instead of a reader takes the
+snapshots from an out-of-process reader (updater/reader_process.py).
+
 Fixed to properly handle timer cleanup in the correct thread.
 """
 
+import logging
+log = logging.getLogger(__name__)
+
+import time
 from PyQt5 import QtCore
-from typing import Optional
+from typing import Callable, Dict, Optional, Union
 
-from core.reader import MemoryReader, ReadError
+from core.config import Config
+from core.memory_backend import MemoryBackend
+from core.reader import MemoryReader
 from core.model import RaceState
+from updater.mailbox import LatestValueMailbox
+from updater.poll_core import PollCore
+from updater.poll_scheduler import AdaptivePollScheduler
+from updater.poll_thread import JitterStats, PollingThread
+from updater.reader_process import ProcessPollCore
 
 
 
@@ -21,37 +51,91 @@ class RaceUpdater(QtCore.QObject):
 
     Usage:
       - create MemoryReader and RaceUpdater(reader, poll_ms)
-      - create QThread, move updater to thread, start thread, invoke start()
-      - connect signals: state_updated (RaceState), error (str)
+        (or RaceUpdater.from_backend(mem, cfg, poll_ms) for any MemoryBackend)
+      - create the updater in the GUI thread (its MailboxDrain stays there), then
+        create QThread, move updater to thread, start thread, invoke start()
+      - connect signals: state_updated (RaceState), error (str), rate_changed (float Hz),
+        frames_dropped (int)
       - call stop() (via QMetaObject.invokeMethod) before quitting thread
     """
     state_updated = QtCore.pyqtSignal(object)  # RaceState
     error = QtCore.pyqtSignal(str)
+    rate_changed = QtCore.pyqtSignal(float)    # effective polling rate in Hz
+    frames_dropped = QtCore.pyqtSignal(int)    # snapshots overwritten before the GUI took them
 
-    def __init__(self, reader: MemoryReader, poll_ms: int = 250):
+    def __init__(self, reader: Optional[MemoryReader], poll_ms: int = 250,
+                 scheduler: Optional[AdaptivePollScheduler] = None,
+                 coalesce: Optional[bool] = None, engine: Optional[str] = None,
+                 core: Optional[Union[PollCore, ProcessPollCore]] = None):
         super().__init__()
+        if core is not None and isinstance(core, ProcessPollCore):
+            cfg = core.process.cfg
+        else:
+            cfg = getattr(reader, "_cfg", None) or Config()
+        self._engine = (engine or cfg.poll_engine).lower()
+        if self._engine not in ("qtimer", "thread"):
+            log.warning(f"Unknown poll_engine {self._engine!r}, using qtimer")
+            self._engine = "qtimer"
+        # QTimer resolution is not worth going below 20 ms; the deadline thread can
+        self._min_poll_ms = 5 if self._engine == "thread" else 20
+        self._busy_wait_ms = cfg.poll_busy_wait_ms
         self._reader = reader
-        self._poll_ms = max(20, int(poll_ms))
+        self._poll_ms = max(self._min_poll_ms, int(poll_ms))
         self._timer: Optional[QtCore.QTimer] = None
+        self._poll_thread: Optional[PollingThread] = None
+        self._stats = JitterStats()
+        self._last_tick_start: Optional[float] = None
         self._running = False
+        if coalesce is None:
+            coalesce = cfg.coalesce_frames
+        self._mailbox: Optional[LatestValueMailbox] = None
+        self._drain: Optional[MailboxDrain] = None
+        if coalesce:
+            self._mailbox = LatestValueMailbox()
+            # created in (and left in) the constructing, i.e. GUI, thread
+            self._drain = MailboxDrain(self._mailbox, self.state_updated.emit, cfg.refresh_hz)
+            self._drain.frames_dropped.connect(self.frames_dropped.emit)
+        self._core = core or PollCore(reader, self._poll_ms, scheduler=scheduler)
+        self._interval_ms = self._poll_ms
+
+    @classmethod
+    def from_backend(cls, mem: MemoryBackend, cfg: Optional[Config] = None,
+                     poll_ms: int = 250) -> "RaceUpdater":
+        """Build an updater over any MemoryBackend (live process, dump file, recording...)."""
+        return cls(MemoryReader(mem, cfg or Config()), poll_ms=poll_ms)
 
     @QtCore.pyqtSlot()
     def start(self):
-        """Called in the worker thread; starts a QTimer in that thread's event loop."""
+        """
+        Called in the worker thread; starts a QTimer in that thread's event loop,
+        or the dedicated PollingThread with poll_engine = thread.
+        """
         if self._running:
             return
         self._running = True
+        if self._engine == "thread":
+            self._poll_thread = PollingThread(self._on_tick, self._interval_ms,
+                                              busy_wait_ms=self._busy_wait_ms,
+                                              name="RaceUpdaterPoll")
+            self._stats = self._poll_thread.stats
+            self._poll_thread.start()
+            self.rate_changed.emit(self.effective_hz)
+            return
         self._timer = QtCore.QTimer()
         self._timer.setTimerType(QtCore.Qt.PreciseTimer)  # <-- use high-precision timer
-        self._timer.setInterval(self._poll_ms)
+        self._timer.setInterval(self._interval_ms)
         self._timer.timeout.connect(self._on_tick)
         self._timer.start()
+        self.rate_changed.emit(self.effective_hz)
 
 
     @QtCore.pyqtSlot()
     def stop(self):
         """Stop polling and quit the worker's event loop (thread owner should quit thread)."""
         self._running = False
+        if self._poll_thread is not None:
+            self._poll_thread.stop()
+            self._poll_thread = None
         if self._timer is not None:
             try:
                 self._timer.stop()
@@ -63,10 +147,34 @@ class RaceUpdater(QtCore.QObject):
     @QtCore.pyqtSlot(int)
     def set_poll_interval(self, ms: int):
         """Adjust polling rate dynamically."""
-        ms = max(20, int(ms))
+        ms = max(self._min_poll_ms, int(ms))
         self._poll_ms = ms
+        self._core.set_base(ms)
+        self._apply_interval(ms)
+
+    @property
+    def mailbox(self) -> Optional[LatestValueMailbox]:
+        """The worker -> GUI mailbox (None without frame coalescing)."""
+        return self._mailbox
+
+    def poll_stats(self) -> Dict[str, Optional[float]]:
+        """Tick-interval jitter: ticks, missed deadlines (thread engine), p50/p99/max ms."""
+        return self._stats.snapshot()
+
+    @property
+    def effective_hz(self) -> float:
+        return 1000.0 / self._interval_ms
+
+    def _apply_interval(self, ms: int):
+        ms = max(self._min_poll_ms, int(ms))   # the scheduler's boost is not floored
+        if ms == self._interval_ms:
+            return
+        self._interval_ms = ms
         if self._timer is not None:
-            self._timer.setInterval(self._poll_ms)
+            self._timer.setInterval(ms)
+        if self._poll_thread is not None:
+            self._poll_thread.set_interval(ms)
+        self.rate_changed.emit(1000.0 / ms)
 
 
     def __del__(self):
@@ -76,17 +184,60 @@ class RaceUpdater(QtCore.QObject):
         self._timer = None
 
     def _on_tick(self):
-        """Tick handler invoked in worker thread; read state and emit results."""
+        """Tick handler invoked in the worker (or poll) thread; read state and emit results."""
         if not self._running:  # Extra safety check
             return
-            
-        try:
-            state = self._reader.read_race_state()
+        if self._poll_thread is None:
+            # the PollingThread records its own intervals
+            now = time.perf_counter()
+            if self._last_tick_start is not None:
+                self._stats.record((now - self._last_tick_start) * 1000.0)
+            self._last_tick_start = now
+            self._stats.ticks += 1
+
+        result = self._core.poll()
+        if result.error is not None:
+            # read failed; bubble up as error and keep polling
+            self.error.emit(result.error)
+        elif result.state is None:
+            # out-of-process reader: no new snapshot since the last tick
+            pass
+        elif self._mailbox is not None:
+            # the GUI-thread drain emits state_updated with the newest snapshot
+            self._mailbox.publish(result.state)
+        else:
             # emit to main thread
-            self.state_updated.emit(state)
-        except ReadError as re:
-            # Required read failed; bubble up as error (persistent)
-            self.error.emit(str(re))
-        except Exception as e:
-            # Unexpected errors: emit but keep polling
-            self.error.emit(f"{type(e).__name__}: {e}")
\ No newline at end of file
+            self.state_updated.emit(result.state)
+        self._apply_interval(result.interval_ms)
+
+
+class MailboxDrain(QtCore.QObject):
+    """
+    Lives in the GUI thread and delivers the newest mailbox value at most refresh_hz
+    times per second through `deliver` (RaceUpdater passes state_updated.emit, so
+    overlays connected to it are called directly in the GUI thread).
+    """
+    frames_dropped = QtCore.pyqtSignal(int)
+
+    def __init__(self, mailbox: LatestValueMailbox, deliver: Callable[[object], None],
+                 refresh_hz: int = 60):
+        super().__init__()
+        self._mailbox = mailbox
+        self._deliver = deliver
+        self._reported_dropped = 0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._timer.setInterval(max(1, round(1000 / max(1, int(refresh_hz)))))
+        self._timer.timeout.connect(self.drain)
+        self._timer.start()
+
+    @QtCore.pyqtSlot()
+    def drain(self):
+        state = self._mailbox.take()
+        if state is None:
+            return
+        self._deliver(state)
+        dropped = self._mailbox.dropped
+        if dropped != self._reported_dropped:
+            self._reported_dropped = dropped
+            self.frames_dropped.emit(dropped)